@@ -0,0 +1,17 @@
+from django.contrib import admin
+from .models import SalesRollup
+
+
+@admin.register(SalesRollup)
+class SalesRollupAdmin(admin.ModelAdmin):
+    list_display = ("bucket_start", "granularity", "dimension", "dimension_key", "revenue", "tax", "units", "order_count")
+    list_filter = ("granularity", "dimension")
+    search_fields = ("dimension_key",)
+    date_hierarchy = "bucket_start"
+
+    # Rollups are maintained by the order flow and the backfill command only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
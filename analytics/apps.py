@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class AnalyticsConfig(AppConfig):
+    name = 'analytics'
+
+    def ready(self):
+        # connect the order_status_changed listener (rollups follow status changes)
+        from . import signals  # noqa: F401
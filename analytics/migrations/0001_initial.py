@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-18 22:47
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('HOUR', 'Hourly'), ('DAY', 'Daily')], max_length=4)),
+                ('bucket_start', models.DateTimeField(help_text='Start of the hour/day bucket (UTC)')),
+                ('dimension', models.CharField(choices=[('OVERALL', 'Overall'), ('PRODUCT', 'Product'), ('CATEGORY', 'Category')], max_length=8)),
+                ('dimension_key', models.CharField(blank=True, default='', help_text='Product id or category name (empty for OVERALL)', max_length=100)),
+                ('revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Net sales (line totals WITHOUT tax)', max_digits=14)),
+                ('tax', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('units', models.IntegerField(default=0)),
+                ('order_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-bucket_start'],
+                'indexes': [models.Index(fields=['granularity', 'dimension', 'bucket_start'], name='analytics_s_granula_975319_idx')],
+                'constraints': [models.UniqueConstraint(fields=('granularity', 'dimension', 'dimension_key', 'bucket_start'), name='unique_sales_rollup_bucket')],
+            },
+        ),
+    ]
@@ -0,0 +1,70 @@
+# analytics/models.py
+from decimal import Decimal
+from django.db import models
+
+
+class SalesRollup(models.Model):
+    """
+    Pre-aggregated sales figures for one time bucket.
+    Rows are updated incrementally when orders are placed or change status,
+    so reporting never has to SUM over the whole orders table.
+    """
+
+    # ───────────────────────────────
+    # Bucket Granularity
+    # ───────────────────────────────
+    class Granularity(models.TextChoices):
+        HOUR = "HOUR", "Hourly"
+        DAY = "DAY", "Daily"
+
+    # ───────────────────────────────
+    # Breakdown Dimension
+    # ───────────────────────────────
+    class Dimension(models.TextChoices):
+        OVERALL = "OVERALL", "Overall"
+        PRODUCT = "PRODUCT", "Product"
+        CATEGORY = "CATEGORY", "Category"
+
+    granularity = models.CharField(max_length=4, choices=Granularity.choices)
+    bucket_start = models.DateTimeField(help_text="Start of the hour/day bucket (UTC)")
+    dimension = models.CharField(max_length=8, choices=Dimension.choices)
+    dimension_key = models.CharField(
+        max_length=100,
+        blank=True,
+        default="",
+        help_text="Product id or category name (empty for OVERALL)"
+    )
+
+    # ───────────────────────────────
+    # Measures
+    # ───────────────────────────────
+    revenue = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal("0.00"),
+        help_text="Net sales (line totals WITHOUT tax)"
+    )
+    tax = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+    units = models.IntegerField(default=0)
+    order_count = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # ───────────────────────────────
+    # Database Optimizations
+    # ───────────────────────────────
+    class Meta:
+        ordering = ["-bucket_start"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["granularity", "dimension", "dimension_key", "bucket_start"],
+                name="unique_sales_rollup_bucket",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["granularity", "dimension", "bucket_start"]),
+        ]
+
+    def __str__(self):
+        label = self.dimension_key or self.dimension.lower()
+        return f"{self.granularity} {self.bucket_start:%Y-%m-%d %H:00} {label}"
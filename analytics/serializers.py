@@ -0,0 +1,18 @@
+from rest_framework import serializers
+from .models import SalesRollup
+
+
+class SalesRollupSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SalesRollup
+        fields = [
+            "granularity",
+            "bucket_start",
+            "dimension",
+            "dimension_key",
+            "revenue",
+            "tax",
+            "units",
+            "order_count",
+        ]
+        read_only_fields = fields
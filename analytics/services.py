@@ -0,0 +1,281 @@
+# analytics/services.py
+"""
+Incremental maintenance of the SalesRollup tables.
+
+Every order that is "counted" (placed and not cancelled/refunded/failed)
+contributes its lines to one hourly and one daily bucket, broken down
+overall, per product and per category. Instead of re-aggregating the
+orders table, each change is turned into a set of deltas that are added
+to the matching rollup rows with F() expressions.
+
+Checkout deltas are applied right after the order commits, in their own
+short transaction: the OVERALL rows are shared by every checkout, and
+holding their locks for the whole checkout would serialize it. An order
+whose deltas are lost to a crash in between is recounted by
+`manage.py backfill_sales_rollups`, which rebuilds one day at a time
+(`rebuild_day`).
+"""
+from datetime import timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+
+from orders.models import Order, OrderItem
+from .models import SalesRollup
+
+
+# Statuses that count as a sale in the rollups.
+COUNTED_STATUSES = frozenset({
+    Order.Status.PENDING,
+    Order.Status.PAID,
+    Order.Status.PROCESSING,
+    Order.Status.SHIPPED,
+    Order.Status.COMPLETED,
+    Order.Status.DELIVERED,
+})
+
+UNCATEGORIZED = "Uncategorized"
+
+
+def is_counted(status):
+    return status in COUNTED_STATUSES
+
+
+def bucket_starts(moment):
+    """
+    Return {granularity: bucket_start} for a timestamp (buckets are UTC).
+    """
+    hour = moment.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+    return {
+        SalesRollup.Granularity.HOUR: hour,
+        SalesRollup.Granularity.DAY: hour.replace(hour=0),
+    }
+
+
+# ───────────────────────────────
+# Order Lines
+# ───────────────────────────────
+# A "line" is a plain tuple: (product_id, category, net, tax, units)
+
+def lines_from_items(items):
+    """
+    Build lines from OrderItem instances already in memory (checkout path).
+    The product must be loaded on each item to read its category.
+    """
+    return [
+        (
+            item.product_id,
+            item.product.category if item.product_id else None,
+            item.line_total - item.tax_amount,
+            item.tax_amount,
+            item.quantity,
+        )
+        for item in items
+    ]
+
+
+def lines_by_order(order_ids):
+    """
+    Fetch lines for many orders in ONE query: {order_id: [line, ...]}
+    """
+    rows = OrderItem.objects.filter(order_id__in=order_ids).values_list(
+        "order_id", "product_id", "product__category", "line_total", "tax_amount", "quantity"
+    ).order_by()
+
+    lines = {}
+    for order_id, product_id, category, line_total, tax_amount, quantity in rows:
+        lines.setdefault(order_id, []).append(
+            (product_id, category, line_total - tax_amount, tax_amount, quantity)
+        )
+    return lines
+
+
+# ───────────────────────────────
+# Deltas
+# ───────────────────────────────
+def add_order_deltas(deltas, created_at, lines, sign=1):
+    """
+    Accumulate the contribution of one order into `deltas`.
+    deltas: {(granularity, bucket_start, dimension, key): [revenue, tax, units, orders]}
+    """
+    if not lines:
+        return deltas
+
+    for granularity, start in bucket_starts(created_at).items():
+        touched = set()
+
+        for product_id, category, net, tax, units in lines:
+            targets = [
+                (SalesRollup.Dimension.OVERALL, ""),
+                (SalesRollup.Dimension.CATEGORY, category or UNCATEGORIZED),
+            ]
+            if product_id:
+                targets.append((SalesRollup.Dimension.PRODUCT, str(product_id)))
+
+            for dimension, key in targets:
+                row_key = (granularity, start, dimension, key)
+                acc = deltas.setdefault(row_key, [Decimal("0.00"), Decimal("0.00"), 0, 0])
+                acc[0] += sign * net
+                acc[1] += sign * tax
+                acc[2] += sign * units
+                touched.add(row_key)
+
+        # An order counts once per rollup row, however many lines it has
+        for row_key in touched:
+            deltas[row_key][3] += sign
+
+    return deltas
+
+
+def apply_deltas(deltas):
+    """
+    Add accumulated deltas to the rollup rows (upsert with F()).
+    Keys are applied in sorted order so concurrent writers lock rows
+    in the same order and cannot deadlock each other.
+    """
+    for row_key in sorted(deltas):
+        revenue, tax, units, orders = deltas[row_key]
+        if not (revenue or tax or units or orders):
+            continue
+
+        granularity, start, dimension, key = row_key
+        lookup = dict(granularity=granularity, bucket_start=start, dimension=dimension, dimension_key=key)
+        changes = dict(
+            revenue=F("revenue") + revenue,
+            tax=F("tax") + tax,
+            units=F("units") + units,
+            order_count=F("order_count") + orders,
+        )
+
+        if SalesRollup.objects.filter(**lookup).update(**changes):
+            continue
+
+        try:
+            # Savepoint: a concurrent insert must not break the outer transaction
+            with transaction.atomic():
+                SalesRollup.objects.create(
+                    revenue=revenue, tax=tax, units=units, order_count=orders, **lookup
+                )
+        except IntegrityError:
+            SalesRollup.objects.filter(**lookup).update(**changes)
+
+
+# ───────────────────────────────
+# Entry Points
+# ───────────────────────────────
+def record_order(order, items=None):
+    """
+    Add a newly placed order to the rollups.
+    Pass `items` when the OrderItems are already in memory (no re-query).
+    """
+    if not is_counted(order.status):
+        return
+
+    if items is not None:
+        lines = lines_from_items(items)
+    else:
+        lines = lines_by_order([order.pk]).get(order.pk, [])
+
+    deltas = add_order_deltas({}, order.created_at, lines)
+    transaction.on_commit(lambda: apply_deltas_atomically(deltas))
+
+
+def apply_deltas_atomically(deltas):
+    # Outside the checkout transaction: row locks are held for this update only
+    with transaction.atomic():
+        apply_deltas(deltas)
+
+
+def apply_status_change(order, old_status, new_status):
+    """
+    Move an order in or out of the rollups when its status crosses
+    the counted/not-counted boundary (e.g. PAID -> CANCELLED).
+    """
+    if is_counted(old_status) == is_counted(new_status):
+        return
+
+    sign = 1 if is_counted(new_status) else -1
+    lines = lines_by_order([order.pk]).get(order.pk, [])
+    apply_deltas(add_order_deltas({}, order.created_at, lines, sign=sign))
+
+
+def apply_bulk_status_change(queryset, new_status):
+    """
+    Rollup side of `queryset.update(status=new_status)`, which skips signals.
+    Call it in the same transaction, BEFORE running the update.
+    """
+    if is_counted(new_status):
+        flipping = queryset.exclude(status__in=COUNTED_STATUSES)
+        sign = 1
+    else:
+        flipping = queryset.filter(status__in=COUNTED_STATUSES)
+        sign = -1
+
+    orders = list(flipping.order_by().values_list("id", "created_at"))
+    lines = lines_by_order([order_id for order_id, _ in orders])
+
+    deltas = {}
+    for order_id, created_at in orders:
+        add_order_deltas(deltas, created_at, lines.get(order_id, []), sign=sign)
+    apply_deltas(deltas)
+
+
+def counted_orders_in_chunks(since=None, until=None, chunk_size=2000):
+    """
+    Yield lists of (order_id, created_at) for counted orders, walking the
+    table with keyset pagination on (created_at, id) instead of OFFSET.
+    """
+    queryset = Order.objects.filter(status__in=COUNTED_STATUSES)
+    if since is not None:
+        queryset = queryset.filter(created_at__gte=since)
+    if until is not None:
+        queryset = queryset.filter(created_at__lt=until)
+    queryset = queryset.order_by("created_at", "id").values_list("id", "created_at")
+
+    last = None
+    while True:
+        page = queryset
+        if last is not None:
+            last_created, last_id = last[1], last[0]
+            page = page.filter(
+                Q(created_at__gt=last_created) | Q(created_at=last_created, id__gt=last_id)
+            )
+        chunk = list(page[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last = chunk[-1]
+
+
+def rebuild_day(day, chunk_size=2000):
+    """
+    Recompute the hourly and daily rows of one UTC day from its orders
+    and swap them in, in one transaction: readers see the old or the new
+    figures for the day, never a partial rebuild. Returns the number of
+    orders counted.
+    """
+    end = day + timedelta(days=1)
+    with transaction.atomic():
+        existing = SalesRollup.objects.filter(bucket_start__gte=day, bucket_start__lt=end)
+        # Lock the day's rows before reading its orders: a concurrent status
+        # change (which updates them in its own transaction) is then either
+        # visible to the reads below or applied on top of the new rows
+        list(existing.select_for_update().values_list("pk", flat=True))
+
+        deltas, total = {}, 0
+        for chunk in counted_orders_in_chunks(day, end, chunk_size):
+            lines = lines_by_order([order_id for order_id, _ in chunk])
+            for order_id, created_at in chunk:
+                add_order_deltas(deltas, created_at, lines.get(order_id, []))
+            total += len(chunk)
+
+        existing.delete()
+        SalesRollup.objects.bulk_create(
+            SalesRollup(
+                granularity=granularity, bucket_start=start, dimension=dimension, dimension_key=key,
+                revenue=revenue, tax=tax, units=units, order_count=orders,
+            )
+            for (granularity, start, dimension, key), (revenue, tax, units, orders) in sorted(deltas.items())
+        )
+    return total
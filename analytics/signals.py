@@ -0,0 +1,12 @@
+# analytics/signals.py
+from django.dispatch import receiver
+
+from orders.models import Order
+from orders.signals import order_status_changed
+from . import services
+
+
+@receiver(order_status_changed, sender=Order)
+def rollup_order_status_change(sender, order, old_status, new_status, **kwargs):
+    # Keep the rollups in sync when an existing order changes status
+    services.apply_status_change(order, old_status, new_status)
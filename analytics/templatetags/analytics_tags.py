@@ -0,0 +1,66 @@
+# analytics/templatetags/analytics_tags.py
+from datetime import timedelta
+
+from django import template
+from django.db.models import Sum
+from django.utils import timezone
+
+from products.models import Product
+from analytics.models import SalesRollup
+from analytics.services import bucket_starts
+
+
+register = template.Library()
+
+
+def top_keys(dimension, since, limit):
+    """
+    Best sellers over the window, summed from the (small) daily rollup rows.
+    """
+    return list(
+        SalesRollup.objects.filter(
+            granularity=SalesRollup.Granularity.DAY,
+            dimension=dimension,
+            bucket_start__gte=since,
+        )
+        .values("dimension_key")
+        .annotate(revenue=Sum("revenue"), units=Sum("units"))
+        .order_by("-revenue")[:limit]
+    )
+
+
+@register.inclusion_tag("analytics/sales_dashboard.html")
+def sales_dashboard(days=7, limit=5):
+    """
+    Jazzmin dashboard widgets: today's figures, the last `days` days
+    and the top products / categories. Reads rollups only.
+    """
+    today = bucket_starts(timezone.now())[SalesRollup.Granularity.DAY]
+    since = today - timedelta(days=days - 1)
+
+    daily = list(
+        SalesRollup.objects.filter(
+            granularity=SalesRollup.Granularity.DAY,
+            dimension=SalesRollup.Dimension.OVERALL,
+            bucket_start__gte=since,
+        ).order_by("bucket_start")
+    )
+    today_row = next((row for row in daily if row.bucket_start == today), None)
+
+    top_products = top_keys(SalesRollup.Dimension.PRODUCT, since, limit)
+    names = {
+        str(product_id): name
+        for product_id, name in Product.objects.filter(
+            id__in=[row["dimension_key"] for row in top_products]
+        ).values_list("id", "name")
+    }
+    for row in top_products:
+        row["name"] = names.get(row["dimension_key"], row["dimension_key"])
+
+    return {
+        "days": days,
+        "today": today_row,
+        "daily": daily,
+        "top_products": top_products,
+        "top_categories": top_keys(SalesRollup.Dimension.CATEGORY, since, limit),
+    }
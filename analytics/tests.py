@@ -0,0 +1,87 @@
+import io
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from orders.models import Order, OrderItem
+from products.models import Product
+from users.models import User
+from .models import SalesRollup
+from . import services
+
+
+class SalesRollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="buyer", email="buyer@example.com", password="x")
+        cls.product = Product.objects.create(name="Mug", price=Decimal("10.00"), category="Kitchen", stock=100)
+
+    def place(self, number, quantity=2, created_at=None):
+        order = Order.objects.create(user=self.user, order_number=number, status=Order.Status.PENDING)
+        item = OrderItem(order=order, product=self.product, product_name="Mug",
+                         unit_price=Decimal("10.00"), quantity=quantity, tax_percent=Decimal("10.00"))
+        item.calculate_totals()
+        item.save()
+        if created_at is not None:
+            Order.objects.filter(pk=order.pk).update(created_at=created_at)
+            order.refresh_from_db()
+        return order, [item]
+
+    def overall(self, granularity=SalesRollup.Granularity.DAY):
+        return SalesRollup.objects.filter(granularity=granularity, dimension=SalesRollup.Dimension.OVERALL)
+
+    def test_checkout_deltas_are_applied_after_commit(self):
+        order, items = self.place("ORD-1")
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            services.record_order(order, items)
+        # Nothing touched (no row locks) inside the checkout transaction
+        self.assertFalse(SalesRollup.objects.exists())
+
+        for callback in callbacks:
+            callback()
+        for granularity in SalesRollup.Granularity.values:
+            row = self.overall(granularity).get()
+            self.assertEqual((row.revenue, row.tax, row.units, row.order_count),
+                             (Decimal("20.00"), Decimal("2.00"), 2, 1))
+        self.assertTrue(SalesRollup.objects.filter(dimension=SalesRollup.Dimension.CATEGORY, dimension_key="Kitchen").exists())
+        self.assertTrue(SalesRollup.objects.filter(dimension=SalesRollup.Dimension.PRODUCT, dimension_key=str(self.product.pk)).exists())
+
+    def test_orders_accumulate_and_cancelling_removes_them(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first, items = self.place("ORD-1")
+            services.record_order(first, items)
+            second, items = self.place("ORD-2", quantity=1)
+            services.record_order(second, items)
+        row = self.overall().get()
+        self.assertEqual((row.revenue, row.units, row.order_count), (Decimal("30.00"), 3, 2))
+
+        first.status = Order.Status.CANCELLED
+        first.save(update_fields=["status"])
+        row.refresh_from_db()
+        self.assertEqual((row.revenue, row.units, row.order_count), (Decimal("10.00"), 1, 1))
+
+    def test_backfill_replaces_past_days_and_leaves_today_alone(self):
+        day = datetime(2026, 1, 5, tzinfo=dt_timezone.utc)
+        self.place("ORD-1", created_at=day + timedelta(hours=3))
+        self.place("ORD-2", quantity=1, created_at=day + timedelta(hours=3, minutes=30))
+        cancelled, _ = self.place("ORD-3", created_at=day + timedelta(hours=5))
+        Order.objects.filter(pk=cancelled.pk).update(status=Order.Status.CANCELLED)
+        # Stale figures for the day, and a live row for today
+        SalesRollup.objects.create(granularity=SalesRollup.Granularity.DAY, bucket_start=day,
+                                   dimension=SalesRollup.Dimension.OVERALL, revenue=Decimal("999.00"), order_count=9)
+        today = services.bucket_starts(timezone.now())[SalesRollup.Granularity.DAY]
+        live = SalesRollup.objects.create(granularity=SalesRollup.Granularity.DAY, bucket_start=today,
+                                          dimension=SalesRollup.Dimension.OVERALL, revenue=Decimal("5.00"), order_count=1)
+
+        call_command("backfill_sales_rollups", since="2026-01-01", stdout=io.StringIO())
+
+        row = self.overall().get(bucket_start=day)
+        self.assertEqual((row.revenue, row.tax, row.units, row.order_count),
+                         (Decimal("30.00"), Decimal("3.00"), 3, 2))
+        hour = self.overall(SalesRollup.Granularity.HOUR).get()
+        self.assertEqual((hour.bucket_start, hour.order_count), (day + timedelta(hours=3), 2))
+        live.refresh_from_db()
+        self.assertEqual((live.revenue, live.order_count), (Decimal("5.00"), 1))
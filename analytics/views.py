@@ -0,0 +1,88 @@
+# analytics/views.py
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import ListAPIView
+from rest_framework.permissions import IsAdminUser
+
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
+
+from .models import SalesRollup
+from .serializers import SalesRollupSerializer
+
+
+# Default look-back window when no ?start= is given
+DEFAULT_WINDOWS = {
+    SalesRollup.Granularity.HOUR: timedelta(hours=48),
+    SalesRollup.Granularity.DAY: timedelta(days=30),
+}
+
+
+def parse_moment(value, param):
+    """
+    Accept an ISO date (YYYY-MM-DD, midnight UTC) or an ISO datetime.
+    """
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValidationError({param: "Use an ISO date or datetime."})
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = moment.replace(tzinfo=dt_timezone.utc)
+    return moment
+
+
+@extend_schema_view(
+    get=extend_schema(
+        tags=['Analytics'],
+        summary="Sales rollups",
+        description="Pre-aggregated revenue, tax, units and order count per hour or day, "
+                    "overall or broken down by product or category. Admin only.",
+        parameters=[
+            OpenApiParameter("granularity", OpenApiTypes.STR, enum=["hour", "day"], description="Bucket size (default: day)"),
+            OpenApiParameter("dimension", OpenApiTypes.STR, enum=["overall", "product", "category"], description="Breakdown (default: overall)"),
+            OpenApiParameter("key", OpenApiTypes.STR, description="Product id or category name to filter on"),
+            OpenApiParameter("start", OpenApiTypes.STR, description="Inclusive ISO date/datetime"),
+            OpenApiParameter("end", OpenApiTypes.STR, description="Exclusive ISO date/datetime"),
+        ],
+    )
+)
+class SalesRollupView(ListAPIView):
+    """
+    GET /analytics/sales/ => Read the sales rollup tables
+    """
+    permission_classes = [IsAdminUser]
+    serializer_class = SalesRollupSerializer
+
+    def get_queryset(self):
+        params = self.request.query_params
+
+        granularity = params.get("granularity", "day").upper()
+        if granularity not in SalesRollup.Granularity.values:
+            raise ValidationError({"granularity": "Must be 'hour' or 'day'."})
+
+        dimension = params.get("dimension", "overall").upper()
+        if dimension not in SalesRollup.Dimension.values:
+            raise ValidationError({"dimension": "Must be 'overall', 'product' or 'category'."})
+
+        end = parse_moment(params["end"], "end") if "end" in params else timezone.now()
+        if "start" in params:
+            start = parse_moment(params["start"], "start")
+        else:
+            start = end - DEFAULT_WINDOWS[granularity]
+
+        queryset = SalesRollup.objects.filter(
+            granularity=granularity,
+            dimension=dimension,
+            bucket_start__gte=start,
+            bucket_start__lt=end,
+        )
+        if params.get("key"):
+            queryset = queryset.filter(dimension_key=params["key"])
+
+        return queryset.order_by("bucket_start", "dimension_key")
@@ -1,3 +1,9 @@
 from django.contrib import admin
+from .models import RevokedToken
 
-# Register your models here.
+
+@admin.register(RevokedToken)
+class RevokedTokenAdmin(admin.ModelAdmin):
+    list_display = ("jti", "revoked_at", "expires_at")
+    search_fields = ("jti",)
+    readonly_fields = ("jti", "revoked_at", "expires_at")
@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        from clickmart_main import profiling
+        profiling.instrument_serializers()
+        # connect the User listeners (stateless JWT revocation cache)
+        from . import signals  # noqa: F401
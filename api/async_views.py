@@ -0,0 +1,150 @@
+# api/async_views.py
+"""
+Minimal async counterpart of APIView for hot read endpoints (ASGI).
+
+DRF views are synchronous: under ASGI each request occupies a thread for
+its whole lifetime. AsyncAPIView subclasses are native Django async views
+that authenticate with the configured DRF authenticators, read through
+the async ORM and render JSON, so one ASGI worker can multiplex many slow
+clients. Writes (and the OpenAPI schema) are delegated to the sync DRF
+view named in `sync_view`, so both paths expose the same contract.
+
+Views whose writes are mostly waiting (register and login await their
+password hash, users/async_views.py) handle them natively: `parse` reads
+the body with the DRF parsers, and `throttle_classes` are checked like
+ThrottleBeforeAuthMixin does (`before_auth` ones ahead of authentication).
+List reads page with the sync view's `pagination_class` (`paginate`).
+"""
+from asgiref.sync import sync_to_async
+
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404, HttpResponse
+from django.views import View
+
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from clickmart_main import profiling
+
+from .renderers import FastJSONRenderer
+
+
+class AsyncAPIView(View):
+    # The sync DRF view with the same contract (schema, non-GET methods)
+    sync_view = None
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    throttle_classes = api_settings.DEFAULT_THROTTLE_CLASSES
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES
+    require_authentication = False
+    renderer_class = FastJSONRenderer
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # Token auth, no session cookies: same as DRF's APIView
+        view.csrf_exempt = True
+        if cls.sync_view is not None:
+            # drf-spectacular documents callbacks through `cls`
+            view.cls = cls.sync_view
+            view.initkwargs = {}
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            await self.check_throttles(request, before_auth=True)
+            request.user = await self.authenticate(request)
+            if self.require_authentication and not request.user.is_authenticated:
+                # As APIView.permission_denied: no authenticator, no challenge
+                if not self.authentication_classes:
+                    raise exceptions.PermissionDenied()
+                raise exceptions.NotAuthenticated()
+            await self.check_throttles(request)
+            return await super().dispatch(request, *args, **kwargs)
+        except Http404 as exc:
+            return self.render({"detail": str(exc) or "Not found."}, status.HTTP_404_NOT_FOUND)
+        except exceptions.APIException as exc:
+            response = self.render(
+                exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail},
+                exc.status_code,
+            )
+            if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+                auth_header = self.get_authenticate_header(request)
+                if auth_header:
+                    response["WWW-Authenticate"] = auth_header
+                else:
+                    response.status_code = status.HTTP_403_FORBIDDEN
+            if getattr(exc, "wait", None) is not None:
+                response["Retry-After"] = "%d" % exc.wait
+            return response
+
+    def get_authenticators(self):
+        return [auth() for auth in self.authentication_classes]
+
+    def get_authenticate_header(self, request):
+        authenticators = self.get_authenticators()
+        if authenticators:
+            return authenticators[0].authenticate_header(request)
+
+    async def authenticate(self, request):
+        for authenticator in self.get_authenticators():
+            # Token decoding is cheap; user lookups hit the database
+            result = await sync_to_async(authenticator.authenticate)(request)
+            if result is not None:
+                return result[0]
+        return AnonymousUser()
+
+    def get_throttles(self):
+        return [throttle() for throttle in self.throttle_classes]
+
+    async def check_throttles(self, request, before_auth=False):
+        throttles = [
+            throttle for throttle in self.get_throttles()
+            if getattr(throttle, "before_auth", False) == before_auth
+        ]
+        if not throttles:
+            return
+        # Bucket updates take file locks (and the odd cache round-trip)
+        waits = await sync_to_async(
+            lambda: [throttle.wait() for throttle in throttles if not throttle.allow_request(request, self)],
+            thread_sensitive=False,
+        )()
+        if waits:
+            raise exceptions.Throttled(max((wait for wait in waits if wait is not None), default=None))
+
+    def parse(self, request):
+        """
+        The request body, parsed like DRF's request.data.
+        """
+        return Request(request, parsers=[parser() for parser in self.parser_classes]).data
+
+    async def paginate(self, request, queryset, serialize):
+        """
+        `serialize(rows)` for the page of `queryset` the sync view would
+        return, wrapped like its paginated response (the whole queryset
+        when it does not paginate).
+        """
+        pagination_class = getattr(self.sync_view, "pagination_class", None)
+        if pagination_class is None:
+            return serialize([row async for row in queryset])
+        paginator = pagination_class()
+        # Paginators count and slice synchronously
+        page = await sync_to_async(paginator.paginate_queryset)(queryset, Request(request), view=self)
+        return paginator.get_paginated_response(serialize(page)).data
+
+    def render(self, data, status_code=status.HTTP_200_OK):
+        renderer = self.renderer_class()
+        with profiling.timer("render"):
+            content = renderer.render(data)
+        return HttpResponse(
+            content,
+            status=status_code,
+            content_type=f"{renderer.media_type}; charset={renderer.charset}" if renderer.charset else renderer.media_type,
+        )
+
+    async def delegate(self, request, *args, **kwargs):
+        """
+        Run the sync DRF view for this request (writes).
+        """
+        view = self.sync_view.as_view()
+        return await sync_to_async(view)(request, *args, **kwargs)
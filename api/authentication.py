@@ -0,0 +1,110 @@
+# api/authentication.py
+"""
+Stateless JWT authentication mode (settings.JWT_STATELESS_AUTH).
+
+JWTAuthentication loads the User row on every request. In stateless mode
+the request user is a ClaimsTokenUser built from the token claims (id,
+email, is_active, is_staff); the full User is only fetched when a view
+asks for it (get_full_user). Deactivated/deleted users are caught by a
+short-TTL in-process cache, so the database is hit at most once per
+user per JWT_REVOCATION_CACHE_TTL seconds, per process.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+
+from clickmart_main import metrics
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.models import TokenUser
+
+
+User = get_user_model()
+
+
+class ClaimsTokenUser(TokenUser):
+    """
+    Lightweight request.user backed by the token claims.
+    """
+
+    @cached_property
+    def email(self):
+        return self.token.get("email", "")
+
+    @cached_property
+    def is_active(self):
+        return self.token.get("is_active", True)
+
+    @cached_property
+    def instance(self):
+        """
+        The full User row, loaded lazily (one query, then cached).
+        """
+        return User.objects.get(pk=self.id)
+
+
+def get_full_user(user):
+    """
+    Return a real User model instance for request.user in either mode.
+    """
+    if isinstance(user, ClaimsTokenUser):
+        return user.instance
+    return user
+
+
+class RevocationCache:
+    """
+    Per-process {user_id: (checked_at, allowed)} with a short TTL.
+    Keys are str(user_id): token claims and model pks agree on them.
+    """
+
+    def __init__(self, ttl, max_entries=100_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def is_allowed(self, user_id):
+        user_id = str(user_id)
+        now = time.monotonic()
+        entry = self._entries.get(user_id)
+        if entry is not None and now - entry[0] < self.ttl:
+            metrics.record_cache("jwt_revocation", hit=True)
+            return entry[1]
+        metrics.record_cache("jwt_revocation", hit=False)
+
+        allowed = User.objects.filter(pk=user_id, is_active=True).exists()
+
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+            self._entries[user_id] = (now, allowed)
+        return allowed
+
+    def forget(self, user_id):
+        """
+        Drop a cached verdict (api/signals.py: whenever a user is saved
+        or deleted). Other processes catch up within the TTL.
+        """
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+
+revocations = RevocationCache(ttl=getattr(settings, "JWT_REVOCATION_CACHE_TTL", 30))
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    JWT authentication without a per-request User lookup.
+    """
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+
+        if not user.is_active or not revocations.is_allowed(user.id):
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+
+        return user
@@ -0,0 +1,282 @@
+# api/management/commands/bench_endpoints.py
+"""
+Endpoint benchmark suite.
+
+Creates a throwaway test database, seeds it deterministically
+(api/seeding.py, the generator behind seed_scale), then calls every route in api/urls.py through the full
+middleware stack and records per route:
+
+- p50 / p99 / mean latency over --iterations timed requests (after warm-up);
+- queries per request (median);
+- allocations per request (median tracemalloc peak, separate passes).
+
+Results are written as JSON; --compare prints the deltas against an
+earlier run, so a baseline from one commit can be checked on the next.
+Routes without a request recipe are reported as skipped, so a new route
+shows up here until it gets one.
+"""
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment
+from django.urls import URLPattern
+
+from rest_framework.test import APIClient
+
+from api import seeding, urls as api_urls
+from api.serializers import ClaimsTokenObtainPairSerializer
+from carts.models import Cart, CartItem
+from orders.models import Order
+from products.models import Product
+
+
+API_PREFIX = "/api/v1/"
+SHIPPING_ADDRESS = {
+    "phone": "+1 555 0100",
+    "address": "1 Bench Street",
+    "city": "Toronto",
+    "state": "ON",
+    "zipCode": "M5V 2T6",
+    "country": "Canada",
+}
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Fixtures:
+    """
+    Seeded data plus authenticated clients used by the request recipes.
+    """
+
+    def __init__(self, seed):
+        # User 0 is the most active customer of a seeded dataset
+        self.customer = seeding.User.objects.get(username=seeding.seeded_username(seed, 0))
+        self.products = list(
+            Product.objects.filter(slug__startswith=f"seed{seed}-", is_active=True).order_by("slug")[:100]
+        )
+        # Cart and checkout recipes must never run out of stock
+        Product.objects.filter(pk__in=[product.pk for product in self.products]).update(stock=10_000_000)
+        self.staff = seeding.User.objects.create_user(
+            username="bench-staff", email="bench-staff@example.com",
+            password=seeding.SEED_PASSWORD, is_staff=True,
+        )
+        self.anonymous = APIClient()
+        self.client = self.authenticated(self.customer)
+        self.staff_client = self.authenticated(self.staff)
+        self.cart, _ = Cart.objects.get_or_create(user=self.customer)
+        self.order = Order.objects.filter(user=self.customer).first() or Order.objects.first()
+
+    def authenticated(self, user):
+        client = APIClient()
+        token = ClaimsTokenObtainPairSerializer.get_token(user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return client
+
+    def product(self, iteration):
+        return self.products[iteration % len(self.products)]
+
+    def cart_item(self, iteration):
+        item, _ = CartItem.objects.get_or_create(cart=self.cart, product=self.product(iteration))
+        return item
+
+
+# ───────────────────────────────
+# Request recipes, by route
+# ───────────────────────────────
+def place_order(fixtures, iteration):
+    # Checkout empties the cart: put one item back before every request
+    fixtures.cart_item(iteration)
+    return fixtures.client, "post", "orders/place/", {"shippingAddress": SHIPPING_ADDRESS}
+
+
+# Each recipe prepares (untimed) and returns (client, method, path, data)
+RECIPES = {
+    "register/": lambda f, i: (
+        f.anonymous, "post", "register/",
+        {"email": f"bench-register-{i}@example.com", "username": f"bench-register-{i}", "password": seeding.SEED_PASSWORD},
+    ),
+    "token/": lambda f, i: (
+        f.anonymous, "post", "token/",
+        {"email": f.customer.email, "password": seeding.SEED_PASSWORD},
+    ),
+    "token/refresh/": lambda f, i: (
+        f.anonymous, "post", "token/refresh/",
+        {"refresh": str(ClaimsTokenObtainPairSerializer.get_token(f.customer))},
+    ),
+    "profile/": lambda f, i: (f.client, "get", "profile/", None),
+    "products/": lambda f, i: (f.anonymous, "get", "products/", None),
+    "products/<uuid:id>/": lambda f, i: (f.anonymous, "get", f"products/{f.product(i).id}/", None),
+    "cart/": lambda f, i: (f.client, "get", "cart/", None),
+    "cart/add/": lambda f, i: (
+        f.client, "post", "cart/add/", {"product_id": str(f.product(i).id), "quantity": 1},
+    ),
+    "cart/items/<uuid:item_id>/": lambda f, i: (
+        f.client, "patch", f"cart/items/{f.cart_item(i).id}/", {"change": 1},
+    ),
+    "orders/place/": place_order,
+    "orders/": lambda f, i: (f.client, "get", "orders/", None),
+    "orders/<uuid:id>/": lambda f, i: (f.client, "get", f"orders/{f.order.id}/", None),
+    "support/orders/search/": lambda f, i: (
+        f.staff_client, "get", f"support/orders/search/?q={f.order.order_number}", None,
+    ),
+    "analytics/sales/": lambda f, i: (f.staff_client, "get", "analytics/sales/?granularity=day", None),
+}
+
+
+class Command(BaseCommand):
+    help = "Benchmark every API route (latency, queries, allocations) on a seeded test database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=50, help="Seeded users (default: 50)")
+        parser.add_argument("--products", type=int, default=200, help="Seeded products (default: 200)")
+        parser.add_argument("--orders", type=int, default=500, help="Seeded orders (default: 500)")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed for the dataset (default: 42)")
+        parser.add_argument("--iterations", type=int, default=50, help="Timed requests per route (default: 50)")
+        parser.add_argument("--warmup", type=int, default=3, help="Untimed requests per route (default: 3)")
+        parser.add_argument("--alloc-iterations", type=int, default=5, help="Requests per route traced for allocations (default: 5)")
+        parser.add_argument("--route", action="append", help="Only benchmark this route (repeatable), e.g. products/")
+        parser.add_argument("--output", default="bench-endpoints.json", help="JSON results file (default: bench-endpoints.json)")
+        parser.add_argument("--compare", help="Earlier results file to compare against")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            # Same conditions on every machine: no replicas, no sampling,
+            # and no throttling (every route is called in a tight loop)
+            with override_settings(READ_REPLICAS=[], REQUEST_PROFILING_SAMPLE_RATE=0, THROTTLING_ENABLED=False):
+                started = time.perf_counter()
+                seeding.seed(options["users"], options["products"], options["orders"], options["seed"])
+                self.stdout.write(f"Seeded in {time.perf_counter() - started:.1f}s")
+                results = self.run(Fixtures(options["seed"]), options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            "meta": {
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "git_revision": git_revision(),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+                "dataset": {key: options[key] for key in ("users", "products", "orders", "seed")},
+                "iterations": options["iterations"],
+            },
+            "routes": results,
+        }
+        with open(options["output"], "w") as output:
+            json.dump(report, output, indent=2)
+
+        self.print_table(results, options["compare"])
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def run(self, fixtures, options):
+        results = []
+        for pattern in api_urls.urlpatterns:
+            if not isinstance(pattern, URLPattern):
+                continue
+            route = str(pattern.pattern)
+            if options["route"] and route not in options["route"]:
+                continue
+            recipe = RECIPES.get(route)
+            if recipe is None:
+                results.append({"route": route, "name": pattern.name, "skipped": "no request recipe"})
+                continue
+            results.append(self.measure(route, pattern.name, recipe, fixtures, options))
+        return results
+
+    def call(self, recipe, fixtures, iteration):
+        client, method, path, data = recipe(fixtures, iteration)
+        kwargs = {"data": data, "format": "json"} if data is not None else {}
+        return lambda: getattr(client, method)(API_PREFIX + path, **kwargs)
+
+    def measure(self, route, name, recipe, fixtures, options):
+        iteration = 0
+        for _ in range(options["warmup"]):
+            self.call(recipe, fixtures, iteration)()
+            iteration += 1
+
+        latencies, queries, statuses = [], [], set()
+        for _ in range(options["iterations"]):
+            request = self.call(recipe, fixtures, iteration)
+            iteration += 1
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = request()
+                latencies.append(time.perf_counter() - started)
+            queries.append(len(captured))
+            statuses.add(response.status_code)
+
+        allocations = []
+        for _ in range(options["alloc_iterations"]):
+            request = self.call(recipe, fixtures, iteration)
+            iteration += 1
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+            request()
+            allocations.append(tracemalloc.get_traced_memory()[1] - baseline)
+            tracemalloc.stop()
+
+        self.stdout.write(f"{route}: {len(latencies)} requests, status {sorted(statuses)}")
+        return {
+            "route": route,
+            "name": name,
+            "statuses": sorted(statuses),
+            "p50_ms": round(statistics.median(latencies) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+            "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+            "queries": statistics.median(queries),
+            "alloc_peak_kb": round(statistics.median(allocations) / 1024, 1) if allocations else None,
+        }
+
+    def print_table(self, results, compare_path):
+        baseline = {}
+        if compare_path:
+            with open(compare_path) as previous:
+                baseline = {row["route"]: row for row in json.load(previous)["routes"]}
+
+        self.stdout.write("")
+        self.stdout.write(f"{'route':<30}{'p50 ms':>10}{'p99 ms':>10}{'queries':>9}{'alloc KB':>10}")
+        for row in results:
+            if "skipped" in row:
+                self.stdout.write(f"{row['route']:<30}  skipped: {row['skipped']}")
+                continue
+            self.stdout.write(
+                f"{row['route']:<30}{row['p50_ms']:>10.2f}{row['p99_ms']:>10.2f}"
+                f"{row['queries']:>9g}{row['alloc_peak_kb'] or 0:>10.1f}"
+            )
+            before = baseline.get(row["route"])
+            if before and "skipped" not in before:
+                self.stdout.write(
+                    f"{'  vs baseline':<30}{self.delta(row['p50_ms'], before['p50_ms']):>10}"
+                    f"{self.delta(row['p99_ms'], before['p99_ms']):>10}"
+                    f"{row['queries'] - before['queries']:>+9g}"
+                    f"{self.delta(row['alloc_peak_kb'] or 0, before['alloc_peak_kb'] or 0):>10}"
+                )
+
+    @staticmethod
+    def delta(current, previous):
+        if not previous:
+            return "n/a"
+        return f"{(current - previous) / previous * 100:+.0f}%"
@@ -0,0 +1,132 @@
+# api/management/commands/bench_json.py
+"""
+JSON renderer / parser benchmark on large payloads.
+
+Seeds a throwaway test database (api/seeding.py), fetches the product
+list (ProductListView) and the busiest customer's order history
+(CustomerOrderView), then for each JSON backend:
+
+- DRF's JSONRenderer / JSONParser;
+- FastJSONRenderer / FastJSONParser with the stdlib encoder;
+- FastJSONRenderer / FastJSONParser with orjson (when installed);
+
+reports the median render and parse time of the payload and the median
+full request time with that renderer. Rendered output is checked against
+DRF's, so a backend that changes the response fails loudly.
+"""
+import gc
+import io
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from api import seeding
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer, orjson
+from api.serializers import ClaimsTokenObtainPairSerializer
+from orders.models import Order
+from orders.views import CustomerOrderView
+from products.views import ProductListView
+
+
+class StdlibJSONRenderer(FastJSONRenderer):
+    backend = "json"
+
+
+class StdlibJSONParser(FastJSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        return JSONParser.parse(self, stream, media_type, parser_context)
+
+
+class OrjsonRenderer(FastJSONRenderer):
+    backend = "orjson"
+
+
+def backends():
+    yield "drf", JSONRenderer, JSONParser
+    yield "fast (stdlib)", StdlibJSONRenderer, StdlibJSONParser
+    if orjson is not None:
+        yield "fast (orjson)", OrjsonRenderer, FastJSONParser
+
+
+def median_ms(function, iterations):
+    # Don't charge this run for garbage left by the previous one
+    gc.collect()
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+class Command(BaseCommand):
+    help = "Benchmark JSON rendering / parsing of large product list and order history payloads."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=2000, help="Seeded products (default: 2000)")
+        parser.add_argument("--users", type=int, default=20, help="Seeded users (default: 20)")
+        parser.add_argument("--orders", type=int, default=2000, help="Seeded orders (default: 2000)")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed for the dataset (default: 42)")
+        parser.add_argument("--iterations", type=int, default=20, help="Timed runs per measurement (default: 20)")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with override_settings(READ_REPLICAS=[], REQUEST_PROFILING_SAMPLE_RATE=0):
+                seeding.seed(options["users"], options["products"], options["orders"], options["seed"])
+                self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def run(self, options):
+        customer = seeding.User.objects.get(username=seeding.seeded_username(options["seed"], 0))
+        client = APIClient()
+        token = ClaimsTokenObtainPairSerializer.get_token(customer).access_token
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        payloads = [
+            ("products/", ProductListView, APIClient()),
+            ("orders/", CustomerOrderView, client),
+        ]
+        self.stdout.write(
+            f"{Order.objects.filter(user=customer).count()} orders for {customer.username}, "
+            f"{options['iterations']} runs per measurement"
+        )
+        self.stdout.write("")
+        self.stdout.write(f"{'route':<12}{'backend':<16}{'KB':>8}{'render ms':>11}{'parse ms':>10}{'request ms':>12}")
+
+        for route, view, route_client in payloads:
+            data = route_client.get(f"/api/v1/{route}").data
+            expected = JSONRenderer().render(data)
+            for name, renderer_class, parser_class in backends():
+                renderer, parser = renderer_class(), parser_class()
+                rendered = renderer.render(data)
+                if json.loads(rendered) != json.loads(expected):
+                    raise CommandError(f"{name} renders {route} differently from DRF's JSONRenderer")
+
+                render_ms = median_ms(lambda: renderer.render(data), options["iterations"])
+                parse_ms = median_ms(lambda: parser.parse(io.BytesIO(rendered)), options["iterations"])
+
+                # Full request (query + serialize + render) with this renderer
+                renderer_classes = view.renderer_classes
+                view.renderer_classes = [renderer_class]
+                try:
+                    request_ms = median_ms(lambda: route_client.get(f"/api/v1/{route}"), options["iterations"])
+                finally:
+                    view.renderer_classes = renderer_classes
+
+                self.stdout.write(
+                    f"{route:<12}{name:<16}{len(rendered) / 1024:>8.0f}"
+                    f"{render_ms:>11.2f}{parse_ms:>10.2f}{request_ms:>12.2f}"
+                )
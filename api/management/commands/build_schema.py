@@ -0,0 +1,19 @@
+# api/management/commands/build_schema.py
+"""
+Pre-render the OpenAPI schema for CachedSchemaView (run at deploy time).
+"""
+from django.core.management.base import BaseCommand
+
+from api import schema
+
+
+class Command(BaseCommand):
+    help = "Write the OpenAPI schema (YAML + JSON, plain and gzipped) to OPENAPI_SCHEMA_DIR."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output-dir", help="Directory to write to (default: settings.OPENAPI_SCHEMA_DIR)")
+
+    def handle(self, *args, **options):
+        for path in schema.write(options["output_dir"]):
+            self.stdout.write(f"{path} ({path.stat().st_size / 1024:.0f} KB)")
+        self.stdout.write(self.style.SUCCESS("OpenAPI schema written"))
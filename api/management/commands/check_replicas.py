@@ -0,0 +1,21 @@
+# api/management/commands/check_replicas.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from clickmart_main.routers import monitor, replicas
+
+
+class Command(BaseCommand):
+    help = "Show health and replication lag of the configured read replicas."
+
+    def handle(self, *args, **options):
+        aliases = replicas()
+        if not aliases:
+            self.stdout.write("No read replicas configured; all queries use the primary.")
+            return
+
+        for alias in aliases:
+            healthy, lag = monitor.check(alias)
+            lag_text = "unreachable" if lag is None else f"lag {lag:.2f}s"
+            line = f"{alias}: {lag_text} (max {settings.REPLICA_MAX_LAG_SECONDS}s)"
+            self.stdout.write(self.style.SUCCESS(line) if healthy else self.style.ERROR(line))
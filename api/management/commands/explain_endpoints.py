@@ -0,0 +1,399 @@
+# api/management/commands/explain_endpoints.py
+"""
+Query plan advisor.
+
+Seeds a throwaway test database (api/seeding.py), calls every route in
+api/urls.py once with bench_endpoints' request recipes, captures each SQL
+statement it runs and explains it:
+
+- PostgreSQL: EXPLAIN (ANALYZE, BUFFERS) inside a rolled-back
+  transaction, so writes are measured but not kept. Reports sequential
+  scans that filter rows, sorts and hashes that spill to disk, and the
+  buffers each statement read.
+- SQLite (development): EXPLAIN QUERY PLAN. Reports full table scans and
+  temporary B-tree sorts (nothing is executed, so no timings).
+
+For every scan or sort it suggests an index built from the statement
+itself (equality columns, then a range column, then the ORDER BY), e.g.
+Order (user, -created_at), unless an existing index already starts with
+those columns. It also lists Meta.indexes that no captured plan used, so
+the hand-maintained indexes on Order / OrderItem follow the real access
+patterns. The dataset should be large enough for the planner to prefer
+indexes (see --orders).
+"""
+import json
+import re
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.urls import URLPattern
+
+from api import seeding, urls as api_urls
+from api.management.commands.bench_endpoints import API_PREFIX, RECIPES, Fixtures
+
+
+EXPLAINABLE = ("SELECT", "UPDATE", "DELETE")
+EQUALITY_OPERATORS = {"=", "IN", "IS"}
+# "table"."column" <operator>, or alias."column" <operator> (U0, T3, ...)
+PREDICATE = re.compile(r'(?:"(\w+)"|\b([UT]\d+))\."(\w+)"\s*(=|IN\b|IS\b|<=|>=|<|>|LIKE\b)', re.IGNORECASE)
+# A boolean column used as a condition on its own (WHERE "t"."is_active")
+BOOLEAN_COLUMN = re.compile(
+    r'(?:^|\bAND\b|\bOR\b|\bNOT\b|\()\s*(?:"(\w+)"|\b([UT]\d+))\."(\w+)"(?=\s*(?:AND\b|OR\b|\)|$))', re.IGNORECASE
+)
+ORDER_COLUMN = re.compile(r'(?:"(\w+)"|\b([UT]\d+))\."(\w+)"(\s+DESC)?', re.IGNORECASE)
+ALIAS = re.compile(r'"(\w+)"\s+(?:AS\s+)?([UT]\d+)\b')
+SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS (\w+))?(.*)$")
+SQLITE_INDEX = re.compile(r"USING (?:COVERING )?INDEX (\w+)")
+
+# Suggested indexes stop at this many columns
+MAX_INDEX_COLUMNS = 3
+
+
+# ───────────────────────────────
+# Statement capture
+# ───────────────────────────────
+class StatementRecorder:
+    """
+    Execute wrapper keeping (sql, params) of every statement, once per SQL text.
+    """
+
+    def __init__(self):
+        self.statements = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and sql.lstrip().upper().startswith(EXPLAINABLE):
+            self.statements.setdefault(sql, params)
+        return execute(sql, params, many, context)
+
+
+# ───────────────────────────────
+# Plans
+# ───────────────────────────────
+def walk(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from walk(child)
+
+
+def first_relation(node):
+    # Sorts and hashes sit above the scan whose rows they consume
+    return next((child["Relation Name"] for child in walk(node) if "Relation Name" in child), None)
+
+
+def explain_postgresql(sql, params):
+    """
+    Findings, index names used and buffers read by one statement.
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        transaction.set_rollback(True)
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    root = plan[0]["Plan"]
+
+    findings, indexes = [], set()
+    for node in walk(root):
+        node_type = node["Node Type"]
+        if "Index Name" in node:
+            indexes.add(node["Index Name"])
+        if node_type == "Seq Scan" and node.get("Rows Removed by Filter", 0):
+            findings.append({
+                "kind": "seq_scan",
+                "table": node["Relation Name"],
+                "detail": f"Seq Scan on {node['Relation Name']}: {node['Rows Removed by Filter']} rows "
+                          f"removed by filter, {node['Actual Rows']} kept (x{node['Actual Loops']} loops)",
+            })
+        elif node_type == "Sort" and node.get("Sort Space Type") == "Disk":
+            findings.append({
+                "kind": "sort_spill",
+                "table": first_relation(node),
+                "detail": f"Sort spilled to disk ({node.get('Sort Method')}, {node.get('Sort Space Used')} kB) "
+                          f"on {', '.join(node.get('Sort Key', []))}",
+            })
+        elif node_type == "Hash" and node.get("Hash Batches", 1) > 1:
+            findings.append({
+                "kind": "hash_spill",
+                "table": first_relation(node),
+                "detail": f"Hash spilled to disk ({node['Hash Batches']} batches)",
+            })
+
+    buffers = {
+        "shared_hit": root.get("Shared Hit Blocks", 0),
+        "shared_read": root.get("Shared Read Blocks", 0),
+        "temp_written": root.get("Temp Written Blocks", 0),
+    }
+    return findings, indexes, buffers, root.get("Actual Total Time")
+
+
+def explain_sqlite(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        rows = cursor.fetchall()
+
+    aliases = {alias: table for table, alias in ALIAS.findall(sql)}
+    findings, indexes = [], set()
+    first_table = None
+    for row in rows:
+        detail = row[-1]
+        indexes.update(SQLITE_INDEX.findall(detail))
+        scan = SQLITE_SCAN.match(detail)
+        if scan:
+            name, alias, rest = scan.groups()
+            table = aliases.get(name, name)
+            first_table = first_table or table
+            if "INDEX" not in rest:
+                findings.append({"kind": "seq_scan", "table": table, "detail": detail})
+        elif detail.startswith("SEARCH"):
+            first_table = first_table or aliases.get(detail.split()[1], detail.split()[1])
+        elif detail.startswith("USE TEMP B-TREE FOR ORDER BY"):
+            findings.append({"kind": "temp_sort", "table": first_table, "detail": detail})
+    return findings, indexes, None, None
+
+
+def explain(sql, params):
+    if connection.vendor == "postgresql":
+        return explain_postgresql(sql, params)
+    return explain_sqlite(sql, params)
+
+
+# ───────────────────────────────
+# Index suggestions
+# ───────────────────────────────
+def models_by_table():
+    return {model._meta.db_table: model for model in apps.get_models()}
+
+
+def existing_indexes(model):
+    """
+    Field-name tuples of every index the model already has (pk, unique and
+    db_index fields, foreign keys, Meta.indexes, unique constraints).
+    """
+    indexes = [(model._meta.pk.name,)]
+    for field in model._meta.concrete_fields:
+        if field.unique or field.db_index:
+            indexes.append((field.name,))
+    for index in model._meta.indexes:
+        indexes.append(tuple(name.lstrip("-") for name in index.fields))
+    for constraint in model._meta.constraints:
+        if getattr(constraint, "fields", None):
+            indexes.append(tuple(constraint.fields))
+    indexes.extend(tuple(fields) for fields in model._meta.unique_together)
+    return indexes
+
+
+def field_name(model, column):
+    for field in model._meta.concrete_fields:
+        if field.column == column:
+            return field.name
+    return None
+
+
+def select_blocks(sql):
+    """
+    The statement and each parenthesised subquery, with the subqueries
+    nested in it replaced by "(...)".
+    """
+    blocks, stack, parts = [], [], [[]]
+    for char in sql:
+        if char == "(":
+            stack.append(len(parts[-1]))
+            parts.append([])
+        elif char == ")" and stack:
+            stack.pop()
+            inner = "".join(parts.pop())
+            if inner.lstrip().upper().startswith("SELECT"):
+                blocks.append(inner)
+                parts[-1].append("(...)")
+            else:
+                parts[-1].append(f"({inner})")
+        else:
+            parts[-1].append(char)
+    return ["".join(parts[0])] + blocks
+
+
+def clause(block, keyword, ends):
+    """
+    Text of the `keyword` clause (WHERE, ORDER BY) up to the next of `ends`.
+    """
+    match = re.search(rf"\b{keyword}\b(.*?)(?:\b(?:{'|'.join(ends)})\b|$)", block, re.IGNORECASE | re.DOTALL)
+    return match.group(1) if match else ""
+
+
+def suggest_index(sql, table, model):
+    """
+    Index columns for `table` from a statement's predicates and ORDER BY,
+    or None when there's nothing to index or an index already covers it.
+    """
+    aliases = {alias for name, alias in ALIAS.findall(sql) if name == table}
+
+    def on_table(quoted, alias):
+        return quoted == table or alias in aliases
+
+    equality, ranges, ordering = [], [], []
+    for block in select_blocks(sql):
+        where = clause(block, "WHERE", ["GROUP BY", "ORDER BY", "LIMIT", "OFFSET", "FOR UPDATE"])
+        for quoted, alias, column, operator in PREDICATE.findall(where):
+            if on_table(quoted, alias):
+                (equality if operator.upper() in EQUALITY_OPERATORS else ranges).append(column)
+        for match in BOOLEAN_COLUMN.finditer(where):
+            quoted, alias, column = match.groups()
+            # Not the right-hand side of a comparison: = ("t"."id")
+            compared = re.search(r"(=|<|>|\bIN)\s*$", where[: match.start()])
+            if on_table(quoted, alias) and not compared:
+                equality.append(column)
+        order_by = clause(block, "ORDER BY", ["LIMIT", "OFFSET", "FOR UPDATE"])
+        for quoted, alias, column, descending in ORDER_COLUMN.findall(order_by):
+            if on_table(quoted, alias):
+                ordering.append(("-" if descending else "") + column)
+
+    columns = list(dict.fromkeys(equality)) + ranges[:1] + ordering
+    fields = []
+    for column in columns:
+        name = field_name(model, column.lstrip("-"))
+        if name and name not in [field.lstrip("-") for field in fields]:
+            fields.append(("-" if column.startswith("-") else "") + name)
+    fields = fields[:MAX_INDEX_COLUMNS]
+    if not fields:
+        return None
+
+    wanted = tuple(field.lstrip("-") for field in fields)
+    for index in existing_indexes(model):
+        if index[: len(wanted)] == wanted:
+            return None
+    return tuple(fields)
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN every SQL statement of every API route and suggest missing indexes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=50, help="Seeded users (default: 50)")
+        parser.add_argument("--products", type=int, default=500, help="Seeded products (default: 500)")
+        parser.add_argument("--orders", type=int, default=5000, help="Seeded orders (default: 5000)")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed for the dataset (default: 42)")
+        parser.add_argument("--route", action="append", help="Only explain this route (repeatable), e.g. orders/")
+        parser.add_argument("--verbose-sql", action="store_true", help="Print each statement with a finding")
+        parser.add_argument("--output", help="Write the report as JSON to this file")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with override_settings(READ_REPLICAS=[], REQUEST_PROFILING_SAMPLE_RATE=0, THROTTLING_ENABLED=False):
+                started = time.perf_counter()
+                seeding.seed(options["users"], options["products"], options["orders"], options["seed"])
+                # Planner statistics for the freshly seeded tables
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE")
+                self.stdout.write(f"Seeded in {time.perf_counter() - started:.1f}s ({connection.vendor})")
+                report = self.run(Fixtures(options["seed"]), options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.print_report(report, options["verbose_sql"])
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+
+    def run(self, fixtures, options):
+        tables = models_by_table()
+        routes, suggestions, used_indexes = [], {}, set()
+
+        for pattern in api_urls.urlpatterns:
+            if not isinstance(pattern, URLPattern):
+                continue
+            route = str(pattern.pattern)
+            if options["route"] and route not in options["route"]:
+                continue
+            recipe = RECIPES.get(route)
+            if recipe is None:
+                routes.append({"route": route, "skipped": "no request recipe"})
+                continue
+
+            client, method, path, data = recipe(fixtures, 0)
+            kwargs = {"data": data, "format": "json"} if data is not None else {}
+            recorder = StatementRecorder()
+            with connection.execute_wrapper(recorder):
+                response = getattr(client, method)(API_PREFIX + path, **kwargs)
+
+            statements = []
+            for sql, params in recorder.statements.items():
+                findings, indexes, buffers, total_ms = explain(sql, params)
+                used_indexes |= indexes
+                for finding in findings:
+                    model = tables.get(finding["table"])
+                    index = suggest_index(sql, finding["table"], model) if model else None
+                    if index:
+                        finding["suggested_index"] = list(index)
+                        key = (model._meta.label, index)
+                        suggestions.setdefault(key, set()).add(route)
+                statements.append({
+                    "sql": sql,
+                    "findings": findings,
+                    "buffers": buffers,
+                    "total_ms": total_ms,
+                })
+            routes.append({"route": route, "status": response.status_code, "statements": statements})
+
+        unused = [
+            {"model": model._meta.label, "index": index.name, "fields": list(index.fields)}
+            for model in tables.values()
+            for index in model._meta.indexes
+            if index.name and model._meta.app_label in ("orders", "carts", "products")
+            and index.name not in used_indexes
+        ]
+        return {
+            "database": connection.vendor,
+            "routes": routes,
+            "suggested_indexes": [
+                {"model": label, "fields": list(fields), "routes": sorted(by_routes)}
+                for (label, fields), by_routes in sorted(suggestions.items())
+            ],
+            "unused_indexes": unused,
+        }
+
+    def print_report(self, report, verbose_sql):
+        self.stdout.write("")
+        for row in report["routes"]:
+            if "skipped" in row:
+                self.stdout.write(f"{row['route']:<30}  skipped: {row['skipped']}")
+                continue
+            statements = row["statements"]
+            flagged = [statement for statement in statements if statement["findings"]]
+            read = sum((statement["buffers"] or {}).get("shared_read", 0) for statement in statements)
+            line = f"{row['route']:<30}{row['status']:>5}{len(statements):>5} statements"
+            if report["database"] == "postgresql":
+                line += f", {read} blocks read"
+            self.stdout.write(line)
+            for statement in flagged:
+                for finding in statement["findings"]:
+                    suggestion = finding.get("suggested_index")
+                    self.stdout.write(
+                        self.style.WARNING(f"    {finding['kind']}: {finding['detail']}")
+                        + (f"  -> index {tuple(suggestion)}" if suggestion else "")
+                    )
+                if verbose_sql:
+                    self.stdout.write(f"      {statement['sql']}")
+
+        self.stdout.write("")
+        self.stdout.write(self.style.MIGRATE_HEADING("Suggested indexes"))
+        if not report["suggested_indexes"]:
+            self.stdout.write("  none")
+        for suggestion in report["suggested_indexes"]:
+            fields = ", ".join(f'"{field}"' for field in suggestion["fields"])
+            self.stdout.write(f"  {suggestion['model']}: models.Index(fields=[{fields}])")
+            self.stdout.write(f"    used by {', '.join(suggestion['routes'])}")
+
+        self.stdout.write("")
+        self.stdout.write(self.style.MIGRATE_HEADING("Meta.indexes not used by any captured plan"))
+        if not report["unused_indexes"]:
+            self.stdout.write("  none")
+        for index in report["unused_indexes"]:
+            self.stdout.write(f"  {index['model']}.{index['index']} ({', '.join(index['fields'])})")
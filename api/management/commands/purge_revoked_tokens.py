@@ -0,0 +1,13 @@
+# api/management/commands/purge_revoked_tokens.py
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.models import RevokedToken
+
+
+class Command(BaseCommand):
+    help = "Delete revoked refresh tokens that have expired anyway (run daily)."
+
+    def handle(self, *args, **options):
+        deleted, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+        self.stdout.write(self.style.SUCCESS(f"Purged {deleted} expired revoked tokens."))
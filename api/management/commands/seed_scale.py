@@ -0,0 +1,61 @@
+# api/management/commands/seed_scale.py
+"""
+Generate a large, realistic, deterministic dataset for scale testing
+(see api/seeding.py). Example:
+
+    manage.py seed_scale --products 20000 --users 100000 --orders 1000000
+
+Seeded users log in with api.seeding.SEED_PASSWORD. Product image paths
+point at products/seed/<category>-NN.jpg; drop placeholder images there
+if the admin should show them.
+"""
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from api import seeding
+
+
+class Command(BaseCommand):
+    help = "Seed users, products, carts and historical orders in chunks (deterministic per --seed)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=1000, help="Products to create (default: 1000)")
+        parser.add_argument("--users", type=int, default=1000, help="Users to create (default: 1000)")
+        parser.add_argument("--orders", type=int, default=10000, help="Historical orders to create (default: 10000)")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed; the same seed gives the same data (default: 42)")
+        parser.add_argument("--days", type=int, default=365, help="Spread orders over this many past days (default: 365)")
+        parser.add_argument("--cart-ratio", type=float, default=0.3, help="Share of users with an open cart (default: 0.3)")
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Rows per bulk_create / transaction (default: 5000)")
+        parser.add_argument("--rollups", action="store_true", help="Rebuild the sales rollups afterwards")
+
+    def handle(self, *args, **options):
+        if options["products"] < 1 or options["users"] < 1:
+            raise CommandError("--products and --users must be at least 1.")
+        if options["orders"] > seeding.MAX_ORDERS:
+            raise CommandError(f"Order numbers allow at most {seeding.MAX_ORDERS:,} orders per seed.")
+        if not 0 <= options["seed"] < seeding.MAX_SEED:
+            raise CommandError(f"--seed must be between 0 and {seeding.MAX_SEED - 1}.")
+        prefix = seeding.order_number_prefix(options["seed"])
+        if (
+            seeding.User.objects.filter(username=seeding.seeded_username(options["seed"], 0)).exists()
+            or seeding.Order.objects.filter(order_number__startswith=prefix).exists()
+        ):
+            raise CommandError(f"Seed {options['seed']} is already in this database; pick another --seed.")
+
+        started = time.perf_counter()
+        seeder = seeding.Seeder(
+            seed=options["seed"],
+            chunk_size=options["chunk_size"],
+            days=options["days"],
+            log=lambda message: self.stdout.write(f"[{time.perf_counter() - started:7.1f}s] {message}"),
+        )
+        created = seeder.run(options["users"], options["products"], options["orders"], options["cart_ratio"])
+
+        # Bulk inserts bypass the post_save rollup signals
+        if options["rollups"]:
+            call_command("backfill_sales_rollups", stdout=self.stdout)
+
+        summary = ", ".join(f"{count} {name}" for name, count in created.items())
+        self.stdout.write(self.style.SUCCESS(f"Created {summary} in {time.perf_counter() - started:.1f}s"))
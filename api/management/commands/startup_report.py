@@ -0,0 +1,133 @@
+# api/management/commands/startup_report.py
+"""
+Cold-start report per deployment profile (settings.DEPLOYMENT_PROFILE).
+
+Starts fresh interpreters that do what a worker does before serving its
+first request (django.setup(), build the WSGI handler and its middleware
+chain, import the URLconf and every view) and reports:
+
+- process wall time and time to ready (median of --runs);
+- RSS once ready (per-worker baseline memory);
+- installed apps, middleware and URL patterns loaded;
+- the top-level packages that take longest to import (-X importtime).
+
+--output writes JSON so the numbers can be tracked across commits.
+"""
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+PROFILES = ["full", "api"]
+
+# Runs in the child interpreter
+PROBE = """
+import json, re, resource, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.urls import get_resolver
+
+WSGIHandler()  # loads the middleware chain
+patterns = get_resolver().url_patterns  # imports the URLconf and the views
+ready = time.perf_counter() - started
+
+def count(patterns):
+    return sum(count(p.url_patterns) if hasattr(p, "url_patterns") else 1 for p in patterns)
+
+try:
+    with open("/proc/self/status") as status:
+        rss_kb = int(re.search(r"VmRSS:\\s+(\\d+)", status.read()).group(1))
+except OSError:
+    # ru_maxrss is in bytes on macOS, KB elsewhere
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // (1024 if sys.platform == "darwin" else 1)
+
+print("PROBE " + json.dumps({
+    "ready_ms": ready * 1000,
+    "rss_mb": rss_kb / 1024,
+    "apps": len(settings.INSTALLED_APPS),
+    "middleware": len(settings.MIDDLEWARE),
+    "urls": count(patterns),
+}))
+"""
+
+IMPORT_TIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def run_probe(profile, import_time=False):
+    env = {**os.environ, "DEPLOYMENT_PROFILE": profile}
+    command = [sys.executable] + (["-X", "importtime"] if import_time else []) + ["-c", PROBE]
+    started = time.perf_counter()
+    result = subprocess.run(command, env=env, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - started) * 1000
+    lines = [line for line in result.stdout.splitlines() if line.startswith("PROBE ")]
+    if result.returncode or not lines:
+        raise CommandError(f"{profile} profile failed to start:\n{result.stderr[-2000:]}")
+    return {"wall_ms": wall_ms, **json.loads(lines[-1][len("PROBE "):])}, result.stderr
+
+
+def slowest_imports(stderr, top):
+    # Top-level imports only (no indentation): their cumulative time
+    # includes everything they pulled in
+    packages = {}
+    for match in IMPORT_TIME.finditer(stderr):
+        _, cumulative, indent, name = match.groups()
+        if not indent:
+            package = name.split(".")[0]
+            packages[package] = packages.get(package, 0) + int(cumulative) / 1000
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+class Command(BaseCommand):
+    help = "Report worker cold-start time, RSS and slowest imports per deployment profile."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profile", action="append", choices=PROFILES, help="Profile to measure (repeatable; default: all)")
+        parser.add_argument("--runs", type=int, default=5, help="Cold starts per profile (default: 5)")
+        parser.add_argument("--top", type=int, default=10, help="Slowest top-level imports to list (default: 10)")
+        parser.add_argument("--output", help="Write the report as JSON to this file")
+
+    def handle(self, *args, **options):
+        profiles = options["profile"] or PROFILES
+        runs = {profile: [] for profile in profiles}
+        # Interleaved, so load changes on the machine hit every profile alike
+        for _ in range(options["runs"]):
+            for profile in profiles:
+                runs[profile].append(run_probe(profile)[0])
+
+        report = {}
+        for profile in profiles:
+            samples = runs[profile]
+            _, stderr = run_probe(profile, import_time=True)
+            report[profile] = {
+                **{key: samples[0][key] for key in ("apps", "middleware", "urls")},
+                **{
+                    key: round(statistics.median(run[key] for run in samples), 1)
+                    for key in ("wall_ms", "ready_ms", "rss_mb")
+                },
+                "slowest_imports_ms": {name: round(ms, 1) for name, ms in slowest_imports(stderr, options["top"])},
+            }
+            self.print_profile(profile, report[profile])
+
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+
+    def print_profile(self, profile, row):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{profile} profile"))
+        self.stdout.write(
+            f"  process {row['wall_ms']:.0f} ms, ready after {row['ready_ms']:.0f} ms, RSS {row['rss_mb']:.1f} MB"
+        )
+        self.stdout.write(f"  {row['apps']} apps, {row['middleware']} middleware, {row['urls']} URL patterns")
+        self.stdout.write("  slowest imports (cumulative ms, -X importtime):")
+        for name, ms in row["slowest_imports_ms"].items():
+            self.stdout.write(f"    {name:<28}{ms:>8.1f}")
@@ -1,3 +1,16 @@
 from django.db import models
 
-# Create your models here.
+
+class RevokedToken(models.Model):
+    """
+    A refresh token that may no longer be used (rotated or revoked).
+    Read through api.revocation, which keeps a Bloom filter of these JTIs
+    in memory so valid refreshes never need a lookup here.
+    """
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True, help_text="Row can be purged after this (token expiry)")
+    # Indexed: processes sync their filters by revoked_at window
+    revoked_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"Revoked {self.jti}"
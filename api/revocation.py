@@ -0,0 +1,184 @@
+# api/revocation.py
+"""
+Refresh-token revocation store with an in-memory Bloom filter.
+
+Every rotated refresh token's JTI is written to RevokedToken. Each
+process keeps a Bloom filter of the unexpired JTIs:
+- it is synced every JWT_REVOCATION_SYNC_SECONDS with the rows revoked
+  since the last sync, minus JWT_REVOCATION_SYNC_OVERLAP_SECONDS. The
+  window is on revoked_at, not on ids: ids are handed out before
+  commit, so a row can become visible after rows with higher ids;
+- it is rebuilt (dropping expired JTIs) every
+  JWT_REVOCATION_REBUILD_SECONDS in a background thread and swapped in
+  when ready. Requests keep using the previous filter meanwhile, or the
+  table before the first build is ready;
+- a JTI the filter has never seen is definitely not revoked: no query;
+- a possible match (real or false positive) is confirmed in the table.
+
+Revoking is an INSERT on the unique jti column, so two concurrent
+refreshes with the same token cannot both succeed.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from .models import RevokedToken
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings (double hashing on blake2b).
+    """
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class RevocationStore:
+    def __init__(self, sync_seconds, rebuild_seconds, error_rate, overlap_seconds=30, min_capacity=10_000, background=True):
+        self.sync_seconds = sync_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self.error_rate = error_rate
+        self.overlap = timedelta(seconds=overlap_seconds)
+        self.min_capacity = min_capacity
+        # False: rebuild inline (tests, commands)
+        self.background = background
+
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self._rebuilding = False
+        self._filter = None
+        self._capacity = 0
+        self._count = 0
+        self._synced_until = None
+        self._built_at = 0.0
+        self._synced_at = 0.0
+
+    # ───────────────────────────────
+    # Filter maintenance
+    # ───────────────────────────────
+    def rebuild(self):
+        """
+        Build a filter of the unexpired JTIs and swap it in.
+        """
+        try:
+            cutoff = timezone.now()
+            live = RevokedToken.objects.filter(expires_at__gt=cutoff)
+            capacity = max(self.min_capacity, live.count() * 2)
+            bloom = BloomFilter(capacity, self.error_rate)
+
+            count = 0
+            for jti in live.values_list("jti", flat=True).iterator(chunk_size=5000):
+                bloom.add(jti)
+                count += 1
+
+            with self._lock:
+                self._filter, self._capacity, self._count = bloom, capacity, count
+                self._synced_until = cutoff
+                self._built_at = time.monotonic()
+                # Rows revoked while the filter was being built
+                self._sync()
+        finally:
+            with self._rebuild_lock:
+                self._rebuilding = False
+
+    def _rebuild_in_background(self):
+        try:
+            self.rebuild()
+        finally:
+            # The thread's own database connection
+            connection.close()
+
+    def _start_rebuild(self):
+        with self._rebuild_lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        if self.background:
+            threading.Thread(target=self._rebuild_in_background, name="revocation-rebuild", daemon=True).start()
+        else:
+            self.rebuild()
+
+    def _sync(self):
+        # Caller holds self._lock
+        since = self._synced_until - self.overlap
+        until = timezone.now()
+        rows = RevokedToken.objects.filter(revoked_at__gte=since).values_list("jti", "revoked_at")
+        for jti, revoked_at in rows.iterator(chunk_size=5000):
+            self._filter.add(jti)
+            # Rows in the overlap were counted by the previous sync
+            if revoked_at >= self._synced_until:
+                self._count += 1
+        self._synced_until = until
+        self._synced_at = time.monotonic()
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._filter is None or now - self._built_at >= self.rebuild_seconds or self._count > self._capacity:
+            self._start_rebuild()
+        if self._filter is not None and now - self._synced_at >= self.sync_seconds:
+            # One thread syncs; the others go on with the filter as it is
+            if self._lock.acquire(blocking=False):
+                try:
+                    if now - self._synced_at >= self.sync_seconds:
+                        self._sync()
+                finally:
+                    self._lock.release()
+
+    # ───────────────────────────────
+    # Public API
+    # ───────────────────────────────
+    def is_revoked(self, jti):
+        self._refresh()
+        bloom = self._filter
+        if bloom is not None and jti not in bloom:
+            return False
+        # Possible match (false positives are rare), or no filter yet
+        return RevokedToken.objects.filter(jti=jti).exists()
+
+    def revoke(self, jti, expires_at):
+        """
+        Revoke a JTI. Returns False when it was already revoked
+        (e.g. the same refresh token used twice concurrently).
+        """
+        try:
+            with transaction.atomic():
+                RevokedToken.objects.create(jti=jti, expires_at=expires_at)
+        except IntegrityError:
+            return False
+
+        self._refresh()
+        bloom = self._filter
+        if bloom is not None:
+            bloom.add(jti)
+        return True
+
+
+revoked_tokens = RevocationStore(
+    sync_seconds=getattr(settings, "JWT_REVOCATION_SYNC_SECONDS", 5),
+    rebuild_seconds=getattr(settings, "JWT_REVOCATION_REBUILD_SECONDS", 600),
+    error_rate=getattr(settings, "JWT_REVOCATION_ERROR_RATE", 0.001),
+    overlap_seconds=getattr(settings, "JWT_REVOCATION_SYNC_OVERLAP_SECONDS", 30),
+)
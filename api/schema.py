@@ -0,0 +1,156 @@
+# api/schema.py
+"""
+Precomputed OpenAPI schema (/api/schema/).
+
+drf-spectacular introspects every view and serializer on each schema
+request, and Swagger UI / Redoc fetch the schema on every page load.
+CachedSchemaView serves pre-rendered bytes instead:
+
+- OPENAPI_SCHEMA_PRECOMPUTED (production): `manage.py build_schema` at
+  deploy time writes schema.yaml / schema.json and gzipped copies to
+  OPENAPI_SCHEMA_DIR; each process reads them once.
+- Otherwise (development): the schema is generated on the first request
+  and kept for the life of the process. runserver restarts on every code
+  change, so edits show up on the next request.
+
+Responses carry a content-hash ETag (conditional requests get a 304) and
+are sent gzipped to clients that accept it. Requests for another
+language or API version (?lang=, ?version=) are generated live.
+"""
+import gzip
+import hashlib
+import logging
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+
+
+logger = logging.getLogger(__name__)
+
+RENDERERS = {"yaml": OpenApiYamlRenderer, "json": OpenApiJsonRenderer}
+
+
+class SchemaDocument:
+    """
+    One rendered schema format: raw bytes, gzipped bytes and ETag.
+    """
+
+    def __init__(self, content, compressed=None):
+        self.content = content
+        # mtime=0: the same schema always compresses to the same bytes
+        self.compressed = compressed if compressed is not None else gzip.compress(content, 9, mtime=0)
+        self.etag = '"%s"' % hashlib.sha256(content).hexdigest()[:32]
+
+
+def generate():
+    """
+    Render the schema in every format: {format: bytes}.
+    """
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    return {
+        name: renderer().render(schema, renderer_context={})
+        for name, renderer in RENDERERS.items()
+    }
+
+
+def schema_dir():
+    return Path(settings.OPENAPI_SCHEMA_DIR)
+
+
+def write(directory=None):
+    """
+    Write schema.<format> and schema.<format>.gz; returns the paths.
+    """
+    directory = Path(directory or schema_dir())
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name, content in generate().items():
+        document = SchemaDocument(content)
+        for path, data in (
+            (directory / f"schema.{name}", document.content),
+            (directory / f"schema.{name}.gz", document.compressed),
+        ):
+            path.write_bytes(data)
+            paths.append(path)
+    return paths
+
+
+class SchemaCache:
+    """
+    Per-process {format: SchemaDocument}, loaded once.
+    """
+
+    def __init__(self):
+        self._documents = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if settings.OPENAPI_SCHEMA_PRECOMPUTED:
+            directory = schema_dir()
+            try:
+                return {
+                    name: SchemaDocument(
+                        (directory / f"schema.{name}").read_bytes(),
+                        (directory / f"schema.{name}.gz").read_bytes(),
+                    )
+                    for name in RENDERERS
+                }
+            except FileNotFoundError:
+                # Still serve docs, at the cost of one generation per process
+                logger.warning("No precomputed OpenAPI schema in %s; run `manage.py build_schema`", directory)
+        return {name: SchemaDocument(content) for name, content in generate().items()}
+
+    def get(self, name):
+        if self._documents is None:
+            with self._lock:
+                if self._documents is None:
+                    self._documents = self.load()
+        return self._documents[name]
+
+    def clear(self):
+        self._documents = None
+
+
+documents = SchemaCache()
+
+
+class CachedSchemaView(SpectacularAPIView):
+    """
+    SpectacularAPIView serving the cached schema (see module docstring).
+    """
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        if request.GET.get("lang") or request.GET.get("version"):
+            return super().get(request, *args, **kwargs)
+
+        renderer, media_type = self.perform_content_negotiation(request)
+        document = documents.get(renderer.format)
+
+        # "a", "b" lists and weak W/"a" validators match too (RFC 9110)
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+        if "*" in if_none_match or document.etag in [etag.removeprefix("W/") for etag in if_none_match]:
+            response = HttpResponseNotModified()
+        else:
+            content_type = f"{media_type}; charset={renderer.charset}" if renderer.charset else media_type
+            if "gzip" in request.headers.get("Accept-Encoding", ""):
+                response = HttpResponse(document.compressed, content_type=content_type)
+                response["Content-Encoding"] = "gzip"
+            else:
+                response = HttpResponse(document.content, content_type=content_type)
+            response["Content-Disposition"] = f'inline; filename="{self._get_filename(request, None)}"'
+
+        response["ETag"] = document.etag
+        response["Cache-Control"] = "public, max-age=0, must-revalidate"
+        patch_vary_headers(response, ("Accept", "Accept-Encoding"))
+        return response
@@ -0,0 +1,330 @@
+# api/seeding.py
+"""
+Deterministic synthetic data for benchmarks and scale testing.
+
+The same seed always produces the same users, products, carts and
+orders (including primary keys), so runs on different commits or
+machines see the same dataset. Rows are generated and inserted in
+chunks (bulk_create, one transaction per chunk), so memory stays flat
+and a million orders take minutes, not hours.
+
+Everything is prefixed with the seed (usernames, slugs, order numbers),
+so several seeds can live in one database.
+"""
+import random
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from carts.models import Cart, CartItem
+from orders.models import Order, OrderItem
+from products.models import Product
+
+
+User = get_user_model()
+
+SEED_PASSWORD = "Seed@12345"
+CENT = Decimal("0.01")
+
+# category: (price range in cents, product nouns)
+CATALOG = {
+    "Drinks": ((199, 1999), ["Smoothie", "Cold Brew", "Green Tea", "Lemonade", "Kombucha", "Espresso Beans"]),
+    "Clothes": ((1499, 14999), ["T-Shirt", "Hoodie", "Jeans", "Rain Jacket", "Sneakers", "Wool Socks"]),
+    "Electronics": ((1999, 99999), ["Headphones", "Charger", "Smart Speaker", "Keyboard", "Webcam", "Power Bank"]),
+    "Books": ((799, 4999), ["Cookbook", "Novel", "Atlas", "Field Guide", "Poetry Collection", "Workbook"]),
+    "Home": ((999, 29999), ["Desk Lamp", "Throw Blanket", "Chef Knife", "Plant Pot", "Candle Set", "Cutting Board"]),
+    "Toys": ((599, 7999), ["Puzzle", "Building Blocks", "Plush Bear", "Kite", "Board Game", "Train Set"]),
+    "Sports": ((999, 39999), ["Yoga Mat", "Water Bottle", "Dumbbells", "Tennis Racket", "Bike Helmet", "Jump Rope"]),
+    "Beauty": ((499, 8999), ["Face Serum", "Lip Balm", "Shampoo", "Sunscreen", "Hand Cream", "Clay Mask"]),
+}
+CATEGORY_WEIGHTS = [8, 14, 10, 12, 16, 8, 12, 20]
+ADJECTIVES = ["Classic", "Organic", "Premium", "Everyday", "Deluxe", "Compact", "Eco", "Vintage", "Ultra", "Family"]
+TAX_RATES = [Decimal("0.00"), Decimal("5.00"), Decimal("13.00"), Decimal("15.00")]
+TAX_WEIGHTS = [15, 25, 40, 20]
+DISCOUNTS = [Decimal("0.90"), Decimal("0.85"), Decimal("0.75"), Decimal("0.50")]
+IMAGE_VARIANTS = 12
+
+# Order numbers: ORD- + 3 base-36 digits of the seed + 7-digit index
+BASE36 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+MAX_SEED = 36 ** 3
+MAX_ORDERS = 10 ** 7
+
+CITIES = [
+    ("Toronto", "ON", "M5V"), ("Montreal", "QC", "H2X"), ("Vancouver", "BC", "V6B"),
+    ("Calgary", "AB", "T2P"), ("Ottawa", "ON", "K1P"), ("Halifax", "NS", "B3H"),
+    ("Winnipeg", "MB", "R3C"), ("Quebec City", "QC", "G1R"),
+]
+PAYMENT_PROVIDERS = ["Stripe", "PayPal"]
+PAID_STATUSES = {
+    Order.Status.PAID, Order.Status.PROCESSING, Order.Status.SHIPPED,
+    Order.Status.DELIVERED, Order.Status.COMPLETED, Order.Status.REFUNDED,
+}
+
+
+def seeded_username(seed, index):
+    return f"seed{seed}-user-{index:07d}"
+
+
+def order_number_prefix(seed):
+    """
+    "ORD-" + the seed in three base-36 digits: distinct for every seed
+    in [0, MAX_SEED), so seeds never share order numbers.
+    """
+    if not 0 <= seed < MAX_SEED:
+        raise ValueError(f"seed must be in [0, {MAX_SEED})")
+    digits = ""
+    for _ in range(3):
+        seed, digit = divmod(seed, 36)
+        digits = BASE36[digit] + digits
+    return f"ORD-{digits}"
+
+
+def seeded_order_number(seed, index):
+    # Matches the ORD-XXXXXXXXXX format (orders/search.py)
+    return f"{order_number_prefix(seed)}{index:07d}"
+
+
+def chunked(count, size):
+    for start in range(0, count, size):
+        yield range(start, min(start + size, count))
+
+
+def create_with_history(model, rows):
+    """
+    bulk_create `rows`, then write back the created_at values generated
+    for them: auto_now_add stamps now() on insert (and on the instances).
+    """
+    created_at = [row.created_at for row in rows]
+    model.objects.bulk_create(rows)
+    for row, value in zip(rows, created_at):
+        row.created_at = value
+    model.objects.bulk_update(rows, ["created_at"])
+
+
+def inherit_created_at(model, parent_field, parents):
+    """
+    Give the children of `parents` their parent's created_at, in one UPDATE.
+    """
+    parent_model = model._meta.get_field(parent_field).related_model
+    parent_created_at = parent_model.objects.filter(pk=OuterRef(f"{parent_field}_id")).values("created_at")
+    model.objects.filter(**{f"{parent_field}__in": parents}).update(created_at=Subquery(parent_created_at))
+
+
+class Seeder:
+    def __init__(self, seed=42, chunk_size=5000, days=365, log=None):
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.days = days
+        self.log = log or (lambda message: None)
+        self.rng = random.Random(seed)
+        self.now = timezone.now().replace(microsecond=0)
+
+    def uuid(self):
+        # Deterministic primary keys (uuid4 would differ on every run)
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def skewed(self, count):
+        # Index in [0, count) favouring low indexes: a few best-selling
+        # products and loyal customers, a long tail of the rest
+        return int(count * self.rng.random() ** 2)
+
+    def past(self, max_days=None):
+        seconds = self.rng.randrange(int((max_days or self.days) * 86400))
+        return self.now - timedelta(seconds=seconds)
+
+    def run(self, users, products, orders, cart_ratio=0.3):
+        user_ids = self.seed_users(users)
+        catalog = self.seed_products(products)
+        carts = self.seed_carts(user_ids, catalog, cart_ratio)
+        order_count, item_count = self.seed_orders(orders, user_ids, catalog)
+        return {
+            "users": len(user_ids),
+            "products": len(catalog),
+            "carts": carts,
+            "orders": order_count,
+            "order_items": item_count,
+        }
+
+    # ───────────────────────────────
+    # Users
+    # ───────────────────────────────
+    def seed_users(self, count):
+        # Hash once: every seeded user shares SEED_PASSWORD
+        password = make_password(SEED_PASSWORD)
+        user_ids = []
+        for indexes in chunked(count, self.chunk_size):
+            rows = []
+            for index in indexes:
+                username = seeded_username(self.seed, index)
+                rows.append(User(
+                    username=username,
+                    email=f"{username}@example.com",
+                    password=password,
+                    first_name=f"Customer{index}",
+                    date_joined=self.past(),
+                ))
+            with transaction.atomic():
+                user_ids.extend(user.pk for user in User.objects.bulk_create(rows))
+            self.log(f"users: {len(user_ids)}/{count}")
+        return user_ids
+
+    # ───────────────────────────────
+    # Catalog
+    # ───────────────────────────────
+    def seed_products(self, count):
+        categories = list(CATALOG)
+        catalog = []
+        for indexes in chunked(count, self.chunk_size):
+            rows = []
+            for index in indexes:
+                category = self.rng.choices(categories, CATEGORY_WEIGHTS)[0]
+                (low, high), nouns = CATALOG[category]
+                name = f"{self.rng.choice(ADJECTIVES)} {self.rng.choice(nouns)} {index}"
+                price = Decimal(self.rng.randint(low, high)) / 100
+                discount_price = None
+                if self.rng.random() < 0.25:
+                    discount_price = (price * self.rng.choice(DISCOUNTS)).quantize(CENT)
+                image = None
+                if self.rng.random() < 0.9:
+                    image = f"products/seed/{category.lower()}-{self.rng.randrange(IMAGE_VARIANTS):02d}.jpg"
+                rows.append(Product(
+                    id=self.uuid(),
+                    name=name,
+                    slug=f"seed{self.seed}-product-{index:07d}",
+                    description=f"{name}: a seeded {category.lower()} product.",
+                    price=price,
+                    discount_price=discount_price,
+                    tax_percent=self.rng.choices(TAX_RATES, TAX_WEIGHTS)[0],
+                    stock=self.rng.randint(0, 500) if self.rng.random() < 0.95 else 0,
+                    is_active=self.rng.random() < 0.97,
+                    image=image,
+                    category=category,
+                    created_at=self.past(),
+                ))
+            with transaction.atomic():
+                create_with_history(Product, rows)
+            catalog.extend(rows)
+            self.log(f"products: {len(catalog)}/{count}")
+        return catalog
+
+    # ───────────────────────────────
+    # Carts
+    # ───────────────────────────────
+    def seed_carts(self, user_ids, catalog, cart_ratio):
+        created = 0
+        for indexes in chunked(len(user_ids), self.chunk_size):
+            carts, items = [], []
+            for index in indexes:
+                if self.rng.random() >= cart_ratio:
+                    continue
+                cart = Cart(id=self.uuid(), user_id=user_ids[index], created_at=self.past(30))
+                carts.append(cart)
+                products = {self.skewed(len(catalog)) for _ in range(self.rng.randint(1, 5))}
+                for product_index in sorted(products):
+                    items.append(CartItem(
+                        id=self.uuid(),
+                        cart=cart,
+                        product=catalog[product_index],
+                        quantity=self.rng.randint(1, 3),
+                    ))
+            with transaction.atomic():
+                create_with_history(Cart, carts)
+                CartItem.objects.bulk_create(items)
+                inherit_created_at(CartItem, "cart", carts)
+            created += len(carts)
+        self.log(f"carts: {created}")
+        return created
+
+    # ───────────────────────────────
+    # Order history
+    # ───────────────────────────────
+    def order_status(self, created_at):
+        age = self.now - created_at
+        roll = self.rng.random()
+        if roll < 0.05:
+            return Order.Status.CANCELLED
+        if roll < 0.07:
+            return Order.Status.REFUNDED
+        if roll < 0.08:
+            return Order.Status.FAILED
+        if age < timedelta(days=2):
+            return self.rng.choice([Order.Status.PENDING, Order.Status.PAID, Order.Status.PROCESSING])
+        if age < timedelta(days=7):
+            return self.rng.choice([Order.Status.PAID, Order.Status.PROCESSING, Order.Status.SHIPPED])
+        return self.rng.choice([Order.Status.DELIVERED, Order.Status.COMPLETED])
+
+    def seed_orders(self, count, user_ids, catalog):
+        order_count = item_count = 0
+        for indexes in chunked(count, self.chunk_size):
+            orders, items, statuses = [], [], {}
+            for index in indexes:
+                created_at = self.past()
+                status = self.order_status(created_at)
+                city, state, prefix = self.rng.choice(CITIES)
+                order = Order(
+                    id=self.uuid(),
+                    user_id=user_ids[self.skewed(len(user_ids))],
+                    order_number=seeded_order_number(self.seed, index),
+                    # Items may only be added to editable orders: the final
+                    # status is applied once the items are in
+                    status=Order.Status.PENDING,
+                    phone=f"+1 555 {self.rng.randrange(10000):04d}",
+                    shipping_address=f"{self.rng.randint(1, 9999)} Seed Street",
+                    city=city,
+                    state=state,
+                    postal_code=f"{prefix} {self.rng.randint(1, 9)}{self.rng.choice('ABCEGHJKLMNPRSTVXY')}{self.rng.randint(1, 9)}",
+                    country="Canada",
+                    created_at=created_at,
+                )
+                if status in PAID_STATUSES:
+                    order.payment_provider = self.rng.choice(PAYMENT_PROVIDERS)
+                    order.payment_reference = f"pay_{self.rng.getrandbits(64):016x}"
+                    order.paid_at = created_at + timedelta(minutes=self.rng.randint(1, 30))
+
+                order_items = []
+                products = {self.skewed(len(catalog)) for _ in range(self.rng.randint(1, 5))}
+                for product_index in sorted(products):
+                    product = catalog[product_index]
+                    item = OrderItem(
+                        order=order,
+                        product=product,
+                        product_name=product.name,
+                        product_description=product.description,
+                        unit_price=product.final_price,
+                        quantity=self.rng.randint(1, 3),
+                        tax_percent=product.tax_percent,
+                    )
+                    item.calculate_totals()
+                    order_items.append(item)
+                order.recalculate_from_items(order_items)
+
+                orders.append(order)
+                items.extend(order_items)
+                statuses.setdefault(status, []).append(order.pk)
+
+            with transaction.atomic():
+                create_with_history(Order, orders)
+                OrderItem.objects.bulk_create(items)
+                # While the orders are still editable (PENDING)
+                inherit_created_at(OrderItem, "order", orders)
+                for status, order_ids in statuses.items():
+                    if status != Order.Status.PENDING:
+                        Order.objects.filter(pk__in=order_ids).update(status=status)
+
+            order_count += len(orders)
+            item_count += len(items)
+            self.log(f"orders: {order_count}/{count} ({item_count} items)")
+        return order_count, item_count
+
+
+def seed(users=50, products=200, orders=500, seed=42, chunk_size=5000, log=None):
+    """
+    Seed a dataset; returns the number of rows created per model.
+    """
+    return Seeder(seed=seed, chunk_size=chunk_size, log=log).run(users, products, orders)
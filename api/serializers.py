@@ -0,0 +1,62 @@
+# api/serializers.py
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .authentication import revocations
+from .revocation import revoked_tokens
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Embed the user fields the API needs in the tokens, so the stateless
+    authentication mode can serve requests without loading the User row.
+    Access tokens minted from the refresh token inherit these claims.
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token["email"] = user.email
+        token["is_active"] = user.is_active
+        token["is_staff"] = user.is_staff
+        return token
+
+
+class RotatingTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh with rotation, backed by api.revocation instead of simplejwt's
+    blacklist app: a valid refresh costs one INSERT (the old JTI) and no
+    lookups; the user's active state comes from the short-TTL cache.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM, None)
+        if user_id and not revocations.is_allowed(user_id):
+            raise AuthenticationFailed(
+                self.error_messages["no_active_account"],
+                "no_active_account",
+            )
+
+        jti = refresh[api_settings.JTI_CLAIM]
+        if revoked_tokens.is_revoked(jti):
+            raise InvalidToken("Token is blacklisted")
+
+        data = {"access": str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            # The unique INSERT also rejects a concurrent reuse of this token
+            if not revoked_tokens.revoke(jti, datetime_from_epoch(refresh["exp"])):
+                raise InvalidToken("Token is blacklisted")
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+
+            data["refresh"] = str(refresh)
+
+        return data
@@ -0,0 +1,16 @@
+# api/signals.py
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import revocations
+
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_revocation_verdict(sender, instance, **kwargs):
+    # Deactivation (or reactivation) applies at once in this process
+    revocations.forget(instance.pk)
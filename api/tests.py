@@ -1,3 +1,504 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+import datetime
+import gzip
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db.models import OuterRef, Subquery
+from django.test import TestCase, override_settings
+from django.test.client import AsyncRequestFactory
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import AuthenticationFailed, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.throttling import BaseThrottle
+from rest_framework.views import APIView
+
+from carts.models import Cart, CartItem
+from orders.models import Order, OrderItem
+from . import parsers, renderers, schema, seeding, throttling
+from .async_views import AsyncAPIView
+from .authentication import ClaimsTokenUser, StatelessJWTAuthentication, get_full_user, revocations
+from .models import RevokedToken
+from .revocation import RevocationStore
+from .serializers import ClaimsTokenObtainPairSerializer, RotatingTokenRefreshSerializer
+
+
+class RevocationStoreTests(TestCase):
+    def make_store(self, **kwargs):
+        options = dict(sync_seconds=0, rebuild_seconds=600, error_rate=0.001, overlap_seconds=30, background=False)
+        options.update(kwargs)
+        return RevocationStore(**options)
+
+    def revoke_elsewhere(self, jti, revoked_at=None, **fields):
+        # As another process would: straight into the table
+        row = RevokedToken.objects.create(jti=jti, expires_at=timezone.now() + timedelta(days=1), **fields)
+        if revoked_at is not None:
+            RevokedToken.objects.filter(pk=row.pk).update(revoked_at=revoked_at)
+        return row
+
+    def test_revoke_and_lookup(self):
+        store = self.make_store()
+        self.assertFalse(store.is_revoked("a"))
+        self.assertTrue(store.revoke("a", timezone.now() + timedelta(days=1)))
+        self.assertTrue(store.is_revoked("a"))
+        # A second use of the same refresh token loses
+        self.assertFalse(store.revoke("a", timezone.now() + timedelta(days=1)))
+
+    def test_sync_picks_up_rows_committed_out_of_order(self):
+        store = self.make_store()
+        store.is_revoked("warm-up")
+        self.revoke_elsewhere("later", id=1000)
+        self.assertTrue(store.is_revoked("later"))
+
+        # Lower id and timestamp than the last sync: its transaction committed late
+        self.revoke_elsewhere("late", revoked_at=timezone.now() - timedelta(seconds=10), id=5)
+        self.assertTrue(store.is_revoked("late"))
+
+    def test_requests_use_the_table_until_the_first_build_is_ready(self):
+        store = self.make_store(background=True)
+        store._start_rebuild = lambda: None  # build still running
+        self.revoke_elsewhere("a")
+        self.assertIsNone(store._filter)
+        self.assertTrue(store.is_revoked("a"))
+        self.assertFalse(store.is_revoked("b"))
+
+    def test_rebuild_drops_expired_tokens(self):
+        store = self.make_store()
+        RevokedToken.objects.create(jti="old", expires_at=timezone.now() - timedelta(seconds=1))
+        self.revoke_elsewhere("live")
+        store.rebuild()
+        self.assertIn("live", store._filter)
+        self.assertEqual(store._count, 1)
+
+
+class BucketTableTests(TestCase):
+    def test_burst_then_refill(self):
+        table = throttling.BucketTable()
+        results = [table.take("ip:1", capacity=3, rate=1.0, now=100.0)[0] for _ in range(4)]
+        self.assertEqual(results, [True, True, True, False])
+        allowed, wait, _ = table.take("ip:1", capacity=3, rate=1.0, now=100.0)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 1.0)
+        self.assertTrue(table.take("ip:1", capacity=3, rate=1.0, now=101.0)[0])
+        # Other keys have their own bucket
+        self.assertTrue(table.take("ip:2", capacity=3, rate=1.0, now=100.0)[0])
+
+    def test_processes_share_a_file_backed_table(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "buckets")
+            first, second = throttling.BucketTable(path, sets=16), throttling.BucketTable(path, sets=16)
+            self.assertTrue(first.take("ip:1", capacity=1, rate=0.1, now=100.0)[0])
+            self.assertFalse(second.take("ip:1", capacity=1, rate=0.1, now=100.0)[0])
+
+    def test_full_set_drops_the_least_recently_used_bucket(self):
+        table = throttling.BucketTable(sets=1)
+        for index in range(throttling.WAYS):
+            table.take(f"ip:{index}", capacity=1, rate=0.001, now=100.0 + index)
+        self.assertFalse(table.take("ip:1", capacity=1, rate=0.001, now=200.0)[0])
+        # A ninth client evicts ip:0, the least recently used, which starts full again
+        table.take("ip:new", capacity=1, rate=0.001, now=201.0)
+        self.assertTrue(table.take("ip:0", capacity=1, rate=0.001, now=202.0)[0])
+
+
+@override_settings(THROTTLING_ENABLED=True, THROTTLE_CACHE_SYNC_SECONDS=0)
+class TokenBucketThrottleTests(TestCase):
+    rates = {"token": "3/min", "register": "2/hour"}
+
+    def setUp(self):
+        cache.clear()
+        self.table = throttling.BucketTable()
+        for patcher in (
+            mock.patch.object(throttling, "_table", self.table),
+            mock.patch.object(throttling.TokenBucketThrottle, "THROTTLE_RATES", self.rates),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.request = APIRequestFactory().post("/api/v1/token/", REMOTE_ADDR="10.1.1.1")
+
+    def allow(self, now):
+        throttle = throttling.TokenObtainThrottle()
+        throttle.timer = lambda: now
+        return throttle.allow_request(self.request, None), throttle
+
+    def test_limits_per_client_ip(self):
+        self.assertEqual([self.allow(100.0)[0] for _ in range(4)], [True, True, True, False])
+        _, throttle = self.allow(100.0)
+        self.assertAlmostEqual(throttle.wait(), 20.0)
+        self.assertTrue(self.allow(120.0)[0])
+
+    def allowed_across_two_hosts(self, sync_seconds):
+        cache.clear()
+        hosts = [throttling.BucketTable(), throttling.BucketTable()]
+        allowed = 0
+        with override_settings(THROTTLE_CACHE_SYNC_SECONDS=sync_seconds):
+            # One request every 1.5s for a minute, alternating between two hosts
+            for step in range(40):
+                throttling._table = hosts[step % 2]
+                allowed += self.allow(1000.0 + step * 1.5)[0]
+        return allowed
+
+    def test_sync_drains_clients_over_the_rate_across_hosts(self):
+        # Each host alone lets its own burst and refill through
+        self.assertEqual(self.allowed_across_two_hosts(0), 10)
+        self.assertLessEqual(self.allowed_across_two_hosts(1), 7)
+
+    def test_before_auth_throttle_rejects_with_retry_after(self):
+        for _ in range(2):
+            self.client.post("/api/v1/register/", {}, REMOTE_ADDR="10.2.2.2", HTTP_AUTHORIZATION="Bearer not-a-token")
+        response = self.client.post(
+            "/api/v1/register/", {}, REMOTE_ADDR="10.2.2.2", HTTP_AUTHORIZATION="Bearer not-a-token",
+        )
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response["Retry-After"]), 0)
+
+
+class StatelessAuthenticationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username="ada", email="ada@example.com", password="x", is_staff=True,
+        )
+
+    def setUp(self):
+        revocations._entries.clear()
+        self.refresh = ClaimsTokenObtainPairSerializer.get_token(self.user)
+
+    def authenticate(self, token=None):
+        token = token or self.refresh.access_token
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        return StatelessJWTAuthentication().authenticate(request)[0]
+
+    def test_request_user_comes_from_the_claims(self):
+        self.authenticate()  # first check of the user's active state
+        with self.assertNumQueries(0):
+            user = self.authenticate()
+        self.assertIsInstance(user, ClaimsTokenUser)
+        self.assertEqual((str(user.id), user.email, user.is_active, user.is_staff),
+                         (str(self.user.pk), "ada@example.com", True, True))
+
+    def test_full_user_is_loaded_once_on_demand(self):
+        user = self.authenticate()
+        with self.assertNumQueries(1):
+            self.assertEqual(get_full_user(user), self.user)
+            self.assertEqual(get_full_user(user).pk, self.user.pk)
+        self.assertIs(get_full_user(self.user), self.user)
+
+    def test_inactive_claim_is_rejected(self):
+        access = self.refresh.access_token
+        access["is_active"] = False
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(access)
+
+    def test_deactivation_applies_at_once_in_this_process(self):
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+        with self.assertRaises(AuthenticationFailed):
+            RotatingTokenRefreshSerializer().validate({"refresh": str(self.refresh)})
+
+    def test_authentication_and_refresh_share_cache_entries(self):
+        revocations.is_allowed(self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(revocations.is_allowed(str(self.user.pk)))
+        self.assertEqual(list(revocations._entries), [str(self.user.pk)])
+
+
+class SeedingTests(TestCase):
+    def test_order_number_prefixes_are_distinct_per_seed(self):
+        prefixes = {seeding.order_number_prefix(seed) for seed in range(0, seeding.MAX_SEED, 7)}
+        self.assertEqual(len(prefixes), len(range(0, seeding.MAX_SEED, 7)))
+        self.assertNotEqual(seeding.seeded_order_number(42, 0), seeding.seeded_order_number(1042, 0))
+        self.assertRegex(seeding.seeded_order_number(seeding.MAX_SEED - 1, 9_999_999), r"^ORD-[A-Z0-9]{10}$")
+        with self.assertRaises(ValueError):
+            seeding.order_number_prefix(seeding.MAX_SEED)
+
+    def test_seed_keeps_historical_timestamps(self):
+        seeder = seeding.Seeder(seed=7, days=30)
+        seeder.run(users=5, products=10, orders=20, cart_ratio=1)
+
+        orders = list(Order.objects.all())
+        self.assertEqual(len(orders), 20)
+        self.assertTrue(all(order.created_at < seeder.now for order in orders))
+        self.assertEqual(len({order.created_at for order in orders}), 20)
+        self.assertFalse(
+            OrderItem.objects.exclude(created_at=Subquery(
+                Order.objects.filter(pk=OuterRef("order_id")).values("created_at")
+            )).exists()
+        )
+        self.assertEqual(Cart.objects.filter(created_at__gte=seeder.now).count(), 0)
+        self.assertEqual(CartItem.objects.filter(created_at__gte=seeder.now).count(), 0)
+
+    def test_seed_scale_refuses_a_seed_already_in_the_database(self):
+        seeding.seed(users=2, products=3, orders=2, seed=5)
+        options = {"users": 2, "products": 3, "orders": 2, "stdout": io.StringIO()}
+        with self.assertRaises(CommandError):
+            call_command("seed_scale", seed=5, **options)
+        # No seeded users, but the seed's order numbers are taken
+        Order.objects.create(user=get_user_model().objects.create_user(username="x", email="x@example.com"),
+                             order_number=seeding.seeded_order_number(6, 0))
+        with self.assertRaises(CommandError):
+            call_command("seed_scale", seed=6, **options)
+        with self.assertRaises(CommandError):
+            call_command("seed_scale", seed=seeding.MAX_SEED, **options)
+        call_command("seed_scale", seed=1005, **options)
+        self.assertEqual(Order.objects.filter(order_number__startswith=seeding.order_number_prefix(1005)).count(), 2)
+
+
+class RefuseAll(BaseThrottle):
+    def allow_request(self, request, view):
+        return False
+
+    def wait(self):
+        return 7
+
+
+class AsyncAPIViewTests(TestCase):
+    """
+    The async views refuse requests exactly like DRF's APIView.
+    """
+
+    def compare(self, require_authentication=False, **attrs):
+        async def get(self, request):
+            return self.render({"ok": True})
+
+        async_view = type("AsyncProbe", (AsyncAPIView,), {
+            "get": get, "require_authentication": require_authentication, **attrs,
+        })
+        sync_view = type("SyncProbe", (APIView,), {
+            "get": lambda self, request: Response({"ok": True}),
+            "permission_classes": [IsAuthenticated] if require_authentication else [],
+            **attrs,
+        })
+
+        response = async_to_sync(async_view.as_view())(AsyncRequestFactory().get("/"))
+        expected = sync_view.as_view()(APIRequestFactory().get("/", HTTP_ACCEPT="application/json"))
+        expected.render()
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(json.loads(response.content), json.loads(expected.content))
+        for header in ("WWW-Authenticate", "Retry-After"):
+            self.assertEqual(response.get(header), expected.get(header))
+        return response
+
+    def test_anonymous_request_with_a_challenge_gets_401(self):
+        response = self.compare(require_authentication=True)
+        self.assertEqual(response.status_code, 401)
+
+    def test_anonymous_request_without_authenticators_gets_403(self):
+        response = self.compare(require_authentication=True, authentication_classes=[])
+        self.assertEqual(response.status_code, 403)
+
+    def test_throttled_request_gets_429_with_retry_after(self):
+        response = self.compare(throttle_classes=[RefuseAll])
+        self.assertEqual((response.status_code, response["Retry-After"]), (429, "7"))
+
+    def test_allowed_request_is_rendered(self):
+        self.assertEqual(self.compare().status_code, 200)
+
+
+class FastJSONTests(TestCase):
+    """
+    FastJSONRenderer / FastJSONParser behave exactly like DRF's JSON
+    renderer and parser, on both backends.
+    """
+    data = {
+        "price": Decimal("19.99"),
+        "total": Decimal("1234.50"),
+        "zero": Decimal("0"),
+        "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "utc": datetime.datetime(2026, 10, 19, 12, 30, 5, 123456, tzinfo=datetime.timezone.utc),
+        "offset": datetime.datetime(2026, 10, 19, 12, 30, tzinfo=datetime.timezone(timedelta(hours=-4))),
+        "naive": datetime.datetime(2026, 1, 2, 3, 4, 5),
+        "day": datetime.date(2026, 2, 28),
+        "time": datetime.time(13, 45, 30, 250),
+        "text": "line\u2028separator\u2029 caf\u00e9 \u2713 \"quoted\" </script>",
+        "lazy": gettext_lazy("Not found."),
+        "nested": [{"a": 1, "b": None, "c": True, "d": 1.5}, [], {}],
+        "int_keys": {1: "one", 2: "two"},
+    }
+
+    def backends(self):
+        backends = ["json"] + (["orjson"] if renderers.orjson is not None else [])
+        for backend in backends:
+            with self.subTest(backend=backend), mock.patch.object(renderers.FastJSONRenderer, "backend", backend):
+                yield backend
+
+    def test_output_matches_drf_byte_for_byte(self):
+        expected = JSONRenderer().render(self.data)
+        self.assertIn(b"\\u2028", expected)
+        for _ in self.backends():
+            self.assertEqual(renderers.FastJSONRenderer().render(self.data), expected)
+
+    def test_lists_and_empty_bodies_match_drf(self):
+        for _ in self.backends():
+            for data in ([self.data, self.data], [], "plain", None):
+                self.assertEqual(renderers.FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indented_output_falls_back_to_drf(self):
+        for media_type, context in (("application/json; indent=4", None), (None, {"indent": 2})):
+            expected = JSONRenderer().render(self.data, media_type, context)
+            self.assertIn(b"\n", expected)
+            for _ in self.backends():
+                self.assertEqual(renderers.FastJSONRenderer().render(self.data, media_type, context), expected)
+
+    def test_aware_time_is_refused_like_drf(self):
+        data = {"time": datetime.time(12, tzinfo=datetime.timezone.utc)}
+        with self.assertRaises(ValueError):
+            JSONRenderer().render(data)
+        for backend in self.backends():
+            error = TypeError if backend == "orjson" else ValueError
+            with self.assertRaises(error):
+                renderers.FastJSONRenderer().render(data)
+
+    def parse(self, body, **context):
+        return parsers.FastJSONParser().parse(io.BytesIO(body), "application/json", context)
+
+    def parser_backends(self):
+        if parsers.orjson is not None:
+            yield "orjson"
+        with mock.patch.object(parsers, "orjson", None):
+            yield "json"
+
+    def test_parser_matches_drf(self):
+        body = JSONRenderer().render({"id": "abc", "quantity": 2, "price": 9.5, "note": "caf\u00e9", "tags": [None, True]})
+        expected = JSONParser().parse(io.BytesIO(body), "application/json", {})
+        for backend in self.parser_backends():
+            with self.subTest(backend=backend):
+                self.assertEqual(self.parse(body), expected)
+        # Non-UTF-8 bodies are decoded by DRF's parser
+        self.assertEqual(self.parse('{"note": "caf\u00e9"}'.encode("latin-1"), encoding="latin-1"), {"note": "caf\u00e9"})
+
+    def test_malformed_body_is_a_parse_error(self):
+        for backend in self.parser_backends():
+            for body in (b'{"product_id": ', b"not json", b"\xff\xfe"):
+                with self.subTest(backend=backend, body=body), self.assertRaises(ParseError):
+                    self.parse(body)
+
+    def test_malformed_body_is_a_400_response(self):
+        class Echo(APIView):
+            authentication_classes = []
+            throttle_classes = []
+            parser_classes = [parsers.FastJSONParser]
+            renderer_classes = [renderers.FastJSONRenderer]
+
+            def post(self, request):
+                return Response(request.data)
+
+        for backend in self.parser_backends():
+            with self.subTest(backend=backend):
+                request = APIRequestFactory().post("/", b'{"quantity": 2', content_type="application/json")
+                response = Echo.as_view()(request)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("JSON parse error", response.data["detail"])
+
+
+# Development mode unless a test says otherwise (the default follows DEBUG)
+@override_settings(OPENAPI_SCHEMA_PRECOMPUTED=False)
+class CachedSchemaViewTests(TestCase):
+    documents = {"yaml": b"openapi: 3.0.3\n", "json": b'{"openapi":"3.0.3"}'}
+
+    def setUp(self):
+        schema.documents.clear()
+        self.addCleanup(schema.documents.clear)
+        self.schema_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.schema_dir.cleanup)
+
+    def get(self, params=None, headers=None):
+        return self.client.get("/api/schema/", {"format": "json", **(params or {})}, headers=headers)
+
+    def generated(self):
+        return mock.patch.object(schema, "generate", return_value=self.documents)
+
+    def test_etag_round_trip(self):
+        with self.generated() as generate:
+            response = self.get()
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content, self.documents["json"])
+            etag = response["ETag"]
+            self.assertEqual(response["Cache-Control"], "public, max-age=0, must-revalidate")
+
+            for if_none_match in (etag, f'"stale", W/{etag}', "*"):
+                response = self.get(headers={"If-None-Match": if_none_match})
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual((response["ETag"], response.content), (etag, b""))
+
+            response = self.get(headers={"If-None-Match": '"stale"'})
+            self.assertEqual((response.status_code, response.content), (200, self.documents["json"]))
+        # Generated once for the process, whatever the requests
+        generate.assert_called_once()
+
+    def test_gzip_is_sent_to_clients_that_accept_it(self):
+        with self.generated():
+            plain = self.get(headers={"Accept-Encoding": "identity"})
+            compressed = self.get(headers={"Accept-Encoding": "br, gzip"})
+        self.assertFalse(plain.has_header("Content-Encoding"))
+        self.assertEqual(compressed["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(compressed.content), plain.content)
+        self.assertEqual(compressed["ETag"], plain["ETag"])
+        for response in (plain, compressed):
+            self.assertIn("Accept-Encoding", response["Vary"])
+
+    def test_precomputed_files_are_served_without_generating(self):
+        call_command("build_schema", output_dir=self.schema_dir.name, stdout=io.StringIO())
+        with override_settings(OPENAPI_SCHEMA_PRECOMPUTED=True, OPENAPI_SCHEMA_DIR=self.schema_dir.name), \
+                mock.patch.object(schema, "generate") as generate:
+            response = self.get()
+            yaml = self.client.get("/api/schema/", headers={"Accept-Encoding": "gzip"})
+        generate.assert_not_called()
+        directory = self.schema_dir.name
+        with open(os.path.join(directory, "schema.json"), "rb") as file:
+            self.assertEqual(response.content, file.read())
+        with open(os.path.join(directory, "schema.yaml.gz"), "rb") as file:
+            self.assertEqual(yaml.content, file.read())
+        self.assertIn(b'"/api/v1/products/"', response.content)
+
+    def test_missing_precomputed_files_fall_back_to_generation(self):
+        with override_settings(OPENAPI_SCHEMA_PRECOMPUTED=True, OPENAPI_SCHEMA_DIR=self.schema_dir.name), \
+                self.generated() as generate, self.assertLogs("api.schema", "WARNING"):
+            response = self.get()
+        self.assertEqual(response.content, self.documents["json"])
+        generate.assert_called_once()
+
+    def test_lang_and_version_are_generated_live(self):
+        with self.generated() as generate, mock.patch.object(schema.documents, "get") as cached:
+            for params in ({"lang": "fr"}, {"version": "v1"}):
+                response = self.get(params)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn(b'"openapi"', response.content)
+                self.assertNotIn("ETag", response)
+        cached.assert_not_called()
+        generate.assert_not_called()
+
+
+class StartupReportTests(TestCase):
+    def test_reports_both_profiles(self):
+        with tempfile.NamedTemporaryFile(suffix=".json") as output:
+            stdout = io.StringIO()
+            call_command("startup_report", runs=1, top=3, output=output.name, stdout=stdout)
+            report = json.load(output)
+
+        self.assertEqual(set(report), {"full", "api"})
+        for row in report.values():
+            self.assertGreater(row["ready_ms"], 0)
+            self.assertGreater(row["rss_mb"], 0)
+            self.assertLessEqual(len(row["slowest_imports_ms"]), 3)
+        # The lean profile loads less
+        for key in ("apps", "middleware", "urls"):
+            self.assertLess(report["api"][key], report["full"][key])
+        self.assertIn("api profile", stdout.getvalue())
@@ -0,0 +1,286 @@
+# api/throttling.py
+"""
+Token-bucket throttles with per-host shared-memory state.
+
+DRF's SimpleRateThrottle keeps a request history per client in the cache:
+one cache round-trip (get + set) per request. These throttles keep token
+buckets in a memory-mapped table (settings.THROTTLE_BUCKETS_PATH, e.g. a
+file in /dev/shm) shared by every worker process of the host, so a check
+is a few microseconds and no network.
+
+- Rates use DRF's format and settings (REST_FRAMEWORK
+  DEFAULT_THROTTLE_RATES, e.g. "10/min"): a bucket holds up to 10 tokens
+  (the burst) and refills at 10 per minute.
+- The table is set-associative (a key hashes to a set of 8 slots). A set
+  is locked per thread (threading.Lock) and per process (fcntl record
+  lock on its bytes). When a set is full, the least recently used bucket
+  is dropped; an idle bucket is full anyway.
+- Limits are per host. With THROTTLE_CACHE_SYNC_SECONDS, each host adds
+  the requests it let through to a per-window counter in the Django cache
+  every few seconds (one round-trip per client and interval, not per
+  request) and empties its local bucket when the client went over the
+  rate across all hosts.
+
+Throttles with `before_auth = True` (keyed by client IP) run before
+authentication in views using ThrottleBeforeAuthMixin, so floods are
+rejected before the token is verified or the User loaded.
+"""
+import hashlib
+import mmap
+import os
+import struct
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache as default_cache
+
+from rest_framework.throttling import SimpleRateThrottle
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: buckets are per process
+    fcntl = None
+
+
+MAGIC = b"CMTBKT01"
+HEADER = struct.Struct("<8sII")  # magic, sets, ways
+# key hash, tokens, updated, synced_at, pending (allowed since last sync), unused
+SLOT = struct.Struct("<QdddII")
+SETS = 4096
+WAYS = 8
+LOCK_STRIPES = 64
+
+
+class BucketTable:
+    """
+    Token buckets in a memory-mapped file (shared by processes) or in
+    anonymous memory (this process only) when `path` is empty.
+    """
+
+    def __init__(self, path=None, sets=SETS):
+        self.sets = sets
+        self.set_size = WAYS * SLOT.size
+        self.size = HEADER.size + sets * self.set_size
+        self._locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._fd = None
+        if path and fcntl is not None:
+            self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            self._initialize()
+            self._map = mmap.mmap(self._fd, self.size)
+        else:
+            self._map = mmap.mmap(-1, self.size)
+            HEADER.pack_into(self._map, 0, MAGIC, sets, WAYS)
+
+    def _initialize(self):
+        # Whole-file lock: the first process to start lays the table out
+        fcntl.lockf(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size < self.size:
+                os.ftruncate(self._fd, self.size)
+            if os.pread(self._fd, HEADER.size, 0) != HEADER.pack(MAGIC, self.sets, WAYS):
+                # New file, or a layout from another version: start empty
+                os.pwrite(self._fd, bytes(self.size), 0)
+                os.pwrite(self._fd, HEADER.pack(MAGIC, self.sets, WAYS), 0)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN)
+
+    @staticmethod
+    def digest(key):
+        # 0 marks an empty slot
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+
+    @contextmanager
+    def locked(self, digest):
+        set_index = digest % self.sets
+        offset = HEADER.size + set_index * self.set_size
+        with self._locks[set_index % LOCK_STRIPES]:
+            if self._fd is None:
+                yield offset
+                return
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, self.set_size, offset)
+            try:
+                yield offset
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, self.set_size, offset)
+
+    def find(self, offset, digest):
+        """
+        Offset and fields of `digest`'s slot in the set at `offset`; a
+        free or least recently used slot (fields None) when it has none.
+        """
+        victim, victim_updated = None, None
+        for way in range(WAYS):
+            slot = offset + way * SLOT.size
+            fields = SLOT.unpack_from(self._map, slot)
+            if fields[0] == digest:
+                return slot, fields
+            if fields[0] == 0:
+                return slot, None
+            if victim is None or fields[2] < victim_updated:
+                victim, victim_updated = slot, fields[2]
+        return victim, None
+
+    def take(self, key, capacity, rate, now, sync_interval=0):
+        """
+        Take one token from `key`'s bucket.
+
+        Returns (allowed, wait, pending): `wait` is the number of seconds
+        until a token is available; `pending` is the number of requests
+        to report to the cache when a sync is due, None otherwise.
+        """
+        digest = self.digest(key)
+        with self.locked(digest) as offset:
+            slot, fields = self.find(offset, digest)
+            if fields is None:
+                tokens, updated, synced_at, pending = capacity, now, now, 0
+            else:
+                _, tokens, updated, synced_at, pending, _ = fields
+            tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+                pending += 1
+            to_sync = None
+            if sync_interval and now - synced_at >= sync_interval:
+                to_sync, pending, synced_at = pending, 0, now
+            SLOT.pack_into(self._map, slot, digest, tokens, now, synced_at, pending, 0)
+        return allowed, 0.0 if allowed else (1 - tokens) / rate, to_sync
+
+    def drain(self, key, now):
+        """
+        Empty `key`'s bucket (it refills at its normal rate).
+        """
+        digest = self.digest(key)
+        with self.locked(digest) as offset:
+            slot, fields = self.find(offset, digest)
+            if fields is not None:
+                _, _, _, synced_at, pending, _ = fields
+                SLOT.pack_into(self._map, slot, digest, 0.0, now, synced_at, pending, 0)
+
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def buckets():
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                _table = BucketTable(settings.THROTTLE_BUCKETS_PATH)
+    return _table
+
+
+# ───────────────────────────────
+# Throttles
+# ───────────────────────────────
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    SimpleRateThrottle's rates and keys, token-bucket state in BucketTable.
+    """
+
+    cache = default_cache
+    # Checked ahead of authentication by ThrottleBeforeAuthMixin
+    before_auth = False
+
+    def __init__(self):
+        super().__init__()
+        self._wait = None
+
+    def allow_request(self, request, view):
+        if self.rate is None or not settings.THROTTLING_ENABLED:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = self.timer()
+        sync_interval = settings.THROTTLE_CACHE_SYNC_SECONDS
+        allowed, self._wait, pending = buckets().take(
+            self.key, self.num_requests, self.num_requests / self.duration, now, sync_interval
+        )
+        if pending is not None:
+            self.sync(now, pending)
+        return allowed
+
+    def sync(self, now, pending):
+        """
+        Add this host's requests to the cache counter of the current window;
+        empty the local bucket when all hosts together went over the rate.
+        """
+        window_key = f"{self.key}:{int(now // self.duration)}"
+        try:
+            total = self.cache.incr(window_key, pending)
+        except ValueError:
+            # First report of the window
+            self.cache.add(window_key, 0, timeout=int(self.duration) * 2)
+            total = self.cache.incr(window_key, pending)
+        if total >= self.num_requests:
+            buckets().drain(self.key, now)
+
+    def wait(self):
+        return self._wait
+
+
+class ClientIPThrottle(TokenBucketThrottle):
+    before_auth = True
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {"scope": self.scope, "ident": self.get_ident(request)}
+
+
+class UserThrottle(TokenBucketThrottle):
+    def get_cache_key(self, request, view):
+        if not request.user.is_authenticated:
+            # Anonymous clients are limited by their IP throttles
+            return None
+        return self.cache_format % {"scope": self.scope, "ident": request.user.pk}
+
+
+class RegisterThrottle(ClientIPThrottle):
+    scope = "register"
+
+
+class TokenObtainThrottle(ClientIPThrottle):
+    scope = "token"
+
+
+class TokenRefreshThrottle(ClientIPThrottle):
+    scope = "token_refresh"
+
+
+class ClientBurstThrottle(ClientIPThrottle):
+    """
+    Per-IP ceiling of authenticated write endpoints (checked before auth).
+    """
+
+    scope = "client_burst"
+
+
+class CartAddThrottle(UserThrottle):
+    scope = "cart_add"
+
+
+class OrderPlaceThrottle(UserThrottle):
+    scope = "order_place"
+
+
+class ThrottleBeforeAuthMixin:
+    """
+    Check `before_auth` throttles before authentication, the others after
+    it (where DRF checks throttles).
+    """
+
+    def initial(self, request, *args, **kwargs):
+        self.check_throttles(request, before_auth=True)
+        super().initial(request, *args, **kwargs)
+
+    def check_throttles(self, request, before_auth=False):
+        waits = [
+            throttle.wait()
+            for throttle in self.get_throttles()
+            if getattr(throttle, "before_auth", False) == before_auth and not throttle.allow_request(request, self)
+        ]
+        if waits:
+            self.throttled(request, max((wait for wait in waits if wait is not None), default=None))
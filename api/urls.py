@@ -1,8 +1,11 @@
+from django.conf import settings
 from django.urls import path
 from users import views as UserViews
 from products import views as ProdViews
 from carts import views as CartViews
 from orders import views as OrderViews
+from analytics import views as AnalyticsViews
+from payments import views as PaymentViews
 
 # from rest_framework_simplejwt.views import (
 #     TokenObtainPairView,
@@ -11,25 +14,35 @@ from orders import views as OrderViews
 
 from .views import CustomTokenObtainPairView, CustomTokenRefreshView
 
+# Catalog and cart reads, register and login: native async views under ASGI
+if settings.ASYNC_READ_VIEWS:
+    from products import async_views as ProdReadViews
+    from carts import async_views as CartReadViews
+    from users import async_views as AuthViews
+    TokenObtainView = AuthViews.TokenObtainPairView
+else:
+    ProdReadViews, CartReadViews, AuthViews = ProdViews, CartViews, UserViews
+    TokenObtainView = CustomTokenObtainPairView
+
 
 urlpatterns = [
-    path('register/', UserViews.RegisterView.as_view()),
+    path('register/', AuthViews.RegisterView.as_view()),
     
     # include routes for Simple JWT’s
     # path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     # path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
-    path('token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('token/', TokenObtainView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', CustomTokenRefreshView.as_view(), name='token_refresh'),
     
     # users api
     path('profile/', UserViews.ProfileView.as_view()), 
     
     # products APIs
-    path("products/", ProdViews.ProductListView.as_view(), name="product-list"),
-    path("products/<uuid:id>/", ProdViews.ProductDetailView.as_view(), name="product-detail"),
+    path("products/", ProdReadViews.ProductListView.as_view(), name="product-list"),
+    path("products/<uuid:id>/", ProdReadViews.ProductDetailView.as_view(), name="product-detail"),
     
     # carts APIs
-    path("cart/", CartViews.CartView.as_view(), name="cart-view"),
+    path("cart/", CartReadViews.CartView.as_view(), name="cart-view"),
     # Add to Cart
     path("cart/add/", CartViews.AddToCartView.as_view(), name="cart-add"),
     # Manage Cart
@@ -40,4 +53,13 @@ urlpatterns = [
     path("orders/place/", OrderViews.PlaceOrderView.as_view(), name="order-place"),
     path("orders/", OrderViews.CustomerOrderView.as_view(), name="order-list"),
     path("orders/<uuid:id>/", OrderViews.OrderDetailView.as_view(), name="order-detail"),
+
+    # support APIs (staff only)
+    path("support/orders/search/", OrderViews.OrderSearchView.as_view(), name="support-order-search"),
+
+    # analytics APIs (admin only)
+    path("analytics/sales/", AnalyticsViews.SalesRollupView.as_view(), name="analytics-sales"),
+
+    # payment provider webhooks (signed, no JWT)
+    path("payments/webhooks/<slug:provider>/", PaymentViews.PaymentWebhookView.as_view(), name="payment-webhook"),
 ]
\ No newline at end of file
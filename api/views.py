@@ -10,6 +10,8 @@ from rest_framework_simplejwt.views import (
 
 from drf_spectacular.utils import extend_schema, extend_schema_view
 
+from .throttling import TokenObtainThrottle, TokenRefreshThrottle
+
 @extend_schema_view(
     post=extend_schema(
         tags=['Authentication'],
@@ -19,7 +21,7 @@ from drf_spectacular.utils import extend_schema, extend_schema_view
 )
 # Customizing the TokenObtainPairView to add schema information
 class CustomTokenObtainPairView(TokenObtainPairView):
-    pass
+    throttle_classes = [TokenObtainThrottle]
 
 
 @extend_schema_view(
@@ -31,4 +33,4 @@ class CustomTokenObtainPairView(TokenObtainPairView):
 )
 # Customizing the TokenRefreshView to add schema information
 class CustomTokenRefreshView(TokenRefreshView):
-    pass
+    throttle_classes = [TokenRefreshThrottle]
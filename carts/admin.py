@@ -1,9 +1,23 @@
 from django.contrib import admin
+from clickmart_main.admin_tools import ScalableAdminMixin
 from .models import Cart, CartItem
 
 
-admin.site.register(Cart)
-admin.site.register(CartItem)
+@admin.register(Cart)
+class CartAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    list_display = ("__str__", "user", "created_at")
+    raw_id_fields = ("user",)
+
+
+@admin.register(CartItem)
+class CartItemAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    list_display = ("__str__", "cart", "product", "quantity", "created_at")
+    # Cart.__str__ shows its user
+    list_select_related = ("cart__user", "product")
+    raw_id_fields = ("cart",)
+    autocomplete_fields = ("product",)
+    # Meta.ordering, on the primary key index
+    keyset_ordering = ("id",)
 # view and edit all items inside a cart directly from the cart admin page
 # class CartItemInline(admin.TabularInline):
 #     """
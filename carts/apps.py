@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class CartsConfig(AppConfig):
     name = 'carts'
+
+    def ready(self):
+        # connect the product listeners (cart snapshots follow price and stock changes)
+        from . import signals  # noqa: F401
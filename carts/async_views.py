@@ -0,0 +1,19 @@
+# carts/async_views.py
+"""
+Async (ASGI) read path for the cart; see api/async_views.py.
+"""
+from api.async_views import AsyncAPIView
+
+from . import snapshots, views
+
+
+class CartView(AsyncAPIView):
+    """
+    GET /cart/ => Get current user's cart (async ORM)
+    """
+    sync_view = views.CartView
+    require_authentication = True
+
+    async def get(self, request):
+        # Cached snapshot (carts/snapshots.py); never creates the cart
+        return self.render(await snapshots.aget(request.user.id))
@@ -0,0 +1,42 @@
+# carts/signals.py
+from django.db.models.signals import post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from products.models import Product
+from . import snapshots
+
+
+# Product fields a cart snapshot depends on (names, prices, totals). Not
+# stock: the snapshot does not show it, and every checkout changes it.
+SNAPSHOT_FIELDS = ("name", "price", "discount_price", "tax_percent", "is_active")
+
+
+@receiver(post_init, sender=Product)
+def remember_snapshot_fields(sender, instance, **kwargs):
+    # Read from __dict__ so deferred fields are not lazy-loaded
+    instance._snapshot_fields = {name: instance.__dict__.get(name) for name in SNAPSHOT_FIELDS}
+
+
+@receiver(post_save, sender=Product)
+def invalidate_carts_on_product_change(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Name, price or tax changes make the snapshots of carts holding the
+    product stale. New products are in no cart yet.
+    """
+    old = instance._snapshot_fields
+    remember_snapshot_fields(sender, instance)
+
+    if created:
+        return
+    if update_fields is not None and not set(update_fields) & set(SNAPSHOT_FIELDS):
+        return
+    if old == instance._snapshot_fields:
+        return
+
+    snapshots.invalidate_product(instance.pk)
+
+
+@receiver(pre_delete, sender=Product)
+def invalidate_carts_on_product_delete(sender, instance, **kwargs):
+    # Before the cascade removes the cart items (and who held them)
+    snapshots.invalidate_product(instance.pk)
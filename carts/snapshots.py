@@ -0,0 +1,144 @@
+# carts/snapshots.py
+"""
+Per-user cart snapshots for GET /cart/.
+
+The frontend polls the cart on every page. Instead of loading and
+re-pricing it each time, the serialized cart (items and totals) is kept
+in the Django cache with a version stamp:
+
+- cart:version:<user>  random token, replaced whenever the cart changes;
+- cart:snapshot:<user> {"version": token, "data": serialized cart}.
+
+A read fetches both keys in one round-trip and serves the snapshot when
+its version is current. On a miss the snapshot is rebuilt and stamped
+with the version read *before* the database, so a write that commits
+meanwhile (and replaces the version) makes it stale instead of leaving
+old data behind.
+
+Writers call `invalidate(user_id)`: the cart views, checkout, and the
+Product signals in carts/signals.py (name, price or tax changes of a
+product in the cart). Versions are replaced after the transaction
+commits. Use a shared cache (Redis, Memcached) when running several
+processes, or other workers keep serving their own copies until
+CART_SNAPSHOT_TTL expires.
+
+Reads never write to the database: a user without a cart gets an empty
+one (id null); the row is created by the first add.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Prefetch
+
+from clickmart_main import metrics
+
+from .models import Cart, CartItem
+from .serializers import CartSerializer
+
+
+VERSION_KEY = "cart:version:{}"
+SNAPSHOT_KEY = "cart:snapshot:{}"
+
+
+def carts():
+    # Items and products in two queries; the totals reuse them
+    return Cart.objects.prefetch_related(
+        Prefetch("items", queryset=CartItem.objects.select_related("product"))
+    )
+
+
+def serialize(cart, user_id):
+    if cart is None:
+        # What CartSerializer renders for a cart without items; the user id
+        # of a stateless JWT request is the (string) token claim
+        user_id = Cart._meta.get_field("user").target_field.to_python(user_id)
+        return {"id": None, "user": user_id, "items": [], "subtotal": 0, "tax_total": 0, "total": 0}
+    return dict(CartSerializer(cart).data)
+
+
+def keys(user_id):
+    return VERSION_KEY.format(user_id), SNAPSHOT_KEY.format(user_id)
+
+
+def cached(found, user_id):
+    """
+    (snapshot data or None, version to stamp a rebuilt snapshot with).
+    """
+    version_key, snapshot_key = keys(user_id)
+    version, snapshot = found.get(version_key), found.get(snapshot_key)
+    hit = version is not None and snapshot is not None and snapshot["version"] == version
+    metrics.record_cache("cart_snapshot", hit=hit)
+    return (snapshot["data"] if hit else None), version
+
+
+def get(user_id):
+    """
+    Serialized cart of `user_id`, from the snapshot when it is current.
+    """
+    ttl = settings.CART_SNAPSHOT_TTL
+    if not ttl:
+        return serialize(carts().filter(user_id=user_id).first(), user_id)
+
+    version_key, snapshot_key = keys(user_id)
+    data, version = cached(cache.get_many([version_key, snapshot_key]), user_id)
+    if data is not None:
+        return data
+    if version is None:
+        version = uuid.uuid4().hex
+        # add(): never overwrite a version set by a concurrent invalidation
+        if not cache.add(version_key, version, ttl):
+            version = cache.get(version_key)
+
+    data = serialize(carts().filter(user_id=user_id).first(), user_id)
+    if version is not None:
+        cache.set(snapshot_key, {"version": version, "data": data}, ttl)
+    return data
+
+
+async def aget(user_id):
+    """
+    `get` for async views (async cache and ORM).
+    """
+    ttl = settings.CART_SNAPSHOT_TTL
+    if not ttl:
+        return serialize(await carts().filter(user_id=user_id).afirst(), user_id)
+
+    version_key, snapshot_key = keys(user_id)
+    data, version = cached(await cache.aget_many([version_key, snapshot_key]), user_id)
+    if data is not None:
+        return data
+    if version is None:
+        version = uuid.uuid4().hex
+        if not await cache.aadd(version_key, version, ttl):
+            version = await cache.aget(version_key)
+
+    data = serialize(await carts().filter(user_id=user_id).afirst(), user_id)
+    if version is not None:
+        await cache.aset(snapshot_key, {"version": version, "data": data}, ttl)
+    return data
+
+
+def invalidate(*user_ids):
+    """
+    Make the snapshots of these users stale once the transaction commits.
+    """
+    if not user_ids or not settings.CART_SNAPSHOT_TTL:
+        return
+    versions = {VERSION_KEY.format(user_id): uuid.uuid4().hex for user_id in user_ids}
+    transaction.on_commit(lambda: cache.set_many(versions, settings.CART_SNAPSHOT_TTL))
+
+
+def invalidate_product(*product_ids):
+    """
+    Invalidate every cart holding one of these products.
+    """
+    if not settings.CART_SNAPSHOT_TTL:
+        return
+    user_ids = (
+        CartItem.objects.filter(product_id__in=product_ids)
+        .values_list("cart__user_id", flat=True)
+        .distinct()
+    )
+    invalidate(*user_ids)
@@ -1,3 +1,117 @@
-from django.test import TestCase
+import json
+from decimal import Decimal
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.test.client import AsyncRequestFactory
+from rest_framework.test import APIRequestFactory
+
+from api.serializers import ClaimsTokenObtainPairSerializer
+from products.models import Product
+from users.models import User
+from .models import Cart, CartItem
+from . import async_views, snapshots, views
+
+
+@override_settings(CART_SNAPSHOT_TTL=300)
+class CartSnapshotTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="buyer", email="buyer@example.com", password="x")
+        cls.mug = Product.objects.create(name="Mug", price=Decimal("10.00"), stock=50)
+        cls.cart = Cart.objects.create(user=cls.user)
+        CartItem.objects.create(cart=cls.cart, product=cls.mug, quantity=2)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_snapshot_is_served_from_the_cache(self):
+        data = snapshots.get(self.user.pk)
+        self.assertEqual((data["items"][0]["quantity"], data["subtotal"]), (2, Decimal("20.00")))
+        with self.assertNumQueries(0):
+            self.assertEqual(snapshots.get(self.user.pk), data)
+
+    def test_invalidation_applies_after_commit(self):
+        snapshots.get(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            CartItem.objects.filter(cart=self.cart).update(quantity=3)
+            snapshots.invalidate(self.user.pk)
+            # Still the old snapshot until the write commits
+            with self.assertNumQueries(0):
+                self.assertEqual(snapshots.get(self.user.pk)["items"][0]["quantity"], 2)
+        self.assertEqual(snapshots.get(self.user.pk)["items"][0]["quantity"], 3)
+
+    def test_price_change_invalidates_carts_holding_the_product(self):
+        snapshots.get(self.user.pk)
+        product = Product.objects.get(pk=self.mug.pk)
+        product.price = Decimal("12.00")
+        with self.captureOnCommitCallbacks(execute=True):
+            product.save(update_fields=["price"])
+        self.assertEqual(snapshots.get(self.user.pk)["subtotal"], Decimal("24.00"))
+
+    def test_stock_changes_keep_the_snapshot(self):
+        snapshots.get(self.user.pk)
+        product = Product.objects.get(pk=self.mug.pk)
+        product.stock = 10
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            product.save()
+            product.save(update_fields=["stock"])
+        self.assertEqual(callbacks, [])
+        with self.assertNumQueries(0):
+            snapshots.get(self.user.pk)
+
+    def test_empty_cart_matches_the_serializer_for_token_user_ids(self):
+        other = User.objects.create_user(username="new", email="new@example.com", password="x")
+        # Stateless JWT: request.user.id is the token claim
+        data = snapshots.get(str(other.pk))
+        self.assertEqual(data, {"id": None, "user": other.pk, "items": [], "subtotal": 0, "tax_total": 0, "total": 0})
+        self.assertFalse(Cart.objects.filter(user=other).exists())
+
+    async def test_async_read_shares_the_snapshot(self):
+        data = await snapshots.aget(self.user.pk)
+        self.assertEqual(data, snapshots.get(self.user.pk))
+
+
+class AsyncCartViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="buyer", email="buyer@example.com", password="x")
+        cls.mug = Product.objects.create(name="Mug", price=Decimal("10.00"), stock=50)
+        cart = Cart.objects.create(user=cls.user)
+        CartItem.objects.create(cart=cart, product=cls.mug, quantity=2)
+
+    def setUp(self):
+        cache.clear()
+
+    def bearer(self, user):
+        return {"Authorization": f"Bearer {ClaimsTokenObtainPairSerializer.get_token(user).access_token}"}
+
+    def get_async(self, headers=None):
+        response = async_to_sync(async_views.CartView.as_view())(AsyncRequestFactory().get("/", headers=headers))
+        return response.status_code, json.loads(response.content), response.get("WWW-Authenticate")
+
+    def get_sync(self, headers=None):
+        response = views.CartView.as_view()(APIRequestFactory().get("/", HTTP_ACCEPT="application/json", headers=headers))
+        response.render()
+        return response.status_code, json.loads(response.content), response.get("WWW-Authenticate")
+
+    def test_cart_matches_the_sync_view(self):
+        status_code, data, _ = self.get_async(self.bearer(self.user))
+        self.assertEqual(status_code, 200)
+        self.assertEqual(data["items"][0]["quantity"], 2)
+        self.assertEqual((status_code, data, None), self.get_sync(self.bearer(self.user)))
+
+    def test_anonymous_and_bad_tokens_are_refused_like_the_sync_view(self):
+        for headers in ({}, {"Authorization": "Bearer not-a-token"}):
+            status_code, data, challenge = self.get_async(headers)
+            self.assertEqual(status_code, 401)
+            self.assertTrue(challenge.startswith("Bearer"))
+            self.assertEqual((status_code, data, challenge), self.get_sync(headers))
+
+    def test_inactive_user_is_refused_like_the_sync_view(self):
+        headers = self.bearer(self.user)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        status_code, data, challenge = self.get_async(headers)
+        self.assertEqual(status_code, 401)
+        self.assertEqual((status_code, data, challenge), self.get_sync(headers))
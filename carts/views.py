@@ -2,11 +2,17 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.renderers import BrowsableAPIRenderer
 from .models import Cart, CartItem
 from .serializers import CartSerializer, CartItemSerializer
 from products.models import Product
 from django.shortcuts import get_object_or_404
 from drf_spectacular.utils import extend_schema
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+from api.throttling import CartAddThrottle, ClientBurstThrottle, ThrottleBeforeAuthMixin
+from . import snapshots
 
 
 # THE FOLLOWING CODE USE APIVIEW INSTEAD OF GENERICS
@@ -16,7 +22,8 @@ from drf_spectacular.utils import extend_schema
 def get_or_create_cart(user):
     # print(f'Cart => {cart}')
     # print(f'Created => {created}')
-    cart, created = Cart.objects.get_or_create(user=user)
+    # user_id works for both User instances and stateless token users
+    cart, created = Cart.objects.get_or_create(user_id=user.id)
     return cart
 
 
@@ -25,6 +32,7 @@ class CartView(APIView):
     GET /cart/ => Get current user's cart
     """
     permission_classes = [IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
 
     @extend_schema(
         tags=['Cart'],
@@ -32,14 +40,15 @@ class CartView(APIView):
         description="Retrieve the details of the currently logged-in user's cart."
     )
     def get(self, request):
-        # get or create the cart
-        cart = get_or_create_cart(request.user)
-        serializer = CartSerializer(cart)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        # Cached snapshot (carts/snapshots.py); never creates the cart
+        return Response(snapshots.get(request.user.id), status=status.HTTP_200_OK)
 
 
-class AddToCartView(APIView):
+class AddToCartView(ThrottleBeforeAuthMixin, APIView):
     permission_classes = [IsAuthenticated]
+    throttle_classes = [ClientBurstThrottle, CartAddThrottle]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    parser_classes = [FastJSONParser, FormParser, MultiPartParser]
 
     @extend_schema(
         tags=['Cart'],
@@ -67,6 +76,7 @@ class AddToCartView(APIView):
             # item.quantity = item.quantity + quantity
             item.quantity += int(quantity)
             item.save()
+        snapshots.invalidate(request.user.id)
         
         serializer = CartSerializer(cart)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -80,6 +90,9 @@ class ManageCartItemView(APIView):
         "quantity": 5
     }
     """
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    parser_classes = [FastJSONParser, FormParser, MultiPartParser]
+
     @extend_schema(
         tags=['Cart'],
         summary="Update cart item",
@@ -92,12 +105,12 @@ class ManageCartItemView(APIView):
         
         change = int(request.data.get('change')) # +1 or -1
         
-        item = get_object_or_404(CartItem, pk=item_id, cart__user=request.user)
+        item = get_object_or_404(CartItem, pk=item_id, cart__user_id=request.user.id)
         product = item.product
         
         # for adding, check the stock
         if change > 0: # -> chage = 1
-            if item.quantity + change > product.stock:
+            if item.quantity + change > product.available_stock:
                 return Response({'error': 'Not enough stock'})
             
         # change can be +1 or -1 (delta)
@@ -107,18 +120,21 @@ class ManageCartItemView(APIView):
         if new_qty <= 0:
             # remove item from cart
             item.delete()
+            snapshots.invalidate(request.user.id)
             return Response({'success': 'item remove'})
         
         # update the new quantity
         item.quantity = new_qty
         item.save()
+        snapshots.invalidate(request.user.id)
         serializer = CartItemSerializer(item)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
     @extend_schema(tags=["Cart"], summary="Remove cart item", description="Remove a specific item from the cart.")
     def delete(self, request, item_id):
-        cart_item = get_object_or_404(CartItem, id=item_id)
+        cart_item = get_object_or_404(CartItem.objects.select_related("cart"), id=item_id)
         cart_item.delete()
+        snapshots.invalidate(cart_item.cart.user_id)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
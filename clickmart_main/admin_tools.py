@@ -0,0 +1,220 @@
+# clickmart_main/admin_tools.py
+"""
+Admin changelists that stay fast on large tables.
+
+ScalableAdminMixin (put it before admin.ModelAdmin) gives a ModelAdmin:
+
+- EstimatedCountPaginator: on PostgreSQL, the row count of an unfiltered
+  changelist comes from pg_class.reltuples and a filtered one from the
+  planner's estimate; an exact COUNT(*) only runs when the estimate is
+  small. The "(N total)" count of the whole table is switched off.
+- list_select_related derived from the relations in list_display
+  (Django's default select_related() skips nullable foreign keys).
+- keyset paging (`keyset_ordering`): "Next page" links carry the last
+  row's ordering values (?after=...) and "Previous page" the first row's
+  (?before=...); either page is a range scan on an index, instead of an
+  OFFSET that reads and drops every earlier row.
+  The ordering is fixed (columns aren't sortable) and must end with a
+  unique field.
+
+Foreign keys on large tables should use raw_id_fields or
+autocomplete_fields, so change forms don't render a <select> of every row.
+"""
+import base64
+import json
+
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import PAGE_VAR, ChangeList
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+CURSOR_VAR = "after"
+BEFORE_VAR = "before"
+
+
+def estimated_count(queryset):
+    """
+    Row count estimate from PostgreSQL's statistics; None elsewhere.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            # -1: never vacuumed / analyzed
+            return row[0] if row and row[0] >= 0 else None
+        sql, params = queryset.query.sql_with_params()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    # Below this estimate an exact COUNT(*) is cheap enough
+    exact_count_limit = 10_000
+    estimated = False
+
+    @cached_property
+    def count(self):
+        estimate = estimated_count(self.object_list)
+        if estimate is None or estimate < self.exact_count_limit:
+            return super().count
+        self.estimated = True
+        return estimate
+
+
+# ───────────────────────────────
+# Keyset paging
+# ───────────────────────────────
+def keyset_fields(model, ordering):
+    """
+    [(field, descending)] for an ordering like ("-created_at", "-pk").
+    """
+    fields = []
+    for name in ordering:
+        descending = name.startswith("-")
+        name = name.lstrip("-")
+        field = model._meta.pk if name == "pk" else model._meta.get_field(name)
+        fields.append((field, descending))
+    return fields
+
+
+def encode_cursor(fields, obj):
+    values = [field.value_to_string(obj) for field, _ in fields]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(fields, cursor):
+    values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    if len(values) != len(fields):
+        raise ValueError("cursor does not match the ordering")
+    return [field.to_python(value) for (field, _), value in zip(fields, values)]
+
+
+def after(fields, values):
+    """
+    Rows after `values` in the ordering: (a, b) > (x, y) spelled out as
+    a > x OR (a = x AND b > y), with < for descending fields.
+    """
+    condition = Q()
+    for index, (field, descending) in enumerate(fields):
+        lookups = {prefix.attname: value for (prefix, _), value in zip(fields[:index], values)}
+        lookups[f"{field.attname}__{'lt' if descending else 'gt'}"] = values[index]
+        condition |= Q(**lookups)
+    return condition
+
+
+class KeysetChangeList(ChangeList):
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        lookup_params.pop(BEFORE_VAR, None)
+        return lookup_params
+
+    def get_ordering(self, request, queryset):
+        return list(self.model_admin.keyset_ordering)
+
+    def get_results(self, request):
+        fields = keyset_fields(self.model, self.model_admin.keyset_ordering)
+        queryset = self.queryset
+        cursor = request.GET.get(CURSOR_VAR)
+        before = request.GET.get(BEFORE_VAR)
+        try:
+            if before:
+                # Walk backwards in the reversed ordering, then flip the page
+                reversed_fields = [(field, not descending) for field, descending in fields]
+                queryset = queryset.filter(after(reversed_fields, decode_cursor(fields, before))).reverse()
+            elif cursor:
+                queryset = queryset.filter(after(fields, decode_cursor(fields, cursor)))
+        except (ValueError, ValidationError):
+            raise IncorrectLookupParameters
+        # One extra row tells whether there is another page that way
+        rows = list(queryset[: self.list_per_page + 1])
+        has_more = len(rows) > self.list_per_page
+        rows = rows[: self.list_per_page]
+        if before:
+            rows.reverse()
+            has_next, has_previous = bool(rows), has_more
+        else:
+            has_next, has_previous = has_more, bool(cursor)
+
+        self.paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        self.result_count = self.paginator.count
+        self.result_list = rows
+        self.full_result_count = None
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.can_show_all = False
+        self.multi_page = has_next or has_previous
+        self.next_page_url = (
+            self.get_query_string({CURSOR_VAR: encode_cursor(fields, rows[-1])}, [PAGE_VAR, BEFORE_VAR])
+            if has_next and rows else None
+        )
+        self.previous_page_url = (
+            self.get_query_string({BEFORE_VAR: encode_cursor(fields, rows[0])}, [PAGE_VAR, CURSOR_VAR])
+            if has_previous and rows else None
+        )
+        self.first_page_url = (
+            self.get_query_string(remove=[CURSOR_VAR, BEFORE_VAR, PAGE_VAR]) if cursor or before else None
+        )
+
+
+class ScalableAdminMixin:
+    paginator = EstimatedCountPaginator
+    # The "(N total)" link costs a COUNT(*) over the whole table
+    show_full_result_count = False
+    # e.g. ("-created_at", "-id"): keyset paging in this fixed order
+    keyset_ordering = None
+
+    def __init__(self, model, admin_site):
+        super().__init__(model, admin_site)
+        if self.keyset_ordering and not self.change_list_template:
+            self.change_list_template = "admin/keyset_change_list.html"
+
+    def get_list_select_related(self, request):
+        if self.list_select_related is not False:
+            return self.list_select_related
+        return self.related_in_list_display(request) or False
+
+    def related_in_list_display(self, request):
+        """
+        Relations shown by list_display ("user", "order__user", ...).
+        """
+        related = []
+        for name in self.get_list_display(request):
+            if not isinstance(name, str):
+                continue
+            model, path = self.model, []
+            for part in name.split("__"):
+                try:
+                    field = model._meta.get_field(part)
+                except FieldDoesNotExist:
+                    break
+                if not (field.many_to_one or field.one_to_one) or field.related_model is None:
+                    break
+                path.append(part)
+                model = field.related_model
+            if path:
+                related.append("__".join(path))
+        return tuple(dict.fromkeys(related))
+
+    def get_changelist(self, request, **kwargs):
+        if self.keyset_ordering:
+            return KeysetChangeList
+        return super().get_changelist(request, **kwargs)
+
+    def get_sortable_by(self, request):
+        if self.keyset_ordering:
+            return ()
+        return super().get_sortable_by(request)
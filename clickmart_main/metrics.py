@@ -0,0 +1,142 @@
+# clickmart_main/metrics.py
+"""
+Prometheus metrics, served at /metrics.
+
+- clickmart_http_request_duration_seconds: latency histogram per URL name
+  (product-list, cart-add, order-place, ...; unnamed routes use their
+  pattern), method and status class;
+- clickmart_db_queries_total: queries per URL name and database alias;
+- clickmart_cache_requests_total: hits / misses per in-process cache
+  (hit ratio = hit / (hit + miss));
+- clickmart_checkouts_total: checkout outcomes (success,
+  insufficient_stock, email_failure).
+
+Multi-process servers (gunicorn, uvicorn workers): set the
+PROMETHEUS_MULTIPROC_DIR environment variable to an empty, writable
+directory before the workers start. Every worker then writes its samples
+to memory-mapped files in it and /metrics aggregates all of them. With
+gunicorn, also call prometheus_client.multiprocess.mark_process_dead(pid)
+from the child_exit hook.
+
+MetricsMiddleware (clickmart_main/middleware.py) times every request.
+"""
+import os
+from collections import Counter as Tally
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from . import queries
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+
+request_latency = Histogram(
+    "clickmart_http_request_duration_seconds",
+    "Request latency by URL name.",
+    ["url_name", "method", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+db_queries = Counter(
+    "clickmart_db_queries_total",
+    "Database queries by URL name and database alias.",
+    ["url_name", "database"],
+)
+cache_requests = Counter(
+    "clickmart_cache_requests_total",
+    "Cache lookups by cache and result (hit / miss).",
+    ["cache", "result"],
+)
+checkouts = Counter(
+    "clickmart_checkouts_total",
+    "Checkout outcomes (success, insufficient_stock, email_failure).",
+    ["result"],
+)
+
+_queries = ContextVar("metrics_queries", default=None)
+
+
+def record_cache(cache, hit):
+    cache_requests.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def record_checkout(result):
+    checkouts.labels(result=result).inc()
+
+
+# ───────────────────────────────
+# Query counting
+# ───────────────────────────────
+class QueryCounts(Tally):
+    """
+    Statements per database alias for one request.
+    """
+
+    def record_query(self, sql, alias, seconds):
+        self[alias] += 1
+
+
+def begin():
+    counts = QueryCounts()
+    _queries.set(counts)
+    queries.observe(counts.record_query)
+    return counts
+
+
+def end():
+    counts = _queries.get()
+    if counts is not None:
+        queries.unobserve(counts.record_query)
+    _queries.set(None)
+
+
+def url_name(request):
+    match = request.resolver_match
+    if match is None:
+        return "unmatched"
+    # Unnamed routes (register/, profile/, ...) are labelled by pattern
+    return match.view_name if match.url_name else match.route
+
+
+def observe(request, status, seconds, counts):
+    name = url_name(request)
+    request_latency.labels(
+        url_name=name, method=request.method, status=f"{status // 100}xx"
+    ).observe(seconds)
+    for database, count in counts.items():
+        db_queries.labels(url_name=name, database=database).inc(count)
+
+
+# ───────────────────────────────
+# Endpoint
+# ───────────────────────────────
+def registry():
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        # Aggregate the files of every worker process
+        collector_registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(collector_registry)
+        return collector_registry
+    return REGISTRY
+
+
+def metrics_view(request):
+    token = settings.METRICS_AUTH_TOKEN
+    if not token:
+        # No token configured: only served in development
+        if not settings.DEBUG:
+            return HttpResponseForbidden()
+    elif not constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return HttpResponseForbidden()
+    return HttpResponse(generate_latest(registry()), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,109 @@
+# clickmart_main/middleware.py
+import json
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+
+from . import metrics, profiling, routers
+
+
+logger = logging.getLogger("clickmart.requests")
+
+
+class ReplicaRoutingMiddleware(MiddlewareMixin):
+    """
+    Scope replica routing to the request; pin users who wrote to the primary.
+    """
+
+    def process_request(self, request):
+        request._db_routing = routers.begin_request(request)
+
+    def process_response(self, request, response):
+        state = getattr(request, "_db_routing", None)
+        if state is None:
+            return response
+        routers.end_request()
+        if state.wrote:
+            routers.pin_to_primary(state.user_id)
+        return response
+
+
+class MetricsMiddleware(MiddlewareMixin):
+    """
+    Prometheus latency and query counts per URL name (see metrics.py).
+    """
+
+    def process_request(self, request):
+        request._metrics = (time.perf_counter(), metrics.begin())
+
+    def process_response(self, request, response):
+        state = getattr(request, "_metrics", None)
+        if state is None:
+            return response
+        metrics.end()
+        started, queries = state
+        metrics.observe(request, response.status_code, time.perf_counter() - started, queries)
+        return response
+
+
+class RequestProfilingMiddleware(MiddlewareMixin):
+    """
+    Sampled per-request SQL / serializer / render timings (see profiling.py).
+    """
+
+    def process_request(self, request):
+        if random.random() < settings.REQUEST_PROFILING_SAMPLE_RATE:
+            request._profile = profiling.begin()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profile = getattr(request, "_profile", None)
+        if profile is not None:
+            view_class = getattr(view_func, "view_class", None)
+            profile.view = view_class.__name__ if view_class else view_func.__name__
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returned
+        profile = getattr(request, "_profile", None)
+        if profile is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                profile.timings["render"] += time.perf_counter() - started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def process_response(self, request, response):
+        profile = getattr(request, "_profile", None)
+        if profile is None:
+            return response
+        profiling.end()
+
+        total = time.perf_counter() - profile.started
+        response["Server-Timing"] = profile.server_timing(total)
+
+        view = profile.view or "-"
+        logger.info(json.dumps({
+            "event": "request",
+            "method": request.method,
+            "path": request.path,
+            "view": view,
+            "status": response.status_code,
+            "total_ms": round(total * 1000, 2),
+            "queries": profile.queries,
+            "sql_ms": round(profile.sql_seconds * 1000, 2),
+            **{f"{name}_ms": round(seconds * 1000, 2) for name, seconds in profile.timings.items()},
+        }))
+
+        for sql, count in profile.duplicates(settings.REQUEST_PROFILING_DUPLICATE_THRESHOLD):
+            logger.warning(json.dumps({
+                "event": "duplicate_queries",
+                "view": view,
+                "path": request.path,
+                "count": count,
+                "sql": sql[:300],
+            }))
+        return response
@@ -0,0 +1,118 @@
+# clickmart_main/profiling.py
+"""
+Per-request SQL / serializer / render timing (sampled).
+
+RequestProfilingMiddleware starts a RequestProfile for a sampled share of
+requests (REQUEST_PROFILING_SAMPLE_RATE). While a profile is active:
+
+- every SQL statement is counted and timed (an observer of queries.py's
+  execute wrapper);
+- DRF serializer `.data` evaluation is timed (outermost call only);
+- response rendering is timed.
+
+The figures go out in a Server-Timing header and one JSON log line on the
+"clickmart.requests" logger. Statements repeated at least
+REQUEST_PROFILING_DUPLICATE_THRESHOLD times in one request (N+1 queries)
+are logged as warnings with the view name. Unsampled requests only pay
+one contextvar lookup per query / serializer.
+"""
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from . import queries
+
+
+_profile = ContextVar("request_profile", default=None)
+
+
+class RequestProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view = None
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.statements = Counter()
+        self.timings = Counter()
+        self.serializer_depth = 0
+
+    def server_timing(self, total):
+        parts = [f'db;dur={self.sql_seconds * 1000:.1f};desc="{self.queries} queries"']
+        for name, seconds in self.timings.items():
+            parts.append(f"{name};dur={seconds * 1000:.1f}")
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+    def record_query(self, sql, alias, seconds):
+        self.sql_seconds += seconds
+        self.queries += 1
+        # Parameters are passed separately, so the SQL is the query's signature
+        self.statements[sql] += 1
+
+    def duplicates(self, threshold):
+        return [(sql, count) for sql, count in self.statements.most_common() if count >= threshold]
+
+
+def current():
+    return _profile.get()
+
+
+def begin():
+    profile = RequestProfile()
+    _profile.set(profile)
+    queries.observe(profile.record_query)
+    return profile
+
+
+def end():
+    profile = _profile.get()
+    if profile is not None:
+        queries.unobserve(profile.record_query)
+    _profile.set(None)
+
+
+@contextmanager
+def timer(name):
+    """
+    Add the time spent in the block to the current profile under `name`.
+    """
+    profile = _profile.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.timings[name] += time.perf_counter() - started
+
+
+# ───────────────────────────────
+# DRF serializers
+# ───────────────────────────────
+def instrument_serializers():
+    """
+    Time BaseSerializer.data (called once from ApiConfig.ready()).
+    """
+    from rest_framework.serializers import BaseSerializer
+
+    data = BaseSerializer.data
+    if getattr(data.fget, "profiled", False):
+        return
+
+    def timed_data(serializer):
+        profile = _profile.get()
+        if profile is None or profile.serializer_depth:
+            # Nested/list serializers are part of the outer measurement
+            return data.fget(serializer)
+        profile.serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return data.fget(serializer)
+        finally:
+            profile.serializer_depth -= 1
+            profile.timings["serialize"] += time.perf_counter() - started
+
+    timed_data.profiled = True
+    BaseSerializer.data = property(timed_data)
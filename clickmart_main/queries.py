@@ -0,0 +1,58 @@
+# clickmart_main/queries.py
+"""
+The one connection execute wrapper shared by the per-request SQL observers.
+
+Replica routing (write detection, routers.py), Prometheus query counts
+(metrics.py) and sampled profiling (SQL timing, profiling.py) all need to
+see every statement. Rather than each installing its own wrapper, they
+register an observer for the current request with `observe()`:
+
+    observer(sql, alias, seconds)
+
+is called after every statement of the current context (thread or async
+task), including failed ones. A statement with no observer costs one
+contextvar lookup; with observers, it is timed once for all of them.
+"""
+import time
+from contextvars import ContextVar
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+_observers = ContextVar("query_observers", default=())
+
+
+def observe(observer):
+    """
+    Call `observer` for the statements of the current context until `unobserve()`.
+    """
+    # Connections opened before this module was imported have no wrapper yet
+    for connection in connections.all(initialized_only=True):
+        install(None, connection)
+    _observers.set(_observers.get() + (observer,))
+
+
+def unobserve(observer):
+    _observers.set(tuple(current for current in _observers.get() if current != observer))
+
+
+def execute_wrapper(execute, sql, params, many, context):
+    observers = _observers.get()
+    if not observers:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        seconds = time.perf_counter() - started
+        alias = context["connection"].alias
+        for observer in observers:
+            observer(sql, alias, seconds)
+
+
+@receiver(connection_created)
+def install(sender, connection, **kwargs):
+    if execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(execute_wrapper)
@@ -0,0 +1,251 @@
+# clickmart_main/routers.py
+"""
+Replica-aware database routing with read-your-writes stickiness.
+
+- Reads of the catalog and order history (settings.REPLICA_READ_APPS)
+  go to a healthy replica from settings.READ_REPLICAS; everything else,
+  every write and every read inside a transaction goes to `default`.
+- A request that writes (an INSERT/UPDATE/DELETE reaches the primary)
+  stays on the primary for the rest of the request,
+  and its user stays pinned to the primary for REPLICA_STICKY_SECONDS
+  (checkout, cart changes, ...), so they never read their own writes
+  from a lagging replica. Pins live in the Django cache: use a shared
+  cache (Redis, Memcached) when running several processes.
+- A background thread per process probes replica health and replication
+  lag every REPLICA_HEALTH_CHECK_SECONDS; requests only read its last
+  results, so a slow or unreachable replica never delays them. Replicas
+  that fail, lag more than REPLICA_MAX_LAG_SECONDS or have no recent
+  probe (before the first one, or a probe that hangs) are skipped.
+
+Routing state is per request (a contextvar set by
+clickmart_main.middleware.ReplicaRoutingMiddleware). Outside a request
+(shell, commands) reads use the primary unless `use_replicas()` is used.
+
+Local testing: point READ_REPLICAS at a second SQLite (or PostgreSQL)
+database holding a copy of the data, e.g.
+    DATABASES["replica"] = {"ENGINE": "django.db.backends.sqlite3", "NAME": "replica.sqlite3"}
+    READ_REPLICAS = ["replica"]
+"""
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from . import queries
+
+
+logger = logging.getLogger(__name__)
+
+PIN_CACHE_KEY = "db:primary-pin:{}"
+WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE")
+
+# Lag of a PostgreSQL standby; 0 when it has replayed everything it received
+POSTGRES_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+_routing = ContextVar("db_routing", default=None)
+
+
+def replicas():
+    return list(getattr(settings, "READ_REPLICAS", []))
+
+
+class RoutingState:
+    """
+    What the router needs to know about the current request.
+    """
+
+    def __init__(self, request=None):
+        self.request = request
+        self.wrote = False
+        self.pinned = None
+
+    @property
+    def user_id(self):
+        user = getattr(self.request, "user", None)
+        if user is not None and user.is_authenticated:
+            return user.pk
+        return None
+
+    def use_primary(self):
+        if self.wrote:
+            return True
+        if self.pinned is None:
+            user_id = self.user_id
+            if user_id is None:
+                # Not authenticated (yet): decide again on the next query
+                return False
+            self.pinned = bool(cache.get(PIN_CACHE_KEY.format(user_id)))
+        return self.pinned
+
+    def record_query(self, sql, alias, seconds):
+        # router.db_for_write is also consulted by get_or_create() that only
+        # reads, so writes are detected on the statements themselves
+        if not self.wrote and alias == DEFAULT_DB_ALIAS and sql.lstrip().upper().startswith(WRITE_STATEMENTS):
+            self.wrote = True
+
+
+def begin_request(request):
+    state = RoutingState(request)
+    _routing.set(state)
+    queries.observe(state.record_query)
+    return state
+
+
+def end_request():
+    # Not reset(token): under ASGI the middleware hooks run in different contexts
+    state = _routing.get()
+    if state is not None:
+        queries.unobserve(state.record_query)
+    _routing.set(None)
+
+
+@contextmanager
+def use_replicas():
+    """
+    Route reads to replicas outside a request (reports, commands).
+    """
+    state = RoutingState()
+    token = _routing.set(state)
+    queries.observe(state.record_query)
+    try:
+        yield
+    finally:
+        queries.unobserve(state.record_query)
+        _routing.reset(token)
+
+
+def pin_to_primary(user_id, seconds=None):
+    """
+    Keep `user_id`'s reads on the primary for the sticky window.
+    """
+    if seconds is None:
+        seconds = settings.REPLICA_STICKY_SECONDS
+    if user_id is not None and seconds > 0:
+        cache.set(PIN_CACHE_KEY.format(user_id), 1, timeout=seconds)
+
+
+# ───────────────────────────────
+# Replica health
+# ───────────────────────────────
+class ReplicaMonitor:
+    """
+    Per-process {alias: (checked_at, healthy, lag)}, refreshed by a
+    background prober thread; requests only read it.
+    """
+
+    # Results older than this many check intervals are not trusted
+    STALE_INTERVALS = 3
+
+    def __init__(self, background=True):
+        # False: nothing probes on its own, call probe() (tests)
+        self.background = background
+        self._lock = threading.Lock()
+        self._status = {}
+        self._prober = None
+
+    def measure_lag(self, alias):
+        connection = connections[alias]
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute(POSTGRES_LAG_SQL)
+                return float(cursor.fetchone()[0])
+            # No replication to measure (e.g. local SQLite copies)
+            cursor.execute("SELECT 1")
+            return 0.0
+
+    def check(self, alias):
+        try:
+            lag = self.measure_lag(alias)
+        except DatabaseError:
+            return False, None
+        return lag <= settings.REPLICA_MAX_LAG_SECONDS, lag
+
+    def probe(self):
+        """
+        Check every replica now and publish the results.
+        """
+        for alias in replicas():
+            healthy, lag = self.check(alias)
+            # Replaced, not mutated: readers take no lock
+            self._status = {**self._status, alias: (time.monotonic(), healthy, lag)}
+
+    def _run(self):
+        while True:
+            try:
+                self.probe()
+            except Exception:
+                # Keep probing; the replicas go stale and are skipped
+                logger.exception("Replica health probe failed")
+            finally:
+                # The thread's own replica connections
+                connections.close_all()
+            time.sleep(settings.REPLICA_HEALTH_CHECK_SECONDS)
+
+    def _start_prober(self):
+        prober = self._prober
+        # Not alive in a forked child either: each process starts its own
+        if prober is not None and prober.is_alive():
+            return
+        with self._lock:
+            if self._prober is None or not self._prober.is_alive():
+                self._prober = threading.Thread(target=self._run, name="replica-monitor", daemon=True)
+                self._prober.start()
+
+    def status(self, alias):
+        """
+        (healthy, lag) from the last probe; unhealthy when it is missing or stale.
+        """
+        checked_at, healthy, lag = self._status.get(alias, (None, False, None))
+        max_age = settings.REPLICA_HEALTH_CHECK_SECONDS * self.STALE_INTERVALS
+        if checked_at is None or time.monotonic() - checked_at > max_age:
+            return False, lag
+        return healthy, lag
+
+    def healthy(self):
+        aliases = replicas()
+        if aliases and self.background:
+            self._start_prober()
+        return [alias for alias in aliases if self.status(alias)[0]]
+
+
+monitor = ReplicaMonitor()
+
+
+# ───────────────────────────────
+# Router
+# ───────────────────────────────
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if state is None or model._meta.app_label not in settings.REPLICA_READ_APPS:
+            return DEFAULT_DB_ALIAS
+        # Reads inside a transaction must see that transaction's writes
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block or state.use_primary():
+            return DEFAULT_DB_ALIAS
+        healthy = monitor.healthy()
+        return random.choice(healthy) if healthy else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema through replication
+        if db in replicas():
+            return False
+        return None
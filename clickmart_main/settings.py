@@ -11,7 +11,7 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
 from pathlib import Path
-from decouple import config
+from decouple import config, Csv
 from datetime import timedelta
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,6 +46,9 @@ INSTALLED_APPS = [
     'carts',
     'products',
     'orders',
+    'analytics',
+    'webhooks',
+    'payments',
     # Third-party apps
     'rest_framework',
     'rest_framework_simplejwt',
@@ -54,19 +57,62 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost, so its total covers the whole middleware chain
+    'clickmart_main.middleware.RequestProfilingMiddleware',
+    'clickmart_main.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
-    'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
+    # Before CommonMiddleware (corsheaders docs)
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'clickmart_main.middleware.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'clickmart_main.urls'
 
+# Deployment profile:
+# - 'full': API, admin (Jazzmin), OpenAPI docs, sessions and messages;
+# - 'api': JWT API workers only (/api/v1/, /metrics): no admin, docs,
+#   sessions, messages or CSRF, and a lean middleware chain and URLconf.
+# Run the API pool with DEPLOYMENT_PROFILE=api and route /admin/ and
+# /api/schema|docs|redoc/ to a (small) pool running the full profile.
+DEPLOYMENT_PROFILE = config('DEPLOYMENT_PROFILE', default='full')
+
+if DEPLOYMENT_PROFILE == 'api':
+    INSTALLED_APPS = [
+        'django.contrib.auth',
+        'django.contrib.contenttypes',
+        # local apps
+        'users',
+        'api',
+        'carts',
+        'products',
+        'orders',
+        'analytics',
+        'webhooks',
+        'payments',
+        # Third-party apps
+        'rest_framework',
+        'rest_framework_simplejwt',
+        'corsheaders',
+    ]
+    # DRF authenticates (JWT) and exempts its views from CSRF itself
+    MIDDLEWARE = [
+        'clickmart_main.middleware.RequestProfilingMiddleware',
+        'clickmart_main.middleware.MetricsMiddleware',
+        'django.middleware.security.SecurityMiddleware',
+        'corsheaders.middleware.CorsMiddleware',
+        'django.middleware.common.CommonMiddleware',
+        'clickmart_main.middleware.ReplicaRoutingMiddleware',
+    ]
+    ROOT_URLCONF = 'clickmart_main.urls_api'
+elif DEPLOYMENT_PROFILE != 'full':
+    raise ValueError(f"Unknown DEPLOYMENT_PROFILE {DEPLOYMENT_PROFILE!r} (expected 'full' or 'api')")
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -106,6 +152,29 @@ DATABASES = {
     }
 }
 
+# Read replicas: DB_REPLICA_HOSTS=host1,host2:5433 (same name/credentials as default)
+READ_REPLICAS = []
+for index, replica in enumerate(config('DB_REPLICA_HOSTS', default='', cast=Csv())):
+    host, _, port = replica.partition(':')
+    alias = f'replica_{index + 1}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    READ_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['clickmart_main.routers.ReplicaRouter']
+# Apps whose reads may be served by a replica (catalog, order history)
+REPLICA_READ_APPS = ['products', 'orders']
+# Seconds a user's reads stay on the primary after they wrote
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=10, cast=int)
+# Replicas lagging more than this are skipped
+REPLICA_MAX_LAG_SECONDS = config('REPLICA_MAX_LAG_SECONDS', default=5, cast=float)
+# Seconds between health/lag checks of a replica (per process)
+REPLICA_HEALTH_CHECK_SECONDS = config('REPLICA_HEALTH_CHECK_SECONDS', default=10, cast=int)
+
 
 
 # Password validation
@@ -127,6 +196,29 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Request profiling (Server-Timing header + "clickmart.requests" JSON logs)
+# Share of requests profiled: everything in development, a sample in production
+REQUEST_PROFILING_SAMPLE_RATE = config('REQUEST_PROFILING_SAMPLE_RATE', default=1.0 if DEBUG else 0.01, cast=float)
+# The same statement this many times in one request is reported as N+1
+REQUEST_PROFILING_DUPLICATE_THRESHOLD = config('REQUEST_PROFILING_DUPLICATE_THRESHOLD', default=3, cast=int)
+
+# /metrics (Prometheus). When set, scrapers must send "Authorization: Bearer <token>";
+# when empty, /metrics is only served with DEBUG on.
+# Multi-process servers also need the PROMETHEUS_MULTIPROC_DIR environment variable.
+METRICS_AUTH_TOKEN = config('METRICS_AUTH_TOKEN', default='')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'clickmart.requests': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/6.0/topics/i18n/
 
@@ -157,20 +249,104 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 AUTH_USER_MODEL = "users.User"
 
+# Login hashes run through users.hashing's bounded pool
+AUTHENTICATION_BACKENDS = ['users.backends.OffloadedHashingBackend']
+
+# Password hashing pool (register / login)
+PASSWORD_HASHING = {
+    'OFFLOAD': config('PASSWORD_HASHING_OFFLOAD', default=True, cast=bool),
+    # Hashes running at once (keep below the CPU count)
+    'WORKERS': config('PASSWORD_HASHING_WORKERS', default=2, cast=int),
+    # Hashes allowed to wait; more are rejected with 503
+    'MAX_QUEUE': config('PASSWORD_HASHING_MAX_QUEUE', default=16, cast=int),
+    # Pending hashes per client IP; more are rejected with 429
+    'PER_IP_IN_FLIGHT': config('PASSWORD_HASHING_PER_IP', default=2, cast=int),
+    # Seconds a request waits for its hash before giving up
+    'TIMEOUT': 5,
+}
+
+# Stateless JWT mode: request.user is built from the token claims
+# (id, email, is_active, is_staff) instead of loading the User row per request.
+JWT_STATELESS_AUTH = config('JWT_STATELESS_AUTH', default=False, cast=bool)
+# Seconds a user's "still active" check is cached per process (stateless mode)
+JWT_REVOCATION_CACHE_TTL = config('JWT_REVOCATION_CACHE_TTL', default=30, cast=int)
+
+# Serve the catalog and cart reads, register and login from native async views
+# (api/async_views.py, users/async_views.py).
+# asgi.py turns this on; WSGI deployments keep the sync DRF views.
+ASYNC_READ_VIEWS = config('ASYNC_READ_VIEWS', default=False, cast=bool)
+
+# Seconds a user's serialized cart is cached for GET /cart/ (carts/snapshots.py);
+# writes invalidate it sooner. 0 turns the snapshot cache off.
+CART_SNAPSHOT_TTL = config('CART_SNAPSHOT_TTL', default=300, cast=int)
+
+# Order event webhooks (webhooks/services.py, `manage.py webhook_worker`):
+# seconds per POST, and retries with exponential backoff from BASE up to
+# MAX seconds apart, giving up after MAX_ATTEMPTS.
+WEBHOOK_TIMEOUT_SECONDS = config('WEBHOOK_TIMEOUT_SECONDS', default=10, cast=int)
+WEBHOOK_BACKOFF_BASE_SECONDS = config('WEBHOOK_BACKOFF_BASE_SECONDS', default=5, cast=float)
+WEBHOOK_BACKOFF_MAX_SECONDS = config('WEBHOOK_BACKOFF_MAX_SECONDS', default=3600, cast=float)
+WEBHOOK_MAX_ATTEMPTS = config('WEBHOOK_MAX_ATTEMPTS', default=15, cast=int)
+
+# Payment provider webhooks (POST /api/v1/payments/webhooks/<provider>/):
+# signing secrets as "provider:secret" pairs, e.g. "stripe:whsec_...,paypal:...".
+# Unlisted providers get a 404.
+PAYMENT_WEBHOOK_SECRETS = config('PAYMENT_WEBHOOK_SECRETS', default='', cast=Csv())
+
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_AUTHENTICATION_CLASSES': (
+        'api.authentication.StatelessJWTAuthentication'
+        if JWT_STATELESS_AUTH else
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),    
+    # Token buckets (api/throttling.py): "N/period" = burst of N, refilled N per period
+    'DEFAULT_THROTTLE_RATES': {
+        'register': config('THROTTLE_RATE_REGISTER', default='10/hour'),
+        'token': config('THROTTLE_RATE_TOKEN', default='20/min'),
+        'token_refresh': config('THROTTLE_RATE_TOKEN_REFRESH', default='30/min'),
+        'client_burst': config('THROTTLE_RATE_CLIENT_BURST', default='300/min'),
+        'cart_add': config('THROTTLE_RATE_CART_ADD', default='60/min'),
+        'order_place': config('THROTTLE_RATE_ORDER_PLACE', default='10/min'),
+    },
 }
 
+THROTTLING_ENABLED = config('THROTTLING_ENABLED', default=True, cast=bool)
+# Token buckets shared by the worker processes of a host (memory-mapped file);
+# empty: one table per process
+THROTTLE_BUCKETS_PATH = config(
+    'THROTTLE_BUCKETS_PATH',
+    default='/dev/shm/clickmart-throttle' if Path('/dev/shm').is_dir() else '',
+)
+# Seconds between reports of a client's usage to the (shared) cache, so limits
+# also hold across hosts; 0: per-host limits only
+THROTTLE_CACHE_SYNC_SECONDS = config('THROTTLE_CACHE_SYNC_SECONDS', default=0, cast=float)
+
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=15),
-    'REFRESH_TOKEN_LIFETIME': timedelta(days=7)
+    'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
+    # Embed the claims used by the stateless mode in every token
+    'TOKEN_OBTAIN_SERIALIZER': 'api.serializers.ClaimsTokenObtainPairSerializer',
+    'TOKEN_USER_CLASS': 'api.authentication.ClaimsTokenUser',
+    # Every refresh returns a new refresh token; the old one is revoked
+    'ROTATE_REFRESH_TOKENS': True,
+    'TOKEN_REFRESH_SERIALIZER': 'api.serializers.RotatingTokenRefreshSerializer',
 }
 
+# Revoked refresh tokens: in-memory Bloom filter synced from the table
+JWT_REVOCATION_SYNC_SECONDS = config('JWT_REVOCATION_SYNC_SECONDS', default=5, cast=int)
+# Each sync re-reads this many seconds before the last one (late commits, clock skew)
+JWT_REVOCATION_SYNC_OVERLAP_SECONDS = config('JWT_REVOCATION_SYNC_OVERLAP_SECONDS', default=30, cast=int)
+JWT_REVOCATION_REBUILD_SECONDS = config('JWT_REVOCATION_REBUILD_SECONDS', default=600, cast=int)
+JWT_REVOCATION_ERROR_RATE = 0.001
+
 # --- SWAGGER SETTINGS ---
+# Serve the schema files written by `manage.py build_schema` (run it on deploy);
+# otherwise it is generated once per process (runserver reloads on changes)
+OPENAPI_SCHEMA_PRECOMPUTED = config('OPENAPI_SCHEMA_PRECOMPUTED', default=not DEBUG, cast=bool)
+OPENAPI_SCHEMA_DIR = config('OPENAPI_SCHEMA_DIR', default=str(BASE_DIR / 'openapi'))
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Clickmart API',
     'DESCRIPTION': 'API documentation for my E-commerce Django REST project.',
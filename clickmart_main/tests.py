@@ -0,0 +1,308 @@
+import json
+import os
+import subprocess
+import sys
+from unittest import mock
+
+from django.contrib import admin
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from orders.models import Order, OrderItem
+from products.models import Product
+from users.models import User
+from . import admin_tools, metrics, profiling, queries, routers
+
+
+class FakeUser:
+    is_authenticated = True
+
+    def __init__(self, pk):
+        self.pk = pk
+
+
+@override_settings(READ_REPLICAS=["replica"], REPLICA_READ_APPS=["orders"], REPLICA_MAX_LAG_SECONDS=5,
+                   REPLICA_HEALTH_CHECK_SECONDS=10, REPLICA_STICKY_SECONDS=10)
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.monitor = routers.ReplicaMonitor(background=False)
+        self.monitor.measure_lag = lambda alias: 0.5
+        patcher = mock.patch.object(routers, "monitor", self.monitor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(routers.end_request)
+        self.router = routers.ReplicaRouter()
+
+    def begin(self, user_id=None):
+        request = RequestFactory().get("/")
+        request.user = FakeUser(user_id) if user_id else None
+        return routers.begin_request(request)
+
+    def test_reads_wait_for_the_first_probe(self):
+        self.begin()
+        self.assertEqual(self.router.db_for_read(Order), "default")
+        self.monitor.probe()
+        self.assertEqual(self.router.db_for_read(Order), "replica")
+        # Apps outside REPLICA_READ_APPS always read the primary
+        self.assertEqual(self.router.db_for_read(User), "default")
+
+    def test_lagging_unreachable_or_stale_replicas_are_skipped(self):
+        self.begin()
+        self.monitor.measure_lag = lambda alias: 30.0
+        self.monitor.probe()
+        self.assertEqual(self.monitor.status("replica"), (False, 30.0))
+        self.assertEqual(self.router.db_for_read(Order), "default")
+
+        def unreachable(alias):
+            raise DatabaseError("connection refused")
+        self.monitor.measure_lag = unreachable
+        self.monitor.probe()
+        self.assertEqual(self.monitor.status("replica"), (False, None))
+
+        self.monitor.measure_lag = lambda alias: 0.0
+        self.monitor.probe()
+        with mock.patch.object(routers.time, "monotonic", return_value=routers.time.monotonic() + 31):
+            self.assertEqual(self.router.db_for_read(Order), "default")
+
+    def test_request_that_wrote_stays_on_the_primary_and_pins_its_user(self):
+        self.monitor.probe()
+        state = self.begin(user_id=7)
+        self.assertEqual(self.router.db_for_read(Order), "replica")
+
+        state.record_query("UPDATE orders_order SET status = %s", "default", 0.001)
+        self.assertTrue(state.wrote)
+        self.assertEqual(self.router.db_for_read(Order), "default")
+        routers.end_request()
+        routers.pin_to_primary(state.user_id)
+
+        # Next request of the same user: pinned; other users are not
+        self.begin(user_id=7)
+        self.assertEqual(self.router.db_for_read(Order), "default")
+        self.begin(user_id=8)
+        self.assertEqual(self.router.db_for_read(Order), "replica")
+
+    def test_selects_do_not_count_as_writes(self):
+        self.monitor.probe()
+        state = self.begin(user_id=7)
+        state.record_query("  select * from orders_order", "default", 0.001)
+        # Writes on another alias (e.g. a replica in a test setup) do not pin
+        state.record_query("DELETE FROM orders_order", "replica", 0.001)
+        self.assertFalse(state.wrote)
+        self.assertEqual(self.router.db_for_read(Order), "replica")
+
+    def test_background_monitor_starts_one_prober(self):
+        monitor = routers.ReplicaMonitor()
+        with mock.patch.object(monitor, "_run"):
+            monitor.healthy()
+            prober = monitor._prober
+            self.assertIsNotNone(prober)
+            prober.join()
+            # Finished (or died): the next request starts another one
+            monitor.healthy()
+            self.assertIsNot(monitor._prober, prober)
+
+
+class QueryObserverTests(TestCase):
+    def test_metrics_profiling_and_routing_share_one_wrapper(self):
+        state = routers.begin_request(RequestFactory().get("/"))
+        counts = metrics.begin()
+        profile = profiling.begin()
+        try:
+            User.objects.count()
+            User.objects.filter(pk=0).update(first_name="x")
+        finally:
+            profiling.end()
+            metrics.end()
+            routers.end_request()
+
+        self.assertEqual(counts, {"default": 2})
+        self.assertEqual(profile.queries, 2)
+        self.assertGreater(profile.sql_seconds, 0)
+        self.assertTrue(state.wrote)
+        self.assertEqual(queries._observers.get(), ())
+        wrappers = [connection.execute_wrappers for connection in connections.all(initialized_only=True)]
+        self.assertTrue(all(wrapper == [queries.execute_wrapper] for wrapper in wrappers))
+
+    def test_statements_outside_an_observed_request_are_not_counted(self):
+        counts = metrics.begin()
+        metrics.end()
+        User.objects.count()
+        self.assertEqual(counts, {})
+
+
+class MetricsEndpointTests(SimpleTestCase):
+    def get(self, **headers):
+        return metrics.metrics_view(RequestFactory().get("/metrics", headers=headers))
+
+    @override_settings(METRICS_AUTH_TOKEN="", DEBUG=False)
+    def test_denied_without_a_token_outside_debug(self):
+        self.assertEqual(self.get().status_code, 403)
+
+    @override_settings(METRICS_AUTH_TOKEN="", DEBUG=True)
+    def test_open_in_debug_without_a_token(self):
+        self.assertEqual(self.get().status_code, 200)
+
+    @override_settings(METRICS_AUTH_TOKEN="s3cret", DEBUG=False)
+    def test_bearer_token_required_when_configured(self):
+        self.assertEqual(self.get(Authorization="Bearer nope").status_code, 403)
+        response = self.get(Authorization="Bearer s3cret")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"clickmart_http_request_duration_seconds", response.content)
+
+
+class ScalableAdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser(username="admin", email="admin@example.com", password="x")
+        product = Product.objects.create(name="Mug")
+        cls.order = Order.objects.create(user=cls.admin_user, order_number="ORD-KEYSET0001")
+        for index in range(5):
+            OrderItem.objects.create(order=cls.order, product=product, product_name=f"Mug {index}",
+                                     unit_price=1, quantity=1)
+        cls.item_ids = sorted(OrderItem.objects.values_list("id", flat=True))
+
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+        self.item_admin = admin.site._registry[OrderItem]
+        patcher = mock.patch.object(self.item_admin, "list_per_page", 2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def changelist(self, query=""):
+        # query: "" or a "?after=..." / "?before=..." link of the changelist
+        response = self.client.get("/admin/orders/orderitem/" + query)
+        self.assertEqual(response.status_code, 200)
+        cl = response.context["cl"]
+        return cl, [item.pk for item in cl.result_list]
+
+    def walk(self):
+        """
+        Follow the "Next page" links; [(cl, ids)] per page.
+        """
+        pages = [self.changelist()]
+        while pages[-1][0].next_page_url:
+            pages.append(self.changelist(pages[-1][0].next_page_url))
+        return pages
+
+    def test_keyset_pages_forward_through_every_row_once(self):
+        pages = self.walk()
+        self.assertEqual([ids for _, ids in pages], [self.item_ids[0:2], self.item_ids[2:4], self.item_ids[4:]])
+        first, _ = pages[0]
+        self.assertIsNone(first.previous_page_url)
+        self.assertIsNone(first.first_page_url)
+        self.assertEqual(pages[-1][0].result_count, 5)
+
+    def test_previous_page_goes_back_one_page(self):
+        pages = self.walk()
+        last, _ = pages[-1]
+        cl, ids = self.changelist(last.previous_page_url)
+        self.assertEqual(ids, self.item_ids[2:4])
+        self.assertIsNotNone(cl.next_page_url)
+        cl, ids = self.changelist(cl.previous_page_url)
+        self.assertEqual(ids, self.item_ids[0:2])
+        self.assertIsNone(cl.previous_page_url)
+        self.assertEqual(self.changelist(cl.next_page_url)[1], self.item_ids[2:4])
+        self.assertEqual(self.changelist(last.first_page_url)[1], self.item_ids[0:2])
+
+    def test_ties_on_the_leading_column_are_broken_by_the_unique_one(self):
+        OrderItem.objects.update(created_at=self.order.created_at)
+        with mock.patch.object(self.item_admin, "keyset_ordering", ("-created_at", "id")):
+            pages = self.walk()
+            self.assertEqual([pk for _, ids in pages for pk in ids], self.item_ids)
+            self.assertEqual(self.changelist(pages[-1][0].previous_page_url)[1], self.item_ids[2:4])
+
+    def test_malformed_cursor_is_a_lookup_error(self):
+        response = self.client.get("/admin/orders/orderitem/", {"after": "not-a-cursor"})
+        self.assertRedirects(response, "/admin/orders/orderitem/?e=1", fetch_redirect_response=False)
+
+    def test_count_is_exact_without_estimates_or_below_the_limit(self):
+        # SQLite: no statistics, so always COUNT(*)
+        cl, _ = self.changelist()
+        self.assertEqual((cl.result_count, cl.paginator.estimated), (5, False))
+        with mock.patch.object(admin_tools, "estimated_count", return_value=42):
+            cl, _ = self.changelist()
+        self.assertEqual((cl.result_count, cl.paginator.estimated), (5, False))
+
+    def test_large_estimate_replaces_the_count(self):
+        with mock.patch.object(admin_tools, "estimated_count", return_value=2_000_000) as estimate:
+            cl, _ = self.changelist()
+        self.assertEqual((cl.result_count, cl.paginator.estimated), (2_000_000, True))
+        self.assertFalse(estimate.call_args.args[0].query.where)
+
+    def test_filtered_changelist_counts_the_filtered_rows(self):
+        Order.objects.create(user=self.admin_user, order_number="ORD-KEYSET0002", status=Order.Status.PAID)
+        response = self.client.get("/admin/orders/order/", {"status__exact": Order.Status.PAID})
+        cl = response.context["cl"]
+        self.assertEqual(cl.result_count, 1)
+        self.assertIsNone(cl.full_result_count)
+        with mock.patch.object(admin_tools, "estimated_count", return_value=50_000) as estimate:
+            self.client.get("/admin/orders/order/", {"status__exact": Order.Status.PAID})
+        # The estimate is asked for the filtered queryset
+        self.assertTrue(estimate.call_args.args[0].query.where)
+
+    def test_list_display_relations_are_selected(self):
+        request = mock.Mock(user=self.admin_user)
+        self.assertEqual(self.item_admin.get_list_select_related(request), ("order",))
+
+
+# Runs in a fresh interpreter: settings are read once per process
+PROFILE_PROBE = """
+import json
+import django
+django.setup()
+from django.conf import settings
+from django.core.management import call_command
+call_command("check", "--fail-level", "ERROR")
+print("PROFILE " + json.dumps({
+    "apps": settings.INSTALLED_APPS,
+    "middleware": settings.MIDDLEWARE,
+    "urlconf": settings.ROOT_URLCONF,
+}))
+"""
+
+
+def load_profile(profile):
+    result = subprocess.run(
+        [sys.executable, "-c", PROFILE_PROBE],
+        env={**os.environ, "DEPLOYMENT_PROFILE": profile},
+        capture_output=True,
+        text=True,
+    )
+    lines = [line for line in result.stdout.splitlines() if line.startswith("PROFILE ")]
+    return result, json.loads(lines[-1][len("PROFILE "):]) if lines else None
+
+
+class DeploymentProfileTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.result, cls.profile = load_profile("api")
+
+    def test_api_profile_loads_and_passes_the_system_checks(self):
+        self.assertEqual(self.result.returncode, 0, self.result.stderr[-2000:])
+        self.assertEqual(self.profile["urlconf"], "clickmart_main.urls_api")
+        for app in ("django.contrib.admin", "django.contrib.sessions", "django.contrib.messages", "drf_spectacular"):
+            self.assertNotIn(app, self.profile["apps"])
+        self.assertNotIn("django.middleware.csrf.CsrfViewMiddleware", self.profile["middleware"])
+
+    def test_unknown_profile_is_refused(self):
+        result, profile = load_profile("tiny")
+        self.assertIsNone(profile)
+        self.assertIn("Unknown DEPLOYMENT_PROFILE 'tiny'", result.stderr)
+
+    def test_api_urlconf_and_middleware_serve_the_api_only(self):
+        Product.objects.create(name="Mug")
+        User.objects.create_user(username="ada", email="ada@example.com", password="Pass@123")
+        with override_settings(ROOT_URLCONF=self.profile["urlconf"], MIDDLEWARE=self.profile["middleware"]):
+            response = self.client.get("/api/v1/products/")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()[0]["name"], "Mug")
+            self.assertEqual(self.client.get("/admin/").status_code, 404)
+            self.assertEqual(self.client.get("/api/schema/").status_code, 404)
+            # JWT login without sessions or CSRF
+            response = self.client.post("/api/v1/token/", {"email": "ada@example.com", "password": "Pass@123"},
+                                        content_type="application/json")
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("access", response.json())
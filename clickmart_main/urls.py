@@ -4,8 +4,10 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from .metrics import metrics_view
+
+from api.schema import CachedSchemaView
 from drf_spectacular.views import (
-    SpectacularAPIView,
     SpectacularSwaggerView,
     SpectacularRedocView,
 )
@@ -14,10 +16,13 @@ from drf_spectacular.views import (
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/v1/', include('api.urls')),
+
+    # Prometheus scrape endpoint
+    path('metrics', metrics_view, name='metrics'),
     
     # Documentation Endpoints
-    # OpenAPI schema
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
+    # OpenAPI schema (precomputed by `manage.py build_schema`, see api/schema.py)
+    path('api/schema/', CachedSchemaView.as_view(), name='schema'),
     # Swagger UI
     path('api/docs/', SpectacularSwaggerView.as_view(
         url_name='schema',
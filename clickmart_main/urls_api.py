@@ -0,0 +1,16 @@
+# clickmart_main/urls_api.py
+"""
+URLconf of the 'api' deployment profile (see settings.DEPLOYMENT_PROFILE):
+the JSON API and metrics only; admin and docs are served by 'full' workers.
+"""
+from django.urls import path, include
+
+from .metrics import metrics_view
+
+
+urlpatterns = [
+    path('api/v1/', include('api.urls')),
+
+    # Prometheus scrape endpoint
+    path('metrics', metrics_view, name='metrics'),
+]
@@ -1,5 +1,16 @@
 from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.urls import path
+from django.utils import timezone
 from .models import Order, OrderItem, Refund
+from .exports import EXPORT_FORMATS, aiter_chunks, filter_orders, parse_day
+from .search import search_orders
+from analytics import services as rollups
+from webhooks import services as webhook_events
+from clickmart_main.admin_tools import ScalableAdminMixin
 
 
 class OrderItemInline(admin.TabularInline):
@@ -8,12 +19,17 @@ class OrderItemInline(admin.TabularInline):
     extra = 0
     can_delete = False
 
+    def get_queryset(self, request):
+        # "product" is a read-only field: one query per row without this
+        return super().get_queryset(request).select_related("product")
+
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(ScalableAdminMixin, admin.ModelAdmin):
     list_display = ("order_number", "user", "status", "total_amount", "currency", "created_at",)
     list_filter = ("status", "currency")
     search_fields = ("order_number", "user__email")
+    raw_id_fields = ("user",)
     readonly_fields = (
         "id",
         "subtotal",
@@ -28,15 +44,76 @@ class OrderAdmin(admin.ModelAdmin):
 
     inlines = [OrderItemInline]
 
+    def get_search_results(self, request, queryset, search_term):
+        # Index-backed search (trigram / unique) instead of OR-ed icontains
+        if not search_term:
+            return queryset, False
+        return search_orders(search_term, queryset), False
+
     actions = ["mark_as_cancelled"]
 
     def mark_as_cancelled(self, request, queryset):
-        queryset.update(status=Order.Status.CANCELLED)
+        # update() skips signals, so take the orders out of the rollups first
+        with transaction.atomic():
+            rollups.apply_bulk_status_change(queryset, Order.Status.CANCELLED)
+            webhook_events.record_bulk_status_change(queryset, Order.Status.CANCELLED)
+            queryset.update(status=Order.Status.CANCELLED)
 
     mark_as_cancelled.short_description = "Cancel selected orders"
+
+    # ───────────────────────────────
+    # Streaming Export
+    # ───────────────────────────────
+    # GET export/?format=csv|ndjson&status=PAID&start=2026-01-01&end=2026-02-01
+    # (the changelist's status__exact filter and search term q are honoured too)
+    change_list_template = "admin/orders/order/change_list.html"
+
+    def get_urls(self):
+        export_urls = [
+            path(
+                "export/",
+                self.admin_site.admin_view(self.export_view),
+                name="orders_order_export",
+            ),
+        ]
+        return export_urls + super().get_urls()
+
+    def export_view(self, request):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+
+        export_format = request.GET.get("format", "csv")
+        if export_format not in EXPORT_FORMATS:
+            return HttpResponseBadRequest("format must be 'csv' or 'ndjson'")
+
+        statuses = request.GET.getlist("status") or request.GET.getlist("status__exact")
+        try:
+            start = parse_day(request.GET.get("start"))
+            end = parse_day(request.GET.get("end"))
+        except ValueError:
+            return HttpResponseBadRequest("start and end must be dates (YYYY-MM-DD)")
+        orders = filter_orders(statuses=statuses, start=start, end=end)
+        search_term = request.GET.get("q", "").strip()
+        if search_term:
+            orders = search_orders(search_term, orders)
+
+        stream, content_type, extension = EXPORT_FORMATS[export_format]
+        chunks = stream(orders)
+        if isinstance(request, ASGIRequest):
+            # Stream chunk by chunk instead of buffering the whole export
+            chunks = aiter_chunks(chunks)
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        filename = f"orders-{timezone.now():%Y%m%d-%H%M}.{extension}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
     
 
-admin.site.register(OrderItem)
+@admin.register(OrderItem)
+class OrderItemAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    list_display = ("product_name", "order", "quantity", "unit_price", "line_total", "created_at")
+    raw_id_fields = ("order", "product")
+    # Meta.ordering, on the primary key index
+    keyset_ordering = ("id",)
 
 
 @admin.register(Refund)
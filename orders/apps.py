@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class OrdersConfig(AppConfig):
     name = 'orders'
+
+    def ready(self):
+        # remember each order's saved status and send order_status_changed
+        from . import signals  # noqa: F401
@@ -0,0 +1,118 @@
+# orders/emails.py
+"""
+Order confirmation rendering engine.
+
+- Templates are loaded and compiled ONCE per process (not per order).
+- Orders, their user and their items come from ONE query (items joined
+  to order and user), instead of lazy queries inside the template.
+- The text part has its own template instead of strip_tags() over HTML.
+- Messages can be rendered / sent in batches over one SMTP connection
+  (outbox or bulk resend jobs).
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template.loader import get_template
+
+from .models import Order, OrderItem
+
+
+HTML_TEMPLATE = "emails/order_confirmation.html"
+TEXT_TEMPLATE = "emails/order_confirmation.txt"
+
+
+@lru_cache(maxsize=None)
+def compiled_template(name):
+    """
+    Load and compile a template once per process.
+    """
+    return get_template(name)
+
+
+def load_orders_for_email(order_ids):
+    """
+    Return [(order, [items])] in the order of `order_ids`.
+    One query joins OrderItem -> Order -> User; a second one runs only
+    for orders that have no items at all.
+    """
+    order_ids = list(order_ids)
+    loaded = {}
+
+    items = (
+        OrderItem.objects.filter(order_id__in=order_ids)
+        .select_related("order__user")
+        .order_by("order_id", "id")
+    )
+    for item in items:
+        order, order_items = loaded.setdefault(item.order_id, (item.order, []))
+        # Share one Order instance between all the items of the order
+        item.order = order
+        order_items.append(item)
+
+    missing = [order_id for order_id in order_ids if order_id not in loaded]
+    if missing:
+        for order in Order.objects.filter(pk__in=missing).select_related("user"):
+            loaded[order.pk] = (order, [])
+
+    return [loaded[order_id] for order_id in order_ids if order_id in loaded]
+
+
+def render_order_confirmation(order, items):
+    """
+    Build the confirmation message for one order (nothing is sent).
+    Returns None when the customer has no email address.
+    """
+    if not order.user.email:
+        return None  # Fail silently (common practice)
+
+    # ───────────────────────────────
+    # Template Context
+    # ───────────────────────────────
+    context = {
+        "order": order,
+        "user": order.user,
+        "items": items,
+        "company_name": settings.COMPANY_NAME,
+        "support_email": settings.SUPPORT_EMAIL,
+    }
+
+    # ───────────────────────────────
+    # Build Email
+    # ───────────────────────────────
+    email = EmailMultiAlternatives(
+        subject=f"🧾 Order Confirmation – {order.order_number}",
+        body=compiled_template(TEXT_TEMPLATE).render(context),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[order.user.email],
+    )
+    email.attach_alternative(compiled_template(HTML_TEMPLATE).render(context), "text/html")
+    return email
+
+
+def render_order_confirmations(order_ids):
+    """
+    Render confirmation messages for many orders (batch jobs).
+    """
+    messages = []
+    for order, items in load_orders_for_email(order_ids):
+        email = render_order_confirmation(order, items)
+        if email is not None:
+            messages.append(email)
+    return messages
+
+
+def send_order_confirmations(order_ids, chunk_size=200, fail_silently=False):
+    """
+    Render and send confirmations in chunks over ONE mail connection.
+    Returns the number of messages sent.
+    """
+    order_ids = list(order_ids)
+    sent = 0
+
+    with get_connection(fail_silently=fail_silently) as connection:
+        for start in range(0, len(order_ids), chunk_size):
+            messages = render_order_confirmations(order_ids[start:start + chunk_size])
+            sent += connection.send_messages(messages) or 0
+
+    return sent
@@ -0,0 +1,236 @@
+# orders/exports.py
+"""
+Streaming export of orders and their line items (CSV / NDJSON).
+
+Orders and OrderItems are read with two server-side cursors
+(`iterator(chunk_size=...)`) sorted on the same key, then merged in
+Python: memory stays flat no matter how many millions of rows are
+exported, and there is no per-order prefetch query. Both cursors run in
+one REPEATABLE READ transaction on the same database, so they see the
+same orders.
+
+Under ASGI, Django would drain a sync generator with
+`sync_to_async(list)` before sending a byte; `aiter_chunks()` pulls one
+chunk at a time instead, always on the same worker thread, so the
+connection holding the transaction and cursors is the same for every
+chunk.
+"""
+import csv
+import io
+import json
+from contextlib import contextmanager
+from datetime import datetime, time, timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from django.utils.dateparse import parse_date
+
+from .models import Order, OrderItem
+
+
+EXPORT_CHUNK_SIZE = 2000
+
+# Rows buffered before a chunk is handed to the response
+ROWS_PER_WRITE = 500
+
+ORDER_FIELDS = [
+    "id",
+    "order_number",
+    "status",
+    "user__email",
+    "currency",
+    "subtotal",
+    "tax_amount",
+    "discount_amount",
+    "shipping_amount",
+    "total_amount",
+    "payment_provider",
+    "payment_reference",
+    "paid_at",
+    "phone",
+    "city",
+    "state",
+    "postal_code",
+    "country",
+    "created_at",
+]
+
+ITEM_FIELDS = [
+    "order_id",
+    "product_id",
+    "product_name",
+    "product_sku",
+    "unit_price",
+    "quantity",
+    "tax_percent",
+    "tax_amount",
+    "discount_amount",
+    "line_total",
+]
+
+# CSV header: one row per line item, order columns repeated
+CSV_HEADER = (
+    ["order_id" if field == "id" else field.replace("__", "_") for field in ORDER_FIELDS]
+    + [f"item_{field}" for field in ITEM_FIELDS[1:]]
+)
+
+
+def parse_day(value):
+    """
+    'YYYY-MM-DD' -> aware midnight UTC, None when missing.
+    Raises ValueError for anything else (never "no filter").
+    """
+    if not value:
+        return None
+    day = parse_date(value)
+    if day is None:
+        raise ValueError(f"{value!r} is not a date (YYYY-MM-DD)")
+    return datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+
+
+def filter_orders(statuses=None, start=None, end=None):
+    """
+    Orders matching the export filters (end is exclusive).
+    """
+    queryset = Order.objects.all()
+    if statuses:
+        queryset = queryset.filter(status__in=statuses)
+    if start is not None:
+        queryset = queryset.filter(created_at__gte=start)
+    if end is not None:
+        queryset = queryset.filter(created_at__lt=end)
+    return queryset
+
+
+@contextmanager
+def snapshot(using):
+    """
+    One transaction (REPEATABLE READ on PostgreSQL) for every query in
+    the block, so they all read the same committed data.
+    """
+    connection = connections[using]
+    outermost = not connection.in_atomic_block
+    with transaction.atomic(using=using):
+        if outermost and connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+        yield
+
+
+def iter_orders_with_items(orders, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield (order_values, [item_values, ...]) using a merge join.
+    Both cursors are ordered by order id, so each order's items are the
+    next contiguous run in the item stream.
+    """
+    # Pin both cursors to one database (the router may pick a replica)
+    using = orders.db
+    with snapshot(using):
+        order_rows = (
+            orders.using(using)
+            .order_by("id")
+            .values(*ORDER_FIELDS)
+            .iterator(chunk_size=chunk_size)
+        )
+        item_rows = (
+            OrderItem.objects.using(using)
+            .filter(order__in=orders.values("id"))
+            .order_by("order_id", "id")
+            .values(*ITEM_FIELDS)
+            .iterator(chunk_size=chunk_size)
+        )
+
+        yield from merge_items(order_rows, item_rows)
+
+
+def merge_items(order_rows, item_rows):
+    """
+    Merge two streams sorted by order id (UUIDs compare in Python as
+    they sort in the database).
+    """
+    item_rows = iter(item_rows)
+    pending = next(item_rows, None)
+    for order in order_rows:
+        # Items of an order missing from the order stream: skip them,
+        # or they would hold back the items of every later order
+        while pending is not None and pending["order_id"] < order["id"]:
+            pending = next(item_rows, None)
+        items = []
+        while pending is not None and pending["order_id"] == order["id"]:
+            items.append(pending)
+            pending = next(item_rows, None)
+        yield order, items
+
+
+def stream_csv(orders, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    One CSV row per line item (orders without items get one row).
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+    empty_item = [""] * (len(ITEM_FIELDS) - 1)
+
+    rows = 0
+    for order, items in iter_orders_with_items(orders, chunk_size):
+        order_cells = [order[field] for field in ORDER_FIELDS]
+        if not items:
+            writer.writerow(order_cells + empty_item)
+            rows += 1
+        for item in items:
+            writer.writerow(order_cells + [item[field] for field in ITEM_FIELDS[1:]])
+            rows += 1
+
+        if rows >= ROWS_PER_WRITE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+
+    yield buffer.getvalue()
+
+
+def stream_ndjson(orders, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    One JSON object per order with its items nested.
+    """
+    lines = []
+    for order, items in iter_orders_with_items(orders, chunk_size):
+        order["user_email"] = order.pop("user__email")
+        order["items"] = [
+            {key: value for key, value in item.items() if key != "order_id"}
+            for item in items
+        ]
+        lines.append(json.dumps(order, cls=DjangoJSONEncoder))
+
+        if len(lines) >= ROWS_PER_WRITE:
+            yield "\n".join(lines) + "\n"
+            lines = []
+
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+async def aiter_chunks(chunks):
+    """
+    Async iterator over a sync chunk generator for ASGI responses.
+    Every step (and the final close, which ends the transaction) runs
+    thread-sensitive, i.e. on the thread that opened the connection.
+    """
+    chunks = iter(chunks)
+    done = object()
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    try:
+        while (chunk := await next_chunk(chunks, done)) is not done:
+            yield chunk
+    finally:
+        # Client gone or stream finished: exit the snapshot() block
+        await sync_to_async(chunks.close, thread_sensitive=True)()
+
+
+EXPORT_FORMATS = {
+    # format: (generator, content type, file extension)
+    "csv": (stream_csv, "text/csv", "csv"),
+    "ndjson": (stream_ndjson, "application/x-ndjson", "ndjson"),
+}
@@ -0,0 +1,82 @@
+# orders/management/commands/bench_order_emails.py
+"""
+Throughput benchmark for order confirmation rendering.
+
+Compares the legacy path (render_to_string + strip_tags with lazy
+order.user / order.items queries) against orders.emails (templates
+compiled once, one query per batch, dedicated text template).
+Nothing is sent.
+"""
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test.utils import CaptureQueriesContext
+from django.utils.html import strip_tags
+
+from orders.models import Order
+from orders import emails
+
+
+def render_legacy(order_ids):
+    messages = []
+    for order in Order.objects.filter(pk__in=order_ids):
+        context = {
+            "order": order,
+            "user": order.user,
+            "items": order.items.all(),
+            "company_name": settings.COMPANY_NAME,
+            "support_email": settings.SUPPORT_EMAIL,
+        }
+        html_content = render_to_string(emails.HTML_TEMPLATE, context)
+        email = EmailMultiAlternatives(
+            subject=f"🧾 Order Confirmation – {order.order_number}",
+            body=strip_tags(html_content),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[order.user.email],
+        )
+        email.attach_alternative(html_content, "text/html")
+        messages.append(email)
+    return messages
+
+
+class Command(BaseCommand):
+    help = "Benchmark order confirmation rendering (legacy vs precompiled batch engine)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=500, help="Most recent orders to render (default: 500)")
+        parser.add_argument("--rounds", type=int, default=3, help="Timed rounds per engine, best is kept (default: 3)")
+
+    def handle(self, *args, **options):
+        order_ids = list(Order.objects.values_list("id", flat=True)[:options["orders"]])
+        if not order_ids:
+            raise CommandError("No orders to render; seed some data first.")
+
+        engines = [
+            ("legacy", render_legacy),
+            ("precompiled", emails.render_order_confirmations),
+        ]
+
+        self.stdout.write(f"Rendering {len(order_ids)} orders, best of {options['rounds']} rounds")
+        self.stdout.write(f"{'engine':<14}{'emails/s':>12}{'ms/email':>10}{'queries':>9}")
+
+        for name, render in engines:
+            best, queries = None, 0
+            for _ in range(options["rounds"]):
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    messages = render(order_ids)
+                    # Serialize the MIME message as the mail backend would
+                    for message in messages:
+                        message.message().as_bytes()
+                    elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+                queries = len(captured)
+
+            self.stdout.write(
+                f"{name:<14}{len(messages) / best:>12.1f}"
+                f"{best * 1000 / max(len(messages), 1):>10.3f}{queries:>9}"
+            )
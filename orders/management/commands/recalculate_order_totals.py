@@ -0,0 +1,35 @@
+# orders/management/commands/recalculate_order_totals.py
+from django.core.management.base import BaseCommand
+
+from orders.models import Order
+
+
+class Command(BaseCommand):
+    help = (
+        "Repair job: recompute subtotal, tax and total from OrderItem rows "
+        "for many orders in ONE UPDATE statement. By default only orders "
+        "that are not paid yet (DRAFT, PENDING) are touched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--status",
+            action="append",
+            dest="statuses",
+            help="Order status to include (repeatable). Default: DRAFT and PENDING",
+        )
+        parser.add_argument(
+            "--order-number",
+            action="append",
+            dest="order_numbers",
+            help="Limit to these order numbers (repeatable)",
+        )
+
+    def handle(self, *args, **options):
+        statuses = options["statuses"] or Order.EDITABLE_STATUSES
+        orders = Order.objects.filter(status__in=statuses)
+        if options["order_numbers"]:
+            orders = orders.filter(order_number__in=options["order_numbers"])
+
+        updated = orders.recalculate_totals()
+        self.stdout.write(self.style.SUCCESS(f"Recalculated totals for {updated} orders."))
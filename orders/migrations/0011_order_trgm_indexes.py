@@ -0,0 +1,42 @@
+# Generated by Django 6.0 on 2026-10-18 23:05
+
+from django.db import migrations
+
+
+# Trigram GIN indexes for partial order search (order number, phone,
+# postal code). They index UPPER(column) because that is what Django
+# compiles `__icontains` to on PostgreSQL. Other backends are skipped.
+TRGM_COLUMNS = ["order_number", "phone", "postal_code"]
+
+CREATE_SQL = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] + [
+    f'CREATE INDEX CONCURRENTLY IF NOT EXISTS orders_order_{column}_trgm '
+    f'ON orders_order USING gin ((UPPER("{column}"::text)) gin_trgm_ops)'
+    for column in TRGM_COLUMNS
+]
+DROP_SQL = [
+    f"DROP INDEX CONCURRENTLY IF EXISTS orders_order_{column}_trgm"
+    for column in TRGM_COLUMNS
+]
+
+
+def run_on_postgresql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('orders', '0010_alter_order_status'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_on_postgresql(CREATE_SQL), run_on_postgresql(DROP_SQL)),
+    ]
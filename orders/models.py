@@ -1,8 +1,10 @@
 # orders/models.py
 import uuid
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
 from django.conf import settings
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
@@ -14,6 +16,36 @@ from products.models import Product
 User = get_user_model()
 
 
+ZERO = Decimal("0.00")
+CENT = Decimal("0.01")
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+
+
+class OrderQuerySet(models.QuerySet):
+    def recalculate_totals(self):
+        """
+        Recompute subtotal / tax / total for EVERY order in the queryset
+        with a single UPDATE (correlated SUM subqueries over OrderItem).
+        Meant for repair jobs; returns the number of orders updated.
+        """
+        items = OrderItem.objects.filter(order=OuterRef("pk")).order_by().values("order")
+        subtotal = Coalesce(
+            Subquery(items.annotate(value=Sum(F("unit_price") * F("quantity"))).values("value"), output_field=MONEY),
+            Value(ZERO),
+            output_field=MONEY,
+        )
+        tax = Coalesce(
+            Subquery(items.annotate(value=Sum("tax_amount")).values("value"), output_field=MONEY),
+            Value(ZERO),
+            output_field=MONEY,
+        )
+        return self.update(
+            subtotal=subtotal,
+            tax_amount=tax,
+            total_amount=subtotal + tax + F("shipping_amount") - F("discount_amount"),
+        )
+
+
 class Order(models.Model):
     """
     Enterprise-grade Order model.
@@ -23,18 +55,22 @@ class Order(models.Model):
     # ───────────────────────────────
     # Order Status Lifecycle
     # ───────────────────────────────
-    STATUS_CHOICES = [
-        ('DRAFT', 'Draft'),
-        ('PENDING', 'Pending Payment'),
-        ('PAID', 'Paid'),
-        ('PROCESSING', 'Processing'),
-        ('SHIPPED', 'Shipped'),
-        ('COMPLETED', 'Completed'),
-        ('DELIVERED', 'Delivered'),
-        ('CANCELLED', 'Cancelled'),
-        ('REFUNDED', 'Refunded'),
-        ('FAILED', 'Failed'),
-    ]    
+    class Status(models.TextChoices):
+        DRAFT = "DRAFT", "Draft"
+        PENDING = "PENDING", "Pending Payment"
+        PAID = "PAID", "Paid"
+        PROCESSING = "PROCESSING", "Processing"
+        SHIPPED = "SHIPPED", "Shipped"
+        COMPLETED = "COMPLETED", "Completed"
+        DELIVERED = "DELIVERED", "Delivered"
+        CANCELLED = "CANCELLED", "Cancelled"
+        REFUNDED = "REFUNDED", "Refunded"
+        FAILED = "FAILED", "Failed"
+
+    STATUS_CHOICES = Status.choices
+
+    # Order items may only change while the order is in one of these
+    EDITABLE_STATUSES = (Status.DRAFT, Status.PENDING)
 
     # ───────────────────────────────
     # Primary Identifiers
@@ -50,7 +86,7 @@ class Order(models.Model):
     # ───────────────────────────────
     # Status & Lifecycle
     # ───────────────────────────────
-    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="DRAFT", db_index=True)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.DRAFT, db_index=True)
 
     # ───────────────────────────────
     # Financial Fields (IMMUTABLE)
@@ -103,6 +139,8 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = OrderQuerySet.as_manager()
+
     # ───────────────────────────────
     # Database Optimizations
     # ───────────────────────────────
@@ -118,13 +156,29 @@ class Order(models.Model):
     # Business Logic
     # ───────────────────────────────
     # Order totals should be derived from OrderItems once, then frozen.
-    def recalculate_from_items(self):
+    def recalculate_from_items(self, items=None):
         """
         Recalculate financial totals.
         Should be called ONLY before payment.
+
+        Pass `items` when the OrderItems are already in memory (checkout)
+        to avoid re-querying; otherwise totals are summed in SQL.
         """
-        self.subtotal = sum(item.unit_price * item.quantity for item in self.items.all())
-        self.tax_amount = sum(item.tax_amount for item in self.items.all())
+        if items is not None:
+            subtotal, tax_amount = ZERO, ZERO
+            for item in items:
+                subtotal += item.unit_price * item.quantity
+                tax_amount += item.tax_amount
+        else:
+            totals = self.items.aggregate(
+                subtotal=Sum(F("unit_price") * F("quantity"), output_field=MONEY),
+                tax_amount=Sum("tax_amount"),
+            )
+            subtotal = totals["subtotal"] or ZERO
+            tax_amount = totals["tax_amount"] or ZERO
+
+        self.subtotal = subtotal
+        self.tax_amount = tax_amount
         self.total_amount = (
             self.subtotal
             + self.tax_amount
@@ -148,6 +202,12 @@ class Order(models.Model):
             "paid_at"
         ])        
     
+    def save(self, *args, **kwargs):
+        # Status listeners (webhook outbox, rollups) write in the same
+        # transaction as the order row
+        with transaction.atomic(using=kwargs.get("using") or router.db_for_write(Order, instance=self), savepoint=False):
+            super().save(*args, **kwargs)
+
     # guarantee order_number creation
     # def save(self, *args, **kwargs):
     #     if not self.order_number:
@@ -163,6 +223,41 @@ class Order(models.Model):
         return f"Order {self.order_number} ({self.status})"
 
 
+class OrderItemQuerySet(models.QuerySet):
+    """
+    Bulk paths skip OrderItem.save(), so the immutability rule is
+    enforced here too: ONE status query per batch, never one per item.
+    """
+
+    def _check_orders_editable(self, items):
+        unchecked_ids = set()
+        for item in items:
+            if OrderItem.order.is_cached(item):
+                # Order already in memory (e.g. checkout): no query needed
+                if item.order.status not in Order.EDITABLE_STATUSES:
+                    raise ValueError("Order items cannot be modified after payment.")
+            else:
+                unchecked_ids.add(item.order_id)
+
+        if unchecked_ids and (
+            Order.objects.filter(pk__in=unchecked_ids)
+            .exclude(status__in=Order.EDITABLE_STATUSES)
+            .exists()
+        ):
+            raise ValueError("Order items cannot be modified after payment.")
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        self._check_orders_editable(objs)
+        return super().bulk_create(objs, *args, **kwargs)
+
+    # bulk_update() runs update() per batch, so it is checked there
+    def update(self, **kwargs):
+        if self.exclude(order__status__in=Order.EDITABLE_STATUSES).exists():
+            raise ValueError("Order items cannot be modified after payment.")
+        return super().update(**kwargs)
+
+
 class OrderItem(models.Model):
     """
     Immutable snapshot of a product at the time of purchase.
@@ -221,6 +316,8 @@ class OrderItem(models.Model):
     # ───────────────────────────────
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = OrderItemQuerySet.as_manager()
+
     # ───────────────────────────────
     # Database Optimizations
     # ───────────────────────────────
@@ -240,18 +337,24 @@ class OrderItem(models.Model):
         MUST be called before saving.
         """
         base_price = self.unit_price * self.quantity
-        self.tax_amount = (base_price * self.tax_percent) / Decimal("100")
-        self.line_total = base_price + self.tax_amount - self.discount_amount
+        # Rounded to the stored precision, so in-memory totals (checkout)
+        # add up to the same figures as the saved rows
+        self.tax_amount = ((base_price * self.tax_percent) / Decimal("100")).quantize(CENT, rounding=ROUND_HALF_UP)
+        self.line_total = (base_price + self.tax_amount - self.discount_amount).quantize(CENT, rounding=ROUND_HALF_UP)
 
     def save(self, *args, **kwargs):
         """
         Enforce immutability after order is paid.
         """
-        if self.pk and self.order.status not in [
-            self.order.Status.DRAFT,
-            self.order.Status.PENDING,
-        ]:
-            raise ValueError("Order items cannot be modified after payment.")
+        if not self._state.adding:
+            if OrderItem.order.is_cached(self):
+                order_status = self.order.status
+            else:
+                # Fetch only the status, not the whole parent order
+                order_status = Order.objects.filter(pk=self.order_id).values_list("status", flat=True).first()
+
+            if order_status not in Order.EDITABLE_STATUSES:
+                raise ValueError("Order items cannot be modified after payment.")
 
         # Always check for None, not falsy decimals
         if self.line_total is None:
@@ -0,0 +1,65 @@
+# orders/search.py
+"""
+Fast order search for the admin and the support API.
+
+`icontains` over an OR of columns (one of them behind a JOIN on users)
+forces a sequential scan. Instead each column is searched on its own,
+so every query can use its trigram GIN index (see migration 0011), and
+the matching ids are combined. Exact order numbers skip all of that and
+hit the unique index directly.
+"""
+import re
+
+from users.search import MIN_PARTIAL_LENGTH, search_users
+from .models import Order
+
+
+ORDER_NUMBER_RE = re.compile(r"^ORD-[A-Z0-9]{10}$", re.IGNORECASE)
+
+PARTIAL_LOOKUPS = ("order_number__icontains", "phone__icontains", "postal_code__icontains")
+
+
+def matching_order_ids(term, limit=None):
+    """
+    Orders matching `term` in any searched column, one index-backed query
+    per column. Without `limit`: a UNION subquery of every match (admin
+    changelist, which pages and counts them). With `limit`: a set of the
+    `limit` newest matches of each column, which still holds the `limit`
+    newest matches overall.
+    """
+    per_column = [Order.objects.filter(**{lookup: term}) for lookup in PARTIAL_LOOKUPS]
+    per_column.append(Order.objects.filter(user_id__in=search_users(term).order_by().values("id")))
+
+    if limit is None:
+        first, *rest = [orders.order_by().values("id") for orders in per_column]
+        return first.union(*rest)
+
+    ids = set()
+    for orders in per_column:
+        ids.update(orders.order_by("-created_at").values_list("id", flat=True)[:limit])
+    return ids
+
+
+def search_orders(term, queryset=None, limit=None):
+    """
+    Filter `queryset` (default: all orders) by a support search term:
+    order number, customer email, phone or postal code.
+
+    `limit` caps the partial matches to the newest `limit` orders; pass
+    it only when the results are shown newest first and cut to at most
+    `limit` rows.
+    """
+    queryset = Order.objects.all() if queryset is None else queryset
+    term = term.strip()
+    if not term:
+        return queryset
+
+    # Exact order number -> unique index, nothing else to do
+    if ORDER_NUMBER_RE.match(term):
+        return queryset.filter(order_number=term.upper())
+
+    # Too short for trigrams: exact matches only
+    if len(term) < MIN_PARTIAL_LENGTH:
+        return queryset.filter(order_number=term)
+
+    return queryset.filter(pk__in=matching_order_ids(term, limit))
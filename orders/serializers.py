@@ -50,6 +50,28 @@ class OrderSerializer(serializers.ModelSerializer):
         ]
 
 
+class OrderSearchResultSerializer(serializers.ModelSerializer):
+    """
+    Lightweight order row for the support search (no items).
+    """
+    email = serializers.EmailField(source="user.email", read_only=True)
+
+    class Meta:
+        model = Order
+        fields = [
+            "id",
+            "order_number",
+            "status",
+            "email",
+            "phone",
+            "postal_code",
+            "total_amount",
+            "currency",
+            "created_at",
+        ]
+        read_only_fields = fields
+
+
 class RefundSerializer(serializers.ModelSerializer):
     class Meta:
         model = Refund
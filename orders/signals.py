@@ -0,0 +1,35 @@
+# orders/signals.py
+from django.db.models.signals import post_init, post_save
+from django.dispatch import Signal, receiver
+
+from .models import Order
+
+
+# Sent after an existing order's status was saved with a new value (in the
+# save's transaction): sender=Order, order, old_status, new_status.
+# QuerySet.update() skips it; bulk paths call the services directly.
+order_status_changed = Signal()
+
+
+@receiver(post_init, sender=Order)
+def remember_saved_status(sender, instance, **kwargs):
+    # Read from __dict__ so a deferred status field is not lazy-loaded
+    instance._saved_status = instance.__dict__.get("status")
+
+
+@receiver(post_save, sender=Order)
+def send_status_change(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Compare with the status last loaded or written. A save whose
+    update_fields leave out "status" did not write it, so the remembered
+    status stays what the database holds.
+    New orders are recorded by the checkout once their items exist.
+    """
+    if update_fields is not None and "status" not in update_fields:
+        return
+    old_status = instance._saved_status
+    instance._saved_status = instance.status
+
+    if created or old_status is None or old_status == instance.status:
+        return
+    order_status_changed.send(sender=Order, order=instance, old_status=old_status, new_status=instance.status)
@@ -1,3 +1,311 @@
+import csv
+import io
+import uuid
+from decimal import Decimal
+from unittest import mock
+
+from django.db import transaction
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from products.models import Product
+from users.models import User
+from .emails import load_orders_for_email, render_order_confirmation
+from .search import matching_order_ids, search_orders
+from .exports import aiter_chunks, filter_orders, merge_items, parse_day, stream_csv, stream_ndjson
+from .models import Order, OrderItem
+
+
+def make_order(user, number, status=Order.Status.PENDING, products=()):
+    order = Order.objects.create(user=user, order_number=number, status=Order.Status.PENDING)
+    for product in products:
+        OrderItem.objects.create(order=order, product=product, product_name=product.name,
+                                 unit_price=product.price, quantity=1)
+    if status != Order.Status.PENDING:
+        Order.objects.filter(pk=order.pk).update(status=status)
+        order.refresh_from_db()
+    return order
+
+
+class OrderExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="buyer", email="buyer@example.com", password="x")
+        cls.mug = Product.objects.create(name="Mug", price=Decimal("10.00"))
+        cls.cup = Product.objects.create(name="Cup", price=Decimal("4.00"))
+
+    def test_merge_skips_items_of_vanished_orders(self):
+        ids = sorted(uuid.uuid4() for _ in range(4))
+        orders = [{"id": ids[1]}, {"id": ids[2]}, {"id": ids[3]}]
+        items = [
+            {"order_id": ids[0], "product_name": "gone"},  # order deleted meanwhile
+            {"order_id": ids[1], "product_name": "a"},
+            {"order_id": ids[1], "product_name": "b"},
+            {"order_id": ids[3], "product_name": "c"},
+        ]
+        merged = [(order["id"], [item["product_name"] for item in rows]) for order, rows in merge_items(orders, items)]
+        self.assertEqual(merged, [(ids[1], ["a", "b"]), (ids[2], []), (ids[3], ["c"])])
+
+    def test_csv_export_keeps_items_after_an_itemless_order(self):
+        orders = [
+            make_order(self.user, "ORD-1", products=[self.mug, self.cup]),
+            make_order(self.user, "ORD-2"),
+            make_order(self.user, "ORD-3", products=[self.cup]),
+        ]
+        rows = list(csv.DictReader(io.StringIO("".join(stream_csv(filter_orders(), chunk_size=1)))))
+
+        by_order = {}
+        for row in rows:
+            by_order.setdefault(row["order_number"], []).append(row["item_product_name"])
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(sorted(by_order["ORD-1"]), ["Cup", "Mug"])
+        self.assertEqual(by_order["ORD-2"], [""])
+        self.assertEqual(by_order["ORD-3"], ["Cup"])
+        self.assertEqual({row["order_id"] for row in rows}, {str(order.pk) for order in orders})
+
+    def test_ndjson_export_filters_by_status(self):
+        make_order(self.user, "ORD-1", products=[self.mug])
+        make_order(self.user, "ORD-2", status=Order.Status.PAID, products=[self.cup])
+        lines = "".join(stream_ndjson(filter_orders(statuses=[Order.Status.PAID]))).splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertIn('"ORD-2"', lines[0])
+        self.assertIn('"Cup"', lines[0])
+
+    def test_parse_day_rejects_malformed_dates(self):
+        self.assertIsNone(parse_day(""))
+        self.assertEqual(parse_day("2026-02-01").isoformat(), "2026-02-01T00:00:00+00:00")
+        for value in ("2026-13-01", "yesterday", "01/02/2026"):
+            with self.assertRaises(ValueError):
+                parse_day(value)
+
+    def test_admin_export_returns_400_for_bad_dates(self):
+        admin = User.objects.create_superuser(username="admin", email="admin@example.com", password="x")
+        self.client.force_login(admin)
+        response = self.client.get("/admin/orders/order/export/", {"start": "2026-02-30"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get("/admin/orders/order/export/", {"start": "2026-02-01", "format": "ndjson"})
+        self.assertEqual(response.status_code, 200)
+
+    def test_admin_export_honours_the_changelist_search(self):
+        make_order(self.user, "ORD-1001", products=[self.mug])
+        make_order(self.user, "ORD-2002", products=[self.cup])
+        admin = User.objects.create_superuser(username="admin", email="admin@example.com", password="x")
+        self.client.force_login(admin)
+
+        changelist = self.client.get("/admin/orders/order/", {"q": "1001"})
+        self.assertContains(changelist, "export/?format=csv&q=1001")
+
+        response = self.client.get("/admin/orders/order/export/", {"format": "ndjson", "q": "1001"})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertIn('"ORD-1001"', lines[0])
+
+    async def test_asgi_export_streams_chunk_by_chunk(self):
+        admin = await User.objects.acreate_user(username="admin", email="admin@example.com",
+                                                password="x", is_staff=True, is_superuser=True)
+        await self.async_client.aforce_login(admin)
+        with mock.patch("orders.admin.aiter_chunks", wraps=aiter_chunks) as wrapped:
+            response = await self.async_client.get("/admin/orders/order/export/", {"format": "csv"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        wrapped.assert_called_once()
+        body = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertTrue(body.startswith(b"order_id,order_number"))
+
+    async def test_aiter_chunks_pulls_lazily_and_closes_the_generator(self):
+        pulled = []
+
+        def chunks():
+            try:
+                for chunk in ("a", "b", "c"):
+                    pulled.append(chunk)
+                    yield chunk
+            finally:
+                pulled.append("closed")
+
+        stream = aiter_chunks(chunks())
+        self.assertEqual(await anext(stream), "a")
+        self.assertEqual(pulled, ["a"])
+        await stream.aclose()
+        self.assertEqual(pulled, ["a", "closed"])
+
+
+class OrderItemImmutabilityTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="buyer", email="buyer@example.com", password="x")
+        cls.mug = Product.objects.create(name="Mug", price=Decimal("10.00"))
+
+    def item(self, order):
+        item = OrderItem(order=order, product=self.mug, product_name="Mug", unit_price=Decimal("10.00"), quantity=1)
+        # bulk_create() skips save(), which fills the totals
+        item.calculate_totals()
+        return item
+
+    def test_items_of_unpaid_orders_can_change(self):
+        order = make_order(self.user, "ORD-1", products=[self.mug])
+        item = order.items.get()
+        item.quantity = 2
+        item.save()
+        OrderItem.objects.filter(order=order).update(quantity=3)
+        OrderItem.objects.bulk_update([item], ["quantity"])
+        OrderItem.objects.bulk_create([self.item(order)])
+        self.assertEqual(order.items.count(), 2)
+
+    def test_paid_order_items_reject_every_write_path(self):
+        order = make_order(self.user, "ORD-1", status=Order.Status.PAID, products=[self.mug])
+        item = OrderItem.objects.get(order=order)
+        item.quantity = 5
+        with self.assertRaisesMessage(ValueError, "cannot be modified after payment"):
+            item.save()
+        with self.assertRaises(ValueError):
+            OrderItem.objects.filter(order=order).update(quantity=5)
+        # bulk_update() raises inside its own atomic block
+        with self.assertRaises(ValueError), transaction.atomic():
+            OrderItem.objects.bulk_update([item], ["quantity"])
+        with self.assertRaises(ValueError):
+            OrderItem.objects.bulk_create([self.item(order)])
+        self.assertEqual(OrderItem.objects.get(pk=item.pk).quantity, 1)
+
+    def test_bulk_checks_take_one_status_query_per_batch(self):
+        orders = [make_order(self.user, f"ORD-{number}", products=[self.mug]) for number in range(3)]
+        items = list(OrderItem.objects.filter(order__in=orders))
+        for item in items:
+            item.quantity = 2
+        with self.assertNumQueries(2):  # one status check + the UPDATE
+            OrderItem.objects.bulk_update(items, ["quantity"])
+
+        # Orders already loaded (checkout) need no status query at all
+        fresh = [self.item(order) for order in orders]
+        with self.assertNumQueries(1):
+            OrderItem.objects.bulk_create(fresh)
+
+
+class OrderTotalsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="buyer", email="buyer@example.com", password="x")
+
+    def checkout(self, number="ORD-1"):
+        # Two 0.96 lines at 13% tax: 0.1248 tax each before rounding
+        order = Order.objects.create(user=self.user, order_number=number, status=Order.Status.PENDING)
+        items = []
+        for name in ("Widget1", "Widget2"):
+            item = OrderItem(order=order, product_name=name, unit_price=Decimal("0.96"), quantity=1,
+                             tax_percent=Decimal("13.00"))
+            item.calculate_totals()
+            items.append(item)
+        OrderItem.objects.bulk_create(items)
+        return order, items
+
+    def test_lines_are_rounded_to_cents(self):
+        _, items = self.checkout()
+        self.assertEqual((items[0].tax_amount, items[0].line_total), (Decimal("0.12"), Decimal("1.08")))
+
+    def test_in_memory_and_aggregate_totals_agree_with_the_rows(self):
+        order, items = self.checkout()
+        order.recalculate_from_items(items)
+        in_memory = (order.subtotal, order.tax_amount, order.total_amount)
+        self.assertEqual(in_memory, (Decimal("1.92"), Decimal("0.24"), Decimal("2.16")))
+        self.assertEqual(sum(item.line_total for item in order.items.all()), order.total_amount)
+
+        order.recalculate_from_items()
+        self.assertEqual((order.subtotal, order.tax_amount, order.total_amount), in_memory)
+
+    def test_repair_job_keeps_checkout_totals(self):
+        order, items = self.checkout()
+        order.shipping_amount = Decimal("5.00")
+        order.recalculate_from_items(items)
+        order.save()
+        empty = Order.objects.create(user=self.user, order_number="ORD-2", total_amount=Decimal("9.99"))
+
+        self.assertEqual(Order.objects.filter(pk__in=[order.pk, empty.pk]).recalculate_totals(), 2)
+        order.refresh_from_db()
+        empty.refresh_from_db()
+        self.assertEqual((order.subtotal, order.tax_amount, order.total_amount),
+                         (Decimal("1.92"), Decimal("0.24"), Decimal("7.16")))
+        self.assertEqual((empty.subtotal, empty.tax_amount, empty.total_amount), (Decimal("0.00"),) * 3)
+
+
+class OrderConfirmationEmailTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="buyer", email="buyer@example.com", password="x", first_name="Ada")
+
+    def test_amounts_render_with_two_decimals(self):
+        order = Order.objects.create(user=self.user, order_number="ORD-1", status=Order.Status.PENDING)
+        items = []
+        for name, price in (("Widget1", "0.96"), ("Widget2", "2")):
+            item = OrderItem(order=order, product_name=name, unit_price=Decimal(price), quantity=1,
+                             tax_percent=Decimal("13.00"))
+            item.calculate_totals()
+            items.append(item)
+        OrderItem.objects.bulk_create(items)
+        order.recalculate_from_items(items)
+
+        # Checkout renders the in-memory items
+        email = render_order_confirmation(order, items)
+        html = email.alternatives[0][0]
+        self.assertIn("1 x Widget1 — 1.08 USD", email.body)
+        self.assertIn("1 x Widget2 — 2.26 USD", email.body)
+        self.assertIn("Total: 3.34 USD", email.body)
+        self.assertIn("— 1.08 USD", html)
+        self.assertIn("<strong>Total:</strong> 3.34 USD", html)
+        self.assertEqual(email.to, ["buyer@example.com"])
+
+        # Batch jobs render the saved rows: same text
+        [(loaded, rows)] = load_orders_for_email([order.pk])
+        loaded.total_amount = order.total_amount
+        self.assertEqual(render_order_confirmation(loaded, rows).body, email.body)
+
+    def test_no_message_without_an_email_address(self):
+        user = User.objects.create_user(username="nomail", email="", password="x")
+        order = Order.objects.create(user=user, order_number="ORD-2")
+        self.assertIsNone(render_order_confirmation(order, []))
+
+
+class OrderSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ada = User.objects.create_user(username="ada", email="ada@shop.example", password="x")
+        cls.bob = User.objects.create_user(username="bob", email="bob@other.example", password="x")
+        cls.orders = [
+            Order.objects.create(user=cls.ada if index % 2 else cls.bob, order_number=f"ORD-{index:010d}",
+                                 phone="555-01%02d" % index, postal_code="M5V 1A1" if index < 3 else "H2X 2B2")
+            for index in range(8)
+        ]
+
+    def numbers(self, queryset):
+        return sorted(queryset.values_list("order_number", flat=True))
+
+    def test_exact_order_number_short_circuits(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.numbers(search_orders("ord-0000000005")), ["ORD-0000000005"])
+        # Below the trigram length only exact numbers match
+        self.assertEqual(self.numbers(search_orders("55")), [])
+
+    def test_partial_matches_across_columns(self):
+        self.assertEqual(self.numbers(search_orders("M5V")), ["ORD-0000000000", "ORD-0000000001", "ORD-0000000002"])
+        self.assertEqual(len(self.numbers(search_orders("shop.example"))), 4)
+        self.assertEqual(self.numbers(search_orders("5-0107")), ["ORD-0000000007"])
+
+    def test_limit_keeps_the_newest_matches(self):
+        for index, order in enumerate(self.orders):
+            Order.objects.filter(pk=order.pk).update(created_at=order.created_at.replace(year=2020 + index))
+        ids = matching_order_ids("555-01", limit=3)
+        newest = Order.objects.filter(pk__in=ids).order_by("-created_at")[:3]
+        self.assertEqual([order.order_number for order in newest], ["ORD-0000000007", "ORD-0000000006", "ORD-0000000005"])
+
+    def test_admin_search_returns_and_counts_every_match(self):
+        admin = User.objects.create_superuser(username="admin", email="admin@example.com", password="x")
+        api = APIClient()
+        api.force_authenticate(admin)
+        # The support endpoint shows the newest few
+        with mock.patch("orders.views.OrderSearchView.max_results", 2):
+            response = api.get("/api/v1/support/orders/search/", {"q": "555-01"})
+        self.assertEqual(len(response.json()), 2)
 
-# Create your tests here.
+        self.client.force_login(admin)
+        response = self.client.get("/admin/orders/order/", {"q": "555-01"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["cl"].result_count, 8)
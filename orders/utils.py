@@ -1,59 +1,31 @@
 # Email Function (Enterprise-Ready)
 
 # Importation des classes et fonctions nécessaires pour la verification d'inscription
-from django.template.loader import render_to_string  # Charge et rend un template HTML avec des variables
-from django.core.mail import EmailMultiAlternatives, send_mail # (recommandé -> UTF-8 pour les caractères non-ASCII)
+from django.core.mail import send_mail # (recommandé -> UTF-8 pour les caractères non-ASCII)
 from django.conf import settings
-from django.utils.html import strip_tags
 
+from .emails import load_orders_for_email, render_order_confirmation
 
-def send_order_confirmation_email(order):
+
+def send_order_confirmation_email(order, items=None):
     """
     Sends an order confirmation email to the customer.
     Enterprise-grade transactional email.
-    """
 
-    if not order.user.email:
+    Pass `items` when the OrderItems are already in memory (checkout);
+    otherwise the order, its user and its items are loaded in one query.
+    Rendering uses the precompiled templates from orders.emails.
+    """
+    if items is None:
+        loaded = load_orders_for_email([order.pk])
+        if not loaded:
+            return
+        order, items = loaded[0]
+
+    email = render_order_confirmation(order, items)
+    if email is None:
         return  # Fail silently (common practice)
 
-    subject = f"🧾 Order Confirmation – {order.order_number}"
-
-    from_email = settings.DEFAULT_FROM_EMAIL
-    to = [order.user.email]
-
-    # ───────────────────────────────
-    # Template Context
-    # ───────────────────────────────
-    context = {
-        "order": order,
-        "user": order.user,
-        "items": order.items.all(),
-        "company_name": settings.COMPANY_NAME,
-        "support_email": settings.SUPPORT_EMAIL,
-    }
-
-    # ───────────────────────────────
-    # Render Templates
-    # ───────────────────────────────
-    html_content = render_to_string(
-        "emails/order_confirmation.html",
-        context
-    )
-
-    text_content = strip_tags(html_content)
-
-    # ───────────────────────────────
-    # Build Email
-    # ───────────────────────────────
-    email = EmailMultiAlternatives(
-        subject=subject,
-        body=text_content,
-        from_email=from_email,
-        to=to,
-    )
-
-    email.attach_alternative(html_content, "text/html")
-
     # ───────────────────────────────
     # Send
     # ───────────────────────────────
@@ -15,7 +15,6 @@ import datetime
 import logging
 
 from django.db import transaction
-from django.db.models import F
 from django.core.exceptions import ValidationError
 from django.utils.crypto import get_random_string
 from django.shortcuts import get_object_or_404
@@ -23,17 +22,30 @@ from django.core.mail import BadHeaderError
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework import status
 from rest_framework.generics import ListAPIView, RetrieveAPIView
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.renderers import BrowsableAPIRenderer
 
 from orders.models import Order, OrderItem
 from carts.models import Cart
-from products.models import Product
-from .serializers import OrderSerializer
-from drf_spectacular.utils import extend_schema, extend_schema_view
+from carts import snapshots as cart_snapshots
+from products.stock import claim_stock
+from .serializers import OrderSerializer, OrderSearchResultSerializer
+from .search import search_orders
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
 
 from .utils import send_order_confirmation_email, send_order_notification_simple_email
+from analytics import services as rollups
+from webhooks import services as webhook_events
+from webhooks.models import OrderEvent
+from clickmart_main import metrics
+from api.authentication import ClaimsTokenUser
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+from api.throttling import ClientBurstThrottle, OrderPlaceThrottle, ThrottleBeforeAuthMixin
 
 
 logger = logging.getLogger(__name__)
@@ -43,7 +55,7 @@ def generate_order_number():
     return f"ORD-{get_random_string(10).upper()}"
 
 
-class PlaceOrderView(APIView):
+class PlaceOrderView(ThrottleBeforeAuthMixin, APIView):
     """
     Enterprise-grade checkout endpoint.
     Converts a cart into a pending order.
@@ -51,6 +63,9 @@ class PlaceOrderView(APIView):
 
     # user must be logged in to place order
     permission_classes = [IsAuthenticated]
+    throttle_classes = [ClientBurstThrottle, OrderPlaceThrottle]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    parser_classes = [FastJSONParser, FormParser, MultiPartParser]
 
     @extend_schema(
         tags=['Orders'],
@@ -65,7 +80,7 @@ class PlaceOrderView(APIView):
             # get the cart
             cart = Cart.objects.select_related("user").prefetch_related(
                 "items__product"
-            ).get(user=user)
+            ).get(user_id=user.id)
             # print(f'Cart ==> {cart}')
             # print(f'Cart Itemd ==> {cart.items.count()}')
         except Cart.DoesNotExist:
@@ -107,9 +122,9 @@ class PlaceOrderView(APIView):
             # Create Order instence
             # ───────────────────────────────
             order = Order.objects.create(
-                user=user,
+                user_id=user.id,
                 order_number=generate_order_number(),
-                status='PENDING',
+                status=Order.Status.PENDING,
                 phone=shipping_address_front.get("phone"),
                 shipping_address=shipping_address_front.get("address"),
                 city=shipping_address_front.get("city"),
@@ -121,6 +136,9 @@ class PlaceOrderView(APIView):
                 # shipping_amount = cart.shipping_cost
                 # discount_amount = cart.discount_amount
             )
+            # Reuse the loaded User row for the email (stateless JWT mode has none)
+            if not isinstance(user, ClaimsTokenUser):
+                order.user = user
 
             # ───────────────────────────────
             # Create Order Items (Snapshots)
@@ -130,26 +148,14 @@ class PlaceOrderView(APIView):
             # for cart_item in cart.items.all():
             #     product = cart_item.product
             for cart_item in cart.items.select_related("product"):
-                # 🔒 Lock the product row until transaction finishes
-                product = (
-                    Product.objects
-                    .select_for_update()
-                    .get(pk=cart_item.product_id)
-                )
-                
-                # Optional: check if enough stock exists
-                # Stock validation
-                if product.stock < cart_item.quantity:
-                    raise ValidationError(
-                        f"Insufficient stock for '{product.name}'. "
-                        f"Available: {product.stock}, "
-                        f"Requested: {cart_item.quantity}"
-                    )
-                
-                # Decrease product stock using F() to avoid race conditions
-                # avoids issues if multiple orders are processed simultaneously
-                product.stock = F('stock') - cart_item.quantity
-                product.save(update_fields=['stock'])
+                # Validate and decrease stock:
+                # - regular products lock their row (select_for_update + F())
+                # - hot products claim from a random stock bucket (no product lock)
+                try:
+                    product = claim_stock(cart_item.product, cart_item.quantity)
+                except ValidationError:
+                    metrics.record_checkout("insufficient_stock")
+                    raise
 
                 # Create the order item snapshot
                 item = OrderItem(
@@ -170,15 +176,29 @@ class PlaceOrderView(APIView):
             # ───────────────────────────────
             # Final Totals / Freeze Totals
             # ───────────────────────────────
-            order.recalculate_from_items()
+            # totals from the in-memory snapshots (no re-query)
+            order.recalculate_from_items(order_items)
             order.save(
                 update_fields=["subtotal", "tax_amount", "total_amount"]
             )
 
+            # ───────────────────────────────
+            # Sales Rollups (incremental, applied after commit)
+            # ───────────────────────────────
+            rollups.record_order(order, order_items)
+
+            # ───────────────────────────────
+            # Webhook Outbox (same transaction)
+            # ───────────────────────────────
+            webhook_events.record(order, OrderEvent.Type.CREATED)
+
             # ───────────────────────────────────────
             # Clear Cart (NOT deactivate) / Lock Cart
             # ───────────────────────────────────────
             cart.items.all().delete()
+            cart_snapshots.invalidate(user.id)
+
+        metrics.record_checkout("success")
         
         # ───────────────────────────────
         # Send Notification Email to Customer (outside transaction / atomic block)
@@ -187,17 +207,19 @@ class PlaceOrderView(APIView):
         # Correct Way to Call It (Production-Grade)
         try:
             # send_order_notification_simple_email(order)
-            send_order_confirmation_email(order)
+            send_order_confirmation_email(order, items=order_items)
         except BadHeaderError:
             logger.exception(
                 f"Invalid email header found when sending order confirmation for order {order.order_number}",
                 extra={"order_id": str(order.id)}
             )
+            metrics.record_checkout("email_failure")
         except Exception as e:
             logger.exception(
                 f"Error sending order confirmation for order {order.order_number}, see details below.",
                 extra={"order_id": str(order.id), "error": str(e)}
             )
+            metrics.record_checkout("email_failure")
             
         # ───────────────────────────────
         # Response
@@ -228,12 +250,13 @@ class PlaceOrderView(APIView):
 class CustomerOrderView(ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = OrderSerializer
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
 
     def get_queryset(self):
         user = self.request.user
         # Fetch all orders for this user, and preload their related order items efficiently.
         # "items" is the reverse relation from Order → OrderItem
-        return Order.objects.filter(user=user).prefetch_related("items")
+        return Order.objects.filter(user_id=user.id).prefetch_related("items")
 
 
 @extend_schema_view(
@@ -246,6 +269,7 @@ class CustomerOrderView(ListAPIView):
 class OrderDetailView(RetrieveAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = OrderSerializer
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
     lookup_field = "id"
     
     def get_object(self):
@@ -253,7 +277,7 @@ class OrderDetailView(RetrieveAPIView):
         order_id = self.kwargs.get("id")
         order = get_object_or_404(
             Order.objects.prefetch_related("items"),
-            user=user,
+            user_id=user.id,
             id=order_id
         )
         return order
@@ -261,3 +285,33 @@ class OrderDetailView(RetrieveAPIView):
     # def get_queryset(self):
     #     user = self.request.user
     #     return Order.objects.filter(user=user).prefetch_related("items")
+
+
+@extend_schema_view(
+    get=extend_schema(
+        tags=['Support'],
+        summary="Search orders",
+        description="Partial match on order number, customer email, phone or postal code "
+                    "(?q=, at least 3 characters). Exact order numbers use the unique index. Staff only.",
+        parameters=[OpenApiParameter("q", OpenApiTypes.STR, description="Search term")],
+    )
+)
+class OrderSearchView(ListAPIView):
+    """
+    GET /support/orders/search/?q=... => Support agent order lookup
+    """
+    permission_classes = [IsAdminUser]
+    serializer_class = OrderSearchResultSerializer
+
+    # Support agents refine their search rather than page through results
+    max_results = 50
+
+    def get_queryset(self):
+        term = self.request.query_params.get("q", "").strip()
+        if not term:
+            return Order.objects.none()
+        return (
+            search_orders(term, limit=self.max_results)
+            .select_related("user")
+            .order_by("-created_at")[:self.max_results]
+        )
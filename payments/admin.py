@@ -0,0 +1,27 @@
+from django.contrib import admin
+
+from clickmart_main.admin_tools import ScalableAdminMixin
+from .models import PaymentEvent
+
+
+@admin.register(PaymentEvent)
+class PaymentEventAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    list_display = ("id", "provider", "type", "provider_event_id", "order_id", "status", "received_at", "processed_at", "note")
+    list_filter = ("status", "provider", "type")
+    search_fields = ("=provider_event_id", "=order_id")
+    keyset_ordering = ("-id",)
+    actions = ["apply_again"]
+
+    # The log is written by the webhook endpoint only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def apply_again(self, request, queryset):
+        queryset.exclude(status=PaymentEvent.Status.APPLIED).update(
+            status=PaymentEvent.Status.PENDING, processed_at=None, note="",
+        )
+
+    apply_again.short_description = "Apply selected events again"
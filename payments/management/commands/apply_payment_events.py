@@ -0,0 +1,38 @@
+# payments/management/commands/apply_payment_events.py
+"""
+Apply received payment provider events to orders (see payments/services.py).
+
+Each pass locks a batch of orders with pending events (skipping orders
+another worker holds) and applies their events in provider order, so
+several workers can run side by side. --once drains the log and exits
+(cron, tests).
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from payments import services
+
+
+class Command(BaseCommand):
+    help = "Apply pending payment provider events to orders, in order per order."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200, help="Orders per transaction (default: 200)")
+        parser.add_argument("--interval", type=float, default=1.0, help="Seconds to sleep when idle (default: 1)")
+        parser.add_argument("--once", action="store_true", help="Apply what is pending now, then exit")
+
+    def handle(self, *args, **options):
+        total = 0
+        try:
+            while True:
+                processed = services.apply_pending(options["batch_size"])
+                total += processed
+                if processed:
+                    self.stdout.write(f"{processed} events processed")
+                elif options["once"]:
+                    break
+                else:
+                    time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"Done: {total} events processed"))
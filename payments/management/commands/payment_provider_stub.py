@@ -0,0 +1,117 @@
+# payments/management/commands/payment_provider_stub.py
+"""
+Local payment provider for testing the webhook endpoint.
+
+    manage.py payment_provider_stub --orders 20 --refund --duplicates 50 --shuffle
+
+Sends signed events for the newest pending orders (payment.succeeded,
+and refund.succeeded with --refund; payment.failed first with
+--fail-first) to POST /api/v1/payments/webhooks/<provider>/. --duplicates
+re-sends every event, like a provider retrying during an incident, and
+--shuffle delivers them out of order; the event times still give the
+order they are applied in. Prints response codes and latency.
+"""
+import json
+import random
+import statistics
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.models import Order
+from payments import services
+from webhooks.services import sign
+
+
+class Command(BaseCommand):
+    help = "Send signed payment provider events (with retry floods) to the webhook endpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000/api/v1", help="API root (default: %(default)s)")
+        parser.add_argument("--provider", default="stub", help="Provider slug, listed in PAYMENT_WEBHOOK_SECRETS (default: stub)")
+        parser.add_argument("--secret", help="Signing secret (default: the provider's PAYMENT_WEBHOOK_SECRETS entry)")
+        parser.add_argument("--orders", type=int, default=10, help="Newest PENDING orders to pay (default: 10)")
+        parser.add_argument("--refund", action="store_true", help="Also refund each order in full")
+        parser.add_argument("--fail-first", action="store_true", help="Send a payment.failed before each payment")
+        parser.add_argument("--duplicates", type=int, default=1, help="Times each event is sent (default: 1)")
+        parser.add_argument("--shuffle", action="store_true", help="Send events in random order")
+        parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight (default: 8)")
+
+    def handle(self, *args, **options):
+        provider = options["provider"]
+        secret = options["secret"] or services.webhook_secrets().get(provider)
+        if not secret:
+            raise CommandError(f"No secret for provider {provider!r}: pass --secret or set PAYMENT_WEBHOOK_SECRETS")
+        url = f"{options['base_url'].rstrip('/')}/payments/webhooks/{provider}/"
+
+        orders = list(
+            Order.objects.filter(status=Order.Status.PENDING)
+            .order_by("-created_at")
+            .values("id", "total_amount")[: options["orders"]]
+        )
+        if not orders:
+            raise CommandError("No PENDING orders to pay.")
+
+        events = []
+        created = int(time.time()) - 60
+        for order in orders:
+            steps = (["payment.failed"] if options["fail_first"] else []) + ["payment.succeeded"]
+            steps += ["refund.succeeded"] if options["refund"] else []
+            for offset, event_type in enumerate(steps):
+                events.append({
+                    "id": f"evt_{uuid.uuid4().hex}",
+                    "type": event_type,
+                    "created": created + offset,
+                    "data": {
+                        "order_id": str(order["id"]),
+                        "reference": f"{'re' if event_type.startswith('refund') else 'pi'}_{uuid.uuid4().hex[:16]}",
+                        "amount": str(order["total_amount"]),
+                    },
+                })
+        sends = [json.dumps(event).encode() for event in events for _ in range(options["duplicates"])]
+        if options["shuffle"]:
+            random.shuffle(sends)
+
+        self.stdout.write(f"Sending {len(sends)} requests ({len(events)} events, {len(orders)} orders) to {url}")
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options["concurrency"]) as executor:
+            results = list(executor.map(lambda body: self.post(url, secret, body), sends))
+        elapsed = time.perf_counter() - started
+
+        codes = {}
+        for code, _ in results:
+            codes[code] = codes.get(code, 0) + 1
+        latencies = sorted(latency for _, latency in results)
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        self.stdout.write(f"Responses: {', '.join(f'{code} x{count}' for code, count in sorted(codes.items(), key=str))}")
+        self.stdout.write(
+            f"Latency: p50 {statistics.median(latencies) * 1000:.1f} ms, p99 {p99 * 1000:.1f} ms, "
+            f"{len(sends) / elapsed:.0f} req/s"
+        )
+        self.stdout.write(self.style.SUCCESS("Run `manage.py apply_payment_events --once` to apply them."))
+
+    def post(self, url, secret, body):
+        timestamp = int(time.time())
+        request = urllib.request.Request(
+            url,
+            data=body,
+            method="POST",
+            headers={
+                "Content-Type": "application/json",
+                services.SIGNATURE_HEADER: f"t={timestamp},v1={sign(secret, timestamp, body)}",
+            },
+        )
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                response.read()
+                code = response.status
+        except urllib.error.HTTPError as error:
+            code = error.code
+        except (urllib.error.URLError, OSError) as error:
+            code = type(error).__name__
+        return code, time.perf_counter() - started
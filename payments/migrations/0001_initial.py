@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-18 23:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('provider', models.CharField(max_length=32)),
+                ('provider_event_id', models.CharField(max_length=255)),
+                ('type', models.CharField(max_length=64)),
+                ('order_id', models.UUIDField(blank=True, null=True)),
+                ('occurred_at', models.DateTimeField(blank=True, help_text='Event time reported by the provider', null=True)),
+                ('payload', models.JSONField()),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('applied', 'Applied'), ('ignored', 'Ignored'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('note', models.TextField(blank=True)),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(condition=models.Q(('status', 'pending')), fields=['id'], name='payments_event_pending'), models.Index(condition=models.Q(('status', 'pending')), fields=['order_id', 'id'], name='payments_event_pending_order')],
+                'constraints': [models.UniqueConstraint(fields=('provider', 'provider_event_id'), name='unique_payment_event')],
+            },
+        ),
+    ]
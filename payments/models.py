@@ -0,0 +1,49 @@
+# payments/models.py
+from django.db import models
+from django.db.models import Q
+
+
+class PaymentEvent(models.Model):
+    """
+    Raw payment provider webhook event, appended on receipt.
+    (provider, provider_event_id) is unique, so provider retries are
+    stored once. State transitions are applied later by
+    `manage.py apply_payment_events`.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        APPLIED = "applied", "Applied"
+        IGNORED = "ignored", "Ignored"
+        FAILED = "failed", "Failed"
+
+    id = models.BigAutoField(primary_key=True)
+    provider = models.CharField(max_length=32)
+    provider_event_id = models.CharField(max_length=255)
+    type = models.CharField(max_length=64)
+    # Not a foreign key: the log keeps events for orders it can't match
+    order_id = models.UUIDField(null=True, blank=True)
+    occurred_at = models.DateTimeField(null=True, blank=True, help_text="Event time reported by the provider")
+    payload = models.JSONField()
+    received_at = models.DateTimeField(auto_now_add=True)
+
+    # ───────────────────────────────
+    # Processing
+    # ───────────────────────────────
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    note = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        constraints = [
+            models.UniqueConstraint(fields=["provider", "provider_event_id"], name="unique_payment_event"),
+        ]
+        indexes = [
+            # The worker only reads the (small) pending tail
+            models.Index(fields=["id"], condition=Q(status="pending"), name="payments_event_pending"),
+            models.Index(fields=["order_id", "id"], condition=Q(status="pending"), name="payments_event_pending_order"),
+        ]
+
+    def __str__(self):
+        return f"{self.provider} {self.type} {self.provider_event_id}"
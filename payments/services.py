@@ -0,0 +1,210 @@
+# payments/services.py
+"""
+Payment provider webhooks: ingestion and ordered application.
+
+Ingestion (request path, PaymentWebhookView): verify the signature, pull
+the event id / type / time / order id out of the body and INSERT it into
+the PaymentEvent log, ignoring duplicates (provider retries). No order
+is read or locked, so a flood of retries during an incident costs one
+INSERT each and never queues behind checkout.
+
+Application (`manage.py apply_payment_events`): `apply_pending()` locks a
+batch of orders with pending events (FOR UPDATE SKIP LOCKED, so several
+workers take different orders) and applies each order's pending events
+in provider order (occurred_at, then arrival):
+
+- payment.succeeded: Order.mark_as_paid() while the order awaits payment;
+- payment.failed: a pending order becomes FAILED;
+- refund.succeeded: the matching Refund (data.refund_id, else the
+  provider reference; created when the refund started at the provider)
+  is marked completed, and a fully refunded order becomes REFUNDED.
+
+Anything else (unknown types, late duplicates, payments for cancelled
+orders) is kept as IGNORED with a note, and errors as FAILED, so every
+event ends up explained in the log.
+
+Provider body (signed like outbound webhooks, in Payment-Signature):
+    {"id": "evt_1", "type": "payment.succeeded", "created": 1760000000,
+     "data": {"order_id": "<uuid>", "reference": "pi_1", "amount": "12.50",
+              "refund_id": "<uuid, refunds only>"}}
+"""
+import json
+import uuid
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from orders.models import Order, Refund
+from .models import PaymentEvent
+
+try:
+    import orjson
+except ImportError:  # optional speed-up, see api/renderers.py
+    orjson = None
+
+
+SIGNATURE_HEADER = "Payment-Signature"
+
+# Orders a successful payment can still be applied to
+PAYABLE_STATUSES = (Order.Status.DRAFT, Order.Status.PENDING, Order.Status.FAILED)
+
+
+def webhook_secrets():
+    """
+    {provider: signing secret} from PAYMENT_WEBHOOK_SECRETS ("stripe:whsec_...,paypal:...").
+    """
+    return dict(entry.split(":", 1) for entry in settings.PAYMENT_WEBHOOK_SECRETS if ":" in entry)
+
+
+# ───────────────────────────────
+# Ingestion
+# ───────────────────────────────
+def parse_event(provider, body):
+    """
+    Unsaved PaymentEvent from a raw body; ValueError when malformed.
+    """
+    payload = orjson.loads(body) if orjson is not None else json.loads(body)
+    if not isinstance(payload, dict):
+        raise ValueError("event must be a JSON object")
+    event_id, event_type = payload.get("id"), payload.get("type")
+    if not isinstance(event_id, str) or not event_id or not isinstance(event_type, str):
+        raise ValueError("event needs a string id and type")
+
+    data = payload.get("data") if isinstance(payload.get("data"), dict) else {}
+    try:
+        order_id = uuid.UUID(str(data["order_id"]))
+    except (KeyError, ValueError):
+        order_id = None
+    try:
+        occurred_at = datetime.fromtimestamp(payload["created"], dt_timezone.utc)
+    except (KeyError, TypeError, ValueError, OverflowError, OSError):
+        occurred_at = None
+
+    return PaymentEvent(
+        provider=provider,
+        provider_event_id=event_id[:255],
+        type=event_type[:64],
+        order_id=order_id,
+        occurred_at=occurred_at,
+        payload=payload,
+    )
+
+
+def ingest(event):
+    # ON CONFLICT DO NOTHING: a retried event is a no-op
+    PaymentEvent.objects.bulk_create([event], ignore_conflicts=True)
+
+
+# ───────────────────────────────
+# Application
+# ───────────────────────────────
+def payment_succeeded(event, order):
+    if order.status not in PAYABLE_STATUSES:
+        return PaymentEvent.Status.IGNORED, f"order is {order.status}"
+    reference = event.payload["data"].get("reference") or event.provider_event_id
+    order.mark_as_paid(event.provider, reference)
+    return PaymentEvent.Status.APPLIED, ""
+
+
+def payment_failed(event, order):
+    if order.status != Order.Status.PENDING:
+        return PaymentEvent.Status.IGNORED, f"order is {order.status}"
+    order.status = Order.Status.FAILED
+    order.save(update_fields=["status", "updated_at"])
+    return PaymentEvent.Status.APPLIED, ""
+
+
+def refund_succeeded(event, order):
+    data = event.payload["data"]
+    reference = data.get("reference") or event.provider_event_id
+    refund = None
+    try:
+        refund = order.refunds.filter(pk=uuid.UUID(str(data["refund_id"]))).first()
+    except (KeyError, ValueError):
+        pass
+    if refund is None:
+        refund = order.refunds.filter(payment_provider=event.provider, provider_reference=reference).first()
+    if refund is None:
+        # Refund issued from the provider's dashboard
+        try:
+            amount = Decimal(str(data["amount"]))
+        except (KeyError, InvalidOperation):
+            return PaymentEvent.Status.FAILED, "no matching refund and no amount"
+        refund = Refund.objects.create(
+            order=order, amount=amount, currency=order.currency,
+            payment_provider=event.provider, reason="Refunded at the payment provider",
+        )
+    if refund.status == Refund.Status.COMPLETED:
+        return PaymentEvent.Status.IGNORED, "refund already completed"
+
+    refund.mark_completed(reference)
+    refunded = order.refunds.filter(status=Refund.Status.COMPLETED).aggregate(total=Sum("amount"))["total"]
+    if refunded >= order.total_amount and order.status != Order.Status.REFUNDED:
+        order.status = Order.Status.REFUNDED
+        order.save(update_fields=["status", "updated_at"])
+    return PaymentEvent.Status.APPLIED, ""
+
+
+HANDLERS = {
+    "payment.succeeded": payment_succeeded,
+    "payment.failed": payment_failed,
+    "refund.succeeded": refund_succeeded,
+}
+
+
+def apply_event(event, order):
+    handler = HANDLERS.get(event.type)
+    if handler is None:
+        return PaymentEvent.Status.IGNORED, f"unhandled event type {event.type}"
+    try:
+        # Savepoint: a failing event doesn't undo the rest of the batch
+        with transaction.atomic():
+            return handler(event, order)
+    except Exception as exc:
+        return PaymentEvent.Status.FAILED, repr(exc)[:1000]
+
+
+def apply_pending(batch_size=200):
+    """
+    Apply the pending events of up to `batch_size` orders; returns the
+    number of events processed (0 when nothing was pending or every
+    candidate order is being handled by another worker).
+    """
+    now = timezone.now()
+    pending = PaymentEvent.objects.filter(status=PaymentEvent.Status.PENDING)
+    with transaction.atomic():
+        # Candidates: orders of the oldest pending events
+        window = list(dict.fromkeys(pending.order_by("id").values_list("order_id", flat=True)[: batch_size * 4]))
+        existing = set(Order.objects.filter(pk__in=[pk for pk in window if pk]).values_list("pk", flat=True))
+        orphans = [pk for pk in window if pk not in existing]
+        processed = 0
+        if orphans:
+            processed += pending.filter(order_id__in=[pk for pk in orphans if pk]).update(
+                status=PaymentEvent.Status.IGNORED, processed_at=now, note="unknown order",
+            )
+            if None in orphans:
+                processed += pending.filter(order_id__isnull=True).update(
+                    status=PaymentEvent.Status.IGNORED, processed_at=now, note="no order id",
+                )
+
+        orders = {
+            order.pk: order
+            for order in Order.objects.select_for_update(skip_locked=True)
+            .filter(pk__in=existing).order_by()[:batch_size]
+        }
+        if not orders:
+            return processed
+
+        events = sorted(
+            pending.filter(order_id__in=orders),
+            key=lambda event: (event.order_id, event.occurred_at or event.received_at, event.pk),
+        )
+        for event in events:
+            event.status, event.note = apply_event(event, orders[event.order_id])
+            event.processed_at = now
+        PaymentEvent.objects.bulk_update(events, ["status", "note", "processed_at"])
+    return processed + len(events)
@@ -0,0 +1,115 @@
+import json
+import time
+import uuid
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+
+from orders.models import Order, Refund
+from users.models import User
+from webhooks.services import sign
+from .models import PaymentEvent
+from . import services
+
+
+SECRET = "whsec_test"
+
+
+def event_body(event_id, event_type, order_id, created=1760000000, **data):
+    return json.dumps({
+        "id": event_id, "type": event_type, "created": created,
+        "data": {"order_id": str(order_id), **data},
+    }).encode()
+
+
+@override_settings(PAYMENT_WEBHOOK_SECRETS=[f"stripe:{SECRET}"])
+class PaymentWebhookViewTests(TestCase):
+    url = "/api/v1/payments/webhooks/stripe/"
+
+    def post(self, body, secret=SECRET, url=None):
+        timestamp = int(time.time())
+        return self.client.post(
+            url or self.url, body, content_type="application/json",
+            HTTP_PAYMENT_SIGNATURE=f"t={timestamp},v1={sign(secret, timestamp, body)}",
+        )
+
+    def test_retried_events_are_stored_once(self):
+        body = event_body("evt_1", "payment.succeeded", uuid.uuid4(), reference="pi_1")
+        for _ in range(3):
+            response = self.post(body)
+            self.assertEqual(response.status_code, 200)
+        event = PaymentEvent.objects.get()
+        self.assertEqual((event.provider, event.provider_event_id, event.status), ("stripe", "evt_1", PaymentEvent.Status.PENDING))
+        self.assertEqual(event.occurred_at.timestamp(), 1760000000)
+
+    def test_rejects_bad_signatures_malformed_events_and_unknown_providers(self):
+        body = event_body("evt_1", "payment.succeeded", uuid.uuid4())
+        self.assertEqual(self.post(body, secret="wrong").status_code, 400)
+        self.assertEqual(self.post(b"[1, 2]").status_code, 400)
+        self.assertEqual(self.post(b'{"type": "payment.succeeded"}').status_code, 400)
+        self.assertEqual(self.post(body, url="/api/v1/payments/webhooks/paypal/").status_code, 404)
+        self.assertFalse(PaymentEvent.objects.exists())
+
+
+class ApplyPaymentEventTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="buyer", email="buyer@example.com", password="x")
+
+    def setUp(self):
+        self.order = Order.objects.create(
+            user=self.user, order_number="ORD-1", status=Order.Status.PENDING, total_amount=Decimal("20.00"),
+        )
+
+    def receive(self, event_id, event_type, order_id=None, created=1760000000, **data):
+        body = event_body(event_id, event_type, order_id or self.order.pk, created=created, **data)
+        services.ingest(services.parse_event("stripe", body))
+
+    def statuses(self):
+        return dict(PaymentEvent.objects.values_list("provider_event_id", "status"))
+
+    def test_payment_marks_the_order_paid_once(self):
+        self.receive("evt_1", "payment.succeeded", reference="pi_1")
+        self.receive("evt_2", "payment.succeeded", reference="pi_1")
+        self.assertEqual(services.apply_pending(), 2)
+
+        self.order.refresh_from_db()
+        self.assertEqual((self.order.status, self.order.payment_reference), (Order.Status.PAID, "pi_1"))
+        self.assertEqual(self.statuses(), {"evt_1": PaymentEvent.Status.APPLIED, "evt_2": PaymentEvent.Status.IGNORED})
+        self.assertEqual(services.apply_pending(), 0)
+
+    def test_events_apply_in_provider_order(self):
+        # The success arrives first, but the failure happened before it
+        self.receive("evt_ok", "payment.succeeded", created=1760000100)
+        self.receive("evt_failed", "payment.failed", created=1760000000)
+        services.apply_pending()
+
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, Order.Status.PAID)
+        self.assertEqual(self.statuses(), {"evt_ok": PaymentEvent.Status.APPLIED, "evt_failed": PaymentEvent.Status.APPLIED})
+
+    def test_unmatched_and_unknown_events_are_explained(self):
+        self.receive("evt_orphan", "payment.succeeded", order_id=uuid.uuid4())
+        self.receive("evt_dispute", "charge.dispute.created")
+        self.receive("evt_refund", "refund.succeeded")  # no refund to match, no amount
+        services.apply_pending()
+
+        notes = dict(PaymentEvent.objects.values_list("provider_event_id", "note"))
+        self.assertEqual(self.statuses(), {
+            "evt_orphan": PaymentEvent.Status.IGNORED,
+            "evt_dispute": PaymentEvent.Status.IGNORED,
+            "evt_refund": PaymentEvent.Status.FAILED,
+        })
+        self.assertEqual(notes["evt_orphan"], "unknown order")
+        self.assertIn("charge.dispute.created", notes["evt_dispute"])
+
+    def test_full_refund_completes_the_refund_and_the_order(self):
+        Order.objects.filter(pk=self.order.pk).update(status=Order.Status.PAID)
+        refund = Refund.objects.create(order=self.order, amount=Decimal("20.00"), payment_provider="stripe")
+        self.receive("evt_refund", "refund.succeeded", refund_id=str(refund.pk), reference="re_1")
+        services.apply_pending()
+
+        refund.refresh_from_db()
+        self.order.refresh_from_db()
+        self.assertEqual((refund.status, refund.provider_reference), (Refund.Status.COMPLETED, "re_1"))
+        self.assertEqual(self.order.status, Order.Status.REFUNDED)
@@ -0,0 +1,50 @@
+# payments/views.py
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import AllowAny
+from rest_framework import status
+
+from api.renderers import FastJSONRenderer
+from webhooks.services import verify
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
+
+from . import services
+
+
+class PaymentWebhookView(APIView):
+    """
+    Receives payment provider events. The event is appended to the
+    PaymentEvent log and acknowledged; orders are updated later by
+    `manage.py apply_payment_events`, so retry floods never wait on
+    order locks.
+    """
+
+    # Providers authenticate with the signature, not a JWT
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    renderer_classes = [FastJSONRenderer]
+
+    @extend_schema(
+        tags=['Payments'],
+        summary="Payment provider webhook",
+        description="Signed provider event (Payment-Signature header). Duplicates are acknowledged and stored once.",
+        request=OpenApiTypes.OBJECT,
+        responses={200: OpenApiTypes.OBJECT},
+    )
+    def post(self, request, provider):
+        secret = services.webhook_secrets().get(provider)
+        if secret is None:
+            return Response({"detail": "Unknown provider."}, status=status.HTTP_404_NOT_FOUND)
+
+        # Raw body: the signature covers the exact bytes sent
+        body = request.body
+        if not verify(secret, request.headers.get(services.SIGNATURE_HEADER, ""), body):
+            return Response({"detail": "Invalid signature."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            event = services.parse_event(provider, body)
+        except ValueError as exc:
+            return Response({"detail": f"Invalid event: {exc}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        services.ingest(event)
+        return Response({"received": True})
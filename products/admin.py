@@ -1,12 +1,39 @@
 from django.contrib import admin
+from clickmart_main.admin_tools import ScalableAdminMixin
 from .models import Product
+from . import stock
 
 
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
-    list_display = ("name", "final_price", "tax_percent", "stock", "is_active", "created_at")
+class ProductAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    list_display = ("name", "final_price", "tax_percent", "available_stock", "stock_buckets", "is_active", "created_at")
     list_filter = ("is_active", "category")
     list_editable = ("tax_percent", "is_active",)
     search_fields = ("name", "description")
     prepopulated_fields = {"slug": ("name",)}
-    
+
+    actions = ["rebalance_stock"]
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_available_stock()
+
+    def get_readonly_fields(self, request, obj=None):
+        # Sharded stock lives in the bucket rows; the column is a snapshot
+        if obj is not None and obj.stock_sharded:
+            return ("stock",)
+        return ()
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # (Re)shard in the same transaction as the bucket count change
+        if "stock_buckets" in form.changed_data:
+            stock.rebalance(obj)
+
+    @admin.display(description="Stock")
+    def available_stock(self, obj):
+        return obj.available_stock
+
+    @admin.action(description="Rebalance sharded stock")
+    def rebalance_stock(self, request, queryset):
+        for product in queryset.filter(stock_buckets__gt=0):
+            stock.rebalance(product)
@@ -0,0 +1,44 @@
+# products/async_views.py
+"""
+Async (ASGI) read path for the catalog; see api/async_views.py.
+"""
+from django.http import Http404
+
+from api.async_views import AsyncAPIView
+
+from .models import Product
+from .serializers import ProductSerializer
+from . import views
+
+
+class ProductListView(AsyncAPIView):
+    """
+        GET  /products/  => List only active products (async ORM)
+        POST /products/  => Create a product (sync ProductListView)
+    """
+    sync_view = views.ProductListView
+
+    async def get(self, request):
+        queryset = Product.objects.filter(is_active=True).with_available_stock().order_by('-created_at')
+        data = await self.paginate(
+            request,
+            queryset,
+            lambda products: ProductSerializer(products, many=True, context={'request': request}).data,
+        )
+        return self.render(data)
+
+    async def post(self, request):
+        return await self.delegate(request)
+
+
+class ProductDetailView(AsyncAPIView):
+    """GET    /products/<id>/  => Retrieve single product (async ORM)"""
+    sync_view = views.ProductDetailView
+
+    async def get(self, request, id):
+        try:
+            product = await Product.objects.filter(is_active=True).with_available_stock().aget(id=id)
+        except Product.DoesNotExist:
+            raise Http404("No Product matches the given query.")
+        serializer = ProductSerializer(product, context={'request': request})
+        return self.render(serializer.data)
@@ -0,0 +1,242 @@
+# products/management/commands/bench_read_path.py
+"""
+WSGI vs ASGI load benchmark for the catalog / cart read path.
+
+Both handlers run in-process against the real middleware chain:
+
+- WSGI: one thread per concurrent connection (threaded worker) serving
+  the sync DRF views;
+- ASGI: one event loop serving the async views (ASYNC_READ_VIEWS).
+
+Each simulated client is slow to read its response (--slow-ms), which is
+what ties a WSGI thread up. Reports requests/second, p50/p99 latency and
+the resident memory added per concurrent connection (Linux /proc).
+"""
+import asyncio
+import importlib
+import io
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.test.utils import override_settings
+from django.urls import clear_url_caches
+
+from api import urls as api_urls
+from api.serializers import ClaimsTokenObtainPairSerializer
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+class RSSSampler(threading.Thread):
+    """
+    Track the peak resident set size while a run is in progress.
+    """
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.baseline = self.peak = rss_bytes()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(0.01):
+            self.peak = max(self.peak, rss_bytes())
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        return self.peak - self.baseline
+
+
+@contextmanager
+def read_views(async_reads):
+    """
+    Rebuild the API URLconf with the sync or async read views.
+    """
+    with override_settings(ASYNC_READ_VIEWS=async_reads):
+        importlib.reload(api_urls)
+        clear_url_caches()
+        try:
+            yield
+        finally:
+            importlib.reload(api_urls)
+            clear_url_caches()
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000 if values else 0.0
+
+
+class Command(BaseCommand):
+    help = "Compare WSGI (sync views) and ASGI (async views) throughput and memory on read endpoints."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/api/v1/products/", help="Endpoint to load (default: /api/v1/products/)")
+        parser.add_argument("--concurrency", type=int, default=100, help="Concurrent connections (default: 100)")
+        parser.add_argument("--requests", type=int, default=2000, help="Requests per run (default: 2000)")
+        parser.add_argument("--slow-ms", type=float, default=20.0, help="Time each client takes to read a response (default: 20)")
+        parser.add_argument("--user", help="Email of the user to authenticate as (needed for /api/v1/cart/)")
+
+    def handle(self, *args, **options):
+        headers = {}
+        if options["user"]:
+            user = get_user_model().objects.filter(email=options["user"]).first()
+            if user is None:
+                raise CommandError(f"No user with email {options['user']}")
+            token = ClaimsTokenObtainPairSerializer.get_token(user).access_token
+            headers["authorization"] = f"Bearer {token}"
+
+        with read_views(async_reads=False):
+            wsgi = self.run_wsgi(options, headers)
+        with read_views(async_reads=True):
+            asgi = self.run_asgi(options, headers)
+
+        self.stdout.write("")
+        self.stdout.write(
+            f"{'server':<8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}"
+            f"{'RSS +MB':>10}{'KB/conn':>10}"
+        )
+        for result in (wsgi, asgi):
+            self.stdout.write(
+                f"{result['server']:<8}{result['requests_per_second']:>10.1f}"
+                f"{result['p50_ms']:>10.1f}{result['p99_ms']:>10.1f}{result['errors']:>8}"
+                f"{result['rss_mb']:>10.1f}{result['kb_per_connection']:>10.1f}"
+            )
+
+    def summarize(self, server, latencies, errors, elapsed, rss_delta, options):
+        self.stdout.write(f"{server}: {len(latencies)} requests in {elapsed:.2f}s, {errors} errors")
+        return {
+            "server": server,
+            "requests_per_second": len(latencies) / elapsed if elapsed else 0.0,
+            "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+            "p99_ms": percentile(latencies, 0.99),
+            "errors": errors,
+            "rss_mb": rss_delta / 2**20,
+            "kb_per_connection": rss_delta / 1024 / options["concurrency"],
+        }
+
+    # ───────────────────────────────
+    # WSGI: thread per connection
+    # ───────────────────────────────
+    def run_wsgi(self, options, headers):
+        application = get_wsgi_application()
+        slow = options["slow_ms"] / 1000
+        latencies, errors = [], []
+
+        def request(_):
+            environ = {
+                "REQUEST_METHOD": "GET",
+                "SCRIPT_NAME": "",
+                "PATH_INFO": options["path"],
+                "QUERY_STRING": "",
+                "SERVER_NAME": "localhost",
+                "SERVER_PORT": "80",
+                "SERVER_PROTOCOL": "HTTP/1.1",
+                "HTTP_HOST": "localhost",
+                "wsgi.input": io.BytesIO(),
+                "wsgi.errors": sys.stderr,
+                "wsgi.url_scheme": "http",
+                "wsgi.multithread": True,
+                "wsgi.multiprocess": False,
+                "wsgi.run_once": False,
+            }
+            for name, value in headers.items():
+                environ[f"HTTP_{name.upper()}"] = value
+
+            status = []
+            started = time.perf_counter()
+            body = application(environ, lambda s, h, exc_info=None: status.append(s))
+            try:
+                for _chunk in body:
+                    time.sleep(slow)  # slow client holds the worker thread
+            finally:
+                body.close()
+            if not status[0].startswith("200"):
+                errors.append(status[0])
+            latencies.append(time.perf_counter() - started)
+
+        def close_connection():
+            connections.close_all()
+
+        sampler = RSSSampler()
+        sampler.start()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options["concurrency"]) as executor:
+            list(executor.map(request, range(options["requests"])))
+            # Release the per-thread database connections
+            list(executor.map(lambda _: close_connection(), range(options["concurrency"])))
+        elapsed = time.perf_counter() - started
+        return self.summarize("wsgi", latencies, len(errors), elapsed, sampler.stop(), options)
+
+    # ───────────────────────────────
+    # ASGI: one event loop
+    # ───────────────────────────────
+    def run_asgi(self, options, headers):
+        application = get_asgi_application()
+        slow = options["slow_ms"] / 1000
+        latencies, errors = [], []
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": options["path"],
+            "raw_path": options["path"].encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"host", b"localhost")] + [
+                (name.encode(), value.encode()) for name, value in headers.items()
+            ],
+            "client": ("127.0.0.1", 50000),
+            "server": ("localhost", 80),
+        }
+
+        async def request(semaphore):
+            async with semaphore:
+                status, messages = [], asyncio.Queue()
+                messages.put_nowait({"type": "http.request", "body": b"", "more_body": False})
+
+                async def receive():
+                    return await messages.get()
+
+                async def send(message):
+                    if message["type"] == "http.response.start":
+                        status.append(message["status"])
+                    elif not message.get("more_body"):
+                        await asyncio.sleep(slow)  # slow client, the loop serves others
+                        messages.put_nowait({"type": "http.disconnect"})
+
+                started = time.perf_counter()
+                await application(dict(scope), receive, send)
+                if status[0] != 200:
+                    errors.append(status[0])
+                latencies.append(time.perf_counter() - started)
+
+        async def load():
+            semaphore = asyncio.Semaphore(options["concurrency"])
+            await asyncio.gather(*(request(semaphore) for _ in range(options["requests"])))
+
+        sampler = RSSSampler()
+        sampler.start()
+        started = time.perf_counter()
+        asyncio.run(load())
+        elapsed = time.perf_counter() - started
+        return self.summarize("asgi", latencies, len(errors), elapsed, sampler.stop(), options)
@@ -0,0 +1,160 @@
+# products/management/commands/bench_stock_contention.py
+"""
+Multi-threaded contention benchmark for checkout.
+
+Every worker thread is a buyer placing orders for ONE product through
+PlaceOrderView itself (cart check, order row, stock claim, items, totals,
+rollups, outbox, cart clearing, confirmation email on the locmem
+backend), so the measured time is the whole checkout transaction. The
+same load runs with the classic single-row lock and with N stock
+buckets, and orders/second are compared. Throttles are disabled for the
+run; the benchmark users, carts and orders are deleted afterwards (their
+rollup deltas are reversed first).
+
+Row-level locking only matters on PostgreSQL; SQLite serializes every
+writer, so its numbers are not representative.
+"""
+import statistics
+import threading
+import time
+import uuid
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+from django.test.utils import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from analytics import services as rollups
+from carts.models import Cart, CartItem
+from orders.models import Order
+from orders.views import PlaceOrderView
+from products.models import Product
+from products import stock
+from users.models import User
+
+
+SHIPPING_ADDRESS = {
+    "phone": "555-0100",
+    "address": "1 Bench Street",
+    "city": "Toronto",
+    "state": "ON",
+    "zipCode": "M5V 1A1",
+    "country": "Canada",
+}
+
+
+class Command(BaseCommand):
+    help = "Measure PlaceOrderView throughput on one hot product with and without sharded stock."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=16, help="Concurrent buyers (default: 16)")
+        parser.add_argument("--orders", type=int, default=2000, help="Checkouts per run (default: 2000)")
+        parser.add_argument("--buckets", type=int, default=8, help="Stock buckets for the sharded run (default: 8)")
+        parser.add_argument("--quantity", type=int, default=1, help="Units per checkout (default: 1)")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            self.stdout.write(self.style.WARNING(
+                f"Running on {connection.vendor}: row locks are not representative, use PostgreSQL."
+            ))
+
+        results = []
+        with override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend"):
+            for buckets in (0, options["buckets"]):
+                results.append(self.run(buckets, options))
+
+        self.stdout.write("")
+        self.stdout.write(f"{'mode':<16}{'orders/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'failed':>8}")
+        for result in results:
+            self.stdout.write(
+                f"{result['mode']:<16}{result['orders_per_second']:>10.1f}"
+                f"{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['failed']:>8}"
+            )
+
+        if results[0]["orders_per_second"]:
+            speedup = results[1]["orders_per_second"] / results[0]["orders_per_second"]
+            self.stdout.write(self.style.SUCCESS(f"Sharded speed-up: x{speedup:.2f}"))
+
+    def run(self, buckets, options):
+        orders, quantity = options["orders"], options["quantity"]
+        tag = uuid.uuid4().hex[:8]
+
+        product = Product.objects.create(
+            name=f"bench-stock-{tag}",
+            price=1,
+            stock=orders * quantity,
+            is_active=False,
+        )
+        if buckets:
+            stock.set_stock_buckets(product, buckets)
+        buyers = [
+            User.objects.create_user(username=f"bench-{tag}-{index}", email=f"bench-{tag}-{index}@example.invalid")
+            for index in range(options["threads"])
+        ]
+        carts = {buyer.pk: Cart.objects.create(user=buyer) for buyer in buyers}
+
+        view = PlaceOrderView.as_view(throttle_classes=[])
+        factory = APIRequestFactory()
+        latencies, failures = [], []
+        remaining = [orders]
+        lock = threading.Lock()
+
+        def buyer(user):
+            try:
+                while True:
+                    with lock:
+                        if remaining[0] <= 0:
+                            return
+                        remaining[0] -= 1
+
+                    # Refill the cart (checkout empties it); not timed
+                    CartItem.objects.create(cart=carts[user.pk], product=product, quantity=quantity)
+                    request = factory.post("/api/v1/orders/place/", {"shippingAddress": SHIPPING_ADDRESS}, format="json")
+                    force_authenticate(request, user=user)
+
+                    started = time.perf_counter()
+                    try:
+                        response = view(request)
+                    except (ValidationError, DatabaseError) as exc:
+                        failures.append(exc)
+                        CartItem.objects.filter(cart=carts[user.pk]).delete()
+                        continue
+                    if response.status_code != 201:
+                        failures.append(response.status_code)
+                        CartItem.objects.filter(cart=carts[user.pk]).delete()
+                        continue
+                    latencies.append(time.perf_counter() - started)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=buyer, args=(user,)) for user in buyers]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        left = Product.objects.with_available_stock().get(pk=product.pk).available_stock
+        self.clean_up(product, buyers)
+
+        latencies.sort()
+        mode = f"{buckets} buckets" if buckets else "row lock"
+        self.stdout.write(f"{mode}: {len(latencies)} checkouts in {elapsed:.2f}s, {left} units left")
+        return {
+            "mode": mode,
+            "orders_per_second": len(latencies) / elapsed if elapsed else 0.0,
+            "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+            "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000 if latencies else 0.0,
+            "failed": len(failures),
+        }
+
+    def clean_up(self, product, buyers):
+        bench_orders = Order.objects.filter(user__in=buyers)
+        # Take the benchmark orders back out of the sales rollups
+        rollups.apply_bulk_status_change(bench_orders, Order.Status.CANCELLED)
+        bench_orders.delete()
+        Cart.objects.filter(user__in=buyers).delete()
+        User.objects.filter(pk__in=[buyer.pk for buyer in buyers]).delete()
+        product.delete()
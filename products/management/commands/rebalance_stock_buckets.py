@@ -0,0 +1,22 @@
+# products/management/commands/rebalance_stock_buckets.py
+from django.core.management.base import BaseCommand
+
+from products.models import Product
+from products import stock
+
+
+class Command(BaseCommand):
+    help = (
+        "Even out the stock buckets of sharded (hot) products and refresh "
+        "their Product.stock snapshot. Run it periodically (e.g. every minute "
+        "during a flash sale)."
+    )
+
+    def handle(self, *args, **options):
+        rebalanced = 0
+        for product in Product.objects.filter(stock_buckets__gt=0).only("id", "stock", "stock_buckets"):
+            total = stock.rebalance(product)
+            rebalanced += 1
+            self.stdout.write(f"  {product.pk}: {total} units over {product.stock_buckets} buckets")
+
+        self.stdout.write(self.style.SUCCESS(f"Rebalanced {rebalanced} products."))
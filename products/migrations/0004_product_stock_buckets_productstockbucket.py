@@ -0,0 +1,32 @@
+# Generated by Django 6.0 on 2026-10-18 22:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_alter_product_discount_price'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='stock_buckets',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Hot products only: split stock across N bucket rows to relieve row-lock contention (0 = off)'),
+        ),
+        migrations.CreateModel(
+            name='ProductStockBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.PositiveSmallIntegerField()),
+                ('stock', models.PositiveIntegerField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_bucket_rows', to='products.product')),
+            ],
+            options={
+                'ordering': ['product', 'bucket'],
+                'unique_together': {('product', 'bucket')},
+            },
+        ),
+    ]
@@ -1,10 +1,34 @@
 import uuid
 from decimal import Decimal
 from django.db import models
+from django.db.models import Case, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
 from django.utils.text import slugify
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
+class ProductQuerySet(models.QuerySet):
+    def with_available_stock(self):
+        """
+        Annotate `sharded_stock` (sum of the bucket rows) so
+        Product.available_stock needs no extra query per product.
+        """
+        bucket_total = (
+            ProductStockBucket.objects.filter(product=OuterRef("pk"))
+            .order_by()
+            .values("product")
+            .annotate(total=Sum("stock"))
+            .values("total")
+        )
+        return self.annotate(
+            sharded_stock=Case(
+                When(stock_buckets__gt=0, then=Coalesce(Subquery(bucket_total), Value(0))),
+                default=F("stock"),
+                output_field=models.IntegerField(),
+            )
+        )
+
+
 class Product(models.Model):
     """
     A production-ready Product model suitable for e-commerce,
@@ -49,6 +73,10 @@ class Product(models.Model):
     
     # Inventory
     stock = models.PositiveIntegerField(default=0)
+    stock_buckets = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Hot products only: split stock across N bucket rows to relieve row-lock contention (0 = off)"
+    )
     is_active = models.BooleanField(default=True)
 
     # Images
@@ -66,6 +94,8 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True) # only at created time, can not be changed later (created once)
     updated_at = models.DateTimeField(auto_now=True) # can be change anytime
 
+    objects = ProductQuerySet.as_manager()
+
     # Methods
     # Auto-generate slug
     def save(self, *args, **kwargs):
@@ -102,5 +132,39 @@ class Product(models.Model):
         tax_amount = (base_price * self.tax_percent) / Decimal("100")
         return base_price + tax_amount
 
+    @property
+    def stock_sharded(self):
+        return self.stock_buckets > 0
+
+    @property
+    def available_stock(self):
+        """
+        Sellable stock. For sharded (hot) products this is the sum of the
+        bucket rows; `stock` is then only the snapshot of the last rebalance.
+        """
+        if not self.stock_sharded:
+            return self.stock
+        if "sharded_stock" in self.__dict__:
+            return self.sharded_stock
+        return self.stock_bucket_rows.aggregate(total=Sum("stock"))["total"] or 0
+
     def __str__(self):
         return self.name
+
+
+class ProductStockBucket(models.Model):
+    """
+    One slice of a hot product's stock.
+    Checkouts claim from a random bucket, so concurrent buyers lock
+    different rows instead of queueing on the single Product row.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="stock_bucket_rows")
+    bucket = models.PositiveSmallIntegerField()
+    stock = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["product", "bucket"]
+        unique_together = ("product", "bucket")
+
+    def __str__(self):
+        return f"{self.product} [bucket {self.bucket}]: {self.stock}"
@@ -32,3 +32,9 @@ class ProductSerializer(serializers.ModelSerializer):\
         
         read_only_fields = ["id", "slug", "created_at", "updated_at", "final_price"]
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Hot products keep their stock in bucket rows: expose the sum
+        data["stock"] = instance.available_stock
+        return data
+
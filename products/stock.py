@@ -0,0 +1,152 @@
+# products/stock.py
+"""
+Stock claiming for checkout.
+
+Regular products lock their Product row (select_for_update) as before.
+Hot products (stock_buckets > 0) keep their stock in ProductStockBucket
+rows: a checkout decrements ONE random bucket with a conditional UPDATE,
+so thousands of concurrent buyers spread over N row locks instead of one.
+A periodic rebalance evens the buckets out again.
+"""
+import random
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+
+from .models import Product, ProductStockBucket
+
+
+def insufficient_stock(product, available, requested):
+    return ValidationError(
+        f"Insufficient stock for '{product.name}'. "
+        f"Available: {available}, "
+        f"Requested: {requested}"
+    )
+
+
+def claim_stock(product, quantity):
+    """
+    Take `quantity` units of `product` inside the current transaction.
+    Returns the Product instance to snapshot prices from.
+    Raises ValidationError when there is not enough stock.
+
+    `product` may be stale (loaded with the cart): it only picks the
+    lock-free bucket attempt. Everything else is decided on the locked
+    Product row, so a concurrent set_stock_buckets() can't make a
+    checkout take stock from the wrong place.
+    """
+    if product.stock_sharded and claim_from_bucket(product, quantity):
+        return product
+
+    # 🔒 Lock the product row until transaction finishes
+    product = Product.objects.select_for_update().get(pk=product.pk)
+
+    if product.stock_sharded:
+        claim_across_buckets(product, quantity)
+        return product
+
+    # Stock validation
+    if product.stock < quantity:
+        raise insufficient_stock(product, product.stock, quantity)
+
+    # Decrease product stock using F() to avoid race conditions
+    product.stock = F('stock') - quantity
+    product.save(update_fields=['stock'])
+    return product
+
+
+def claim_from_bucket(product, quantity):
+    """
+    Fast path: one conditional UPDATE on a random bucket that can cover
+    the whole quantity. False when none can (buckets too fragmented, or
+    the bucket rows changed under a stale `product`).
+    """
+    buckets = list(range(product.stock_buckets))
+    random.shuffle(buckets)
+
+    for bucket in buckets:
+        claimed = ProductStockBucket.objects.filter(
+            product=product, bucket=bucket, stock__gte=quantity
+        ).update(stock=F("stock") - quantity)
+        if claimed:
+            return True
+    return False
+
+
+def claim_across_buckets(product, quantity):
+    """
+    Slow path, with the Product row locked: lock every bucket in a fixed
+    order (as rebalance does) and drain across them.
+    """
+    rows = list(
+        ProductStockBucket.objects.select_for_update()
+        .filter(product=product)
+        .order_by("bucket")
+    )
+    available = sum(row.stock for row in rows)
+    if available < quantity:
+        raise insufficient_stock(product, available, quantity)
+
+    remaining = quantity
+    for row in rows:
+        taken = min(row.stock, remaining)
+        row.stock -= taken
+        remaining -= taken
+        if not remaining:
+            break
+    ProductStockBucket.objects.bulk_update(rows, ["stock"])
+
+
+def rebalance(product):
+    """
+    Spread a product's stock evenly over `stock_buckets` rows and refresh
+    the Product.stock snapshot. Also creates/drops bucket rows when the
+    bucket count changed, and folds stock back onto the product row when
+    sharding is switched off (stock_buckets = 0).
+    """
+    with transaction.atomic():
+        product = Product.objects.select_for_update().get(pk=product.pk)
+        rows = list(
+            ProductStockBucket.objects.select_for_update()
+            .filter(product=product)
+            .order_by("bucket")
+        )
+
+        # Bucket rows exist only while sharding is active and seeded
+        total = sum(row.stock for row in rows) if rows else product.stock
+        count = product.stock_buckets
+
+        if count == 0:
+            ProductStockBucket.objects.filter(product=product).delete()
+        else:
+            share, extra = divmod(total, count)
+            existing = {row.bucket: row for row in rows}
+
+            ProductStockBucket.objects.filter(product=product, bucket__gte=count).delete()
+            updated, created = [], []
+            for bucket in range(count):
+                stock = share + (1 if bucket < extra else 0)
+                if bucket in existing:
+                    existing[bucket].stock = stock
+                    updated.append(existing[bucket])
+                else:
+                    created.append(ProductStockBucket(product=product, bucket=bucket, stock=stock))
+
+            ProductStockBucket.objects.bulk_update(updated, ["stock"])
+            ProductStockBucket.objects.bulk_create(created)
+
+        product.stock = total
+        product.save(update_fields=["stock"])
+        return total
+
+
+def set_stock_buckets(product, count):
+    """
+    Turn sharding on/off (or resize it) atomically with the rebalance,
+    so checkouts never see a sharded product without bucket rows.
+    """
+    with transaction.atomic():
+        Product.objects.filter(pk=product.pk).update(stock_buckets=count)
+        product.stock_buckets = count
+        return rebalance(product)
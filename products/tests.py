@@ -1,3 +1,127 @@
+import json
+from decimal import Decimal
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.exceptions import ValidationError
+from django.db import transaction
 from django.test import TestCase
+from django.test.client import AsyncRequestFactory
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.test import APIRequestFactory
+
+from . import async_views, views
+from .models import Product, ProductStockBucket
+from .stock import claim_stock, rebalance, set_stock_buckets
+
+
+class ClaimStockTests(TestCase):
+    def make_product(self, stock=10, buckets=0):
+        product = Product.objects.create(name="Mug", stock=stock)
+        if buckets:
+            set_stock_buckets(product, buckets)
+        return Product.objects.get(pk=product.pk)
+
+    def available(self, product):
+        return Product.objects.with_available_stock().get(pk=product.pk).available_stock
+
+    def claim(self, product, quantity):
+        with transaction.atomic():
+            return claim_stock(product, quantity)
+
+    def test_row_lock_claim_decrements_product_stock(self):
+        product = self.make_product(stock=5)
+        self.claim(product, 3)
+        product.refresh_from_db()
+        self.assertEqual(product.stock, 2)
+        with self.assertRaises(ValidationError):
+            self.claim(product, 3)
+        product.refresh_from_db()
+        self.assertEqual(product.stock, 2)
+
+    def test_sharded_claim_takes_from_buckets_only(self):
+        product = self.make_product(stock=12, buckets=4)
+        self.assertEqual(list(product.stock_bucket_rows.values_list("stock", flat=True)), [3, 3, 3, 3])
+        self.claim(product, 2)
+        self.assertEqual(self.available(product), 10)
+        # Product.stock is only the snapshot of the last rebalance
+        product.refresh_from_db()
+        self.assertEqual(product.stock, 12)
+
+    def test_sharded_claim_drains_across_fragmented_buckets(self):
+        product = self.make_product(stock=8, buckets=4)
+        self.claim(product, 7)
+        self.assertEqual(self.available(product), 1)
+        with self.assertRaises(ValidationError):
+            self.claim(product, 2)
+        self.assertEqual(self.available(product), 1)
+        self.assertEqual(rebalance(product), 1)
+
+    def test_stale_unsharded_instance_claims_from_buckets(self):
+        stale = self.make_product(stock=8)
+        set_stock_buckets(stale, 2)
+        stale.stock_buckets = 0  # as loaded by a cart before sharding was switched on
+
+        self.claim(stale, 3)
+        self.assertEqual(self.available(stale), 5)
+        self.assertEqual(sorted(ProductStockBucket.objects.filter(product=stale).values_list("stock", flat=True)), [1, 4])
+
+    def test_stale_sharded_instance_claims_from_product_row(self):
+        stale = self.make_product(stock=8, buckets=2)
+        set_stock_buckets(Product.objects.get(pk=stale.pk), 0)
+        self.assertEqual(stale.stock_buckets, 2)
+
+        self.claim(stale, 3)
+        product = Product.objects.get(pk=stale.pk)
+        self.assertEqual(product.stock, 5)
+        self.assertFalse(ProductStockBucket.objects.filter(product=product).exists())
+
+
+class TwoPerPage(PageNumberPagination):
+    page_size = 2
+
+
+class AsyncProductViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.products = [
+            Product.objects.create(name=f"Mug {index}", price=Decimal("10.00"), stock=index)
+            for index in range(5)
+        ]
+        cls.hidden = Product.objects.create(name="Hidden", price=Decimal("1.00"), is_active=False)
+
+    def get_async(self, view, path="/", **kwargs):
+        response = async_to_sync(view.as_view())(AsyncRequestFactory().get(path), **kwargs)
+        return response.status_code, json.loads(response.content)
+
+    def get_sync(self, view, path="/", **kwargs):
+        response = view.as_view()(APIRequestFactory().get(path, HTTP_ACCEPT="application/json"), **kwargs)
+        response.render()
+        return response.status_code, json.loads(response.content)
+
+    def test_list_matches_the_sync_view(self):
+        status_code, data = self.get_async(async_views.ProductListView)
+        self.assertEqual((status_code, data), self.get_sync(views.ProductListView))
+        self.assertEqual(len(data), 5)
+        self.assertNotIn(str(self.hidden.pk), {product["id"] for product in data})
+
+    def test_list_pages_like_the_sync_view(self):
+        with mock.patch.object(views.ProductListView, "pagination_class", TwoPerPage):
+            for path in ("/", "/?page=2", "/?page=3"):
+                status_code, data = self.get_async(async_views.ProductListView, path)
+                self.assertEqual((status_code, data), self.get_sync(views.ProductListView, path))
+            self.assertEqual(data["count"], 5)
+            self.assertEqual(len(data["results"]), 1)
+            status_code, data = self.get_async(async_views.ProductListView, "/?page=9")
+            self.assertEqual(status_code, 404)
+            self.assertEqual((status_code, data), self.get_sync(views.ProductListView, "/?page=9"))
 
-# Create your tests here.
+    def test_detail_matches_the_sync_view(self):
+        product_id = self.products[0].pk
+        self.assertEqual(
+            self.get_async(async_views.ProductDetailView, id=product_id),
+            self.get_sync(views.ProductDetailView, id=product_id),
+        )
+        status_code, data = self.get_async(async_views.ProductDetailView, id=self.hidden.pk)
+        self.assertEqual(status_code, 404)
+        self.assertEqual((status_code, data), self.get_sync(views.ProductDetailView, id=self.hidden.pk))
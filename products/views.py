@@ -4,6 +4,11 @@ from .models import Product
 from .serializers import ProductSerializer
 
 from drf_spectacular.utils import extend_schema, extend_schema_view
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.renderers import BrowsableAPIRenderer
+
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
 
 
 # Create your views here.
@@ -28,10 +33,12 @@ class ProductListView(generics.ListCreateAPIView):
     """
     # queryset = Product.objects.filter(is_active=True).order_by('-created_at')
     serializer_class = ProductSerializer
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    parser_classes = [FastJSONParser, FormParser, MultiPartParser]
 
 
     def get_queryset(self):
-        return Product.objects.filter(is_active=True).order_by('-created_at')
+        return Product.objects.filter(is_active=True).with_available_stock().order_by('-created_at')
 
 
 @extend_schema_view(
@@ -44,9 +51,10 @@ class ProductListView(generics.ListCreateAPIView):
 )
 class ProductDetailView(generics.RetrieveAPIView):
     """GET    /products/<id>/  => Retrieve single product"""
-    queryset = Product.objects.filter(is_active=True)
+    queryset = Product.objects.filter(is_active=True).with_available_stock()
     serializer_class = ProductSerializer
     lookup_field = "id"
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
 
 
 # class ProductDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from .models import User
+from .search import search_users
 
 
 @admin.register(User)
@@ -8,5 +9,11 @@ class UserAdmin(BaseUserAdmin):
     list_display = ['email', 'first_name', 'last_name', 'is_active']
     fieldsets = () # will make the password read only
 
+    def get_search_results(self, request, queryset, search_term):
+        # Index-backed search (trigram on email / unique username)
+        if not search_term:
+            return queryset, False
+        return search_users(search_term, queryset), False
+
 
 # admin.site.register(User, UserAdmin)
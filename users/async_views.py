@@ -0,0 +1,69 @@
+# users/async_views.py
+"""
+Async (ASGI) register and login; see api/async_views.py.
+
+Both spend their time waiting for a password hash. Awaiting it from
+users.hashing's pool keeps the event loop free, where the sync views
+would hold the ASGI sync thread for the whole hash.
+"""
+from asgiref.sync import sync_to_async
+
+from django.contrib.auth import aauthenticate
+from django.contrib.auth.models import update_last_login
+from django.utils.module_loading import import_string
+
+from rest_framework import exceptions, status
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from api.async_views import AsyncAPIView
+from api.throttling import RegisterThrottle, TokenObtainThrottle
+from api.views import CustomTokenObtainPairView
+
+from .serializers import UserRegisterSerializer
+from . import hashing, views
+
+
+class RegisterView(AsyncAPIView):
+    """POST /register/ => Create a user (hash awaited off the event loop)"""
+    sync_view = views.RegisterView
+    authentication_classes = []
+    throttle_classes = [RegisterThrottle]
+
+    async def post(self, request):
+        serializer = UserRegisterSerializer(data=self.parse(request), context={'request': request})
+        # Unique username / email checks query the database
+        if not await sync_to_async(serializer.is_valid)():
+            return self.render(serializer.errors, status.HTTP_400_BAD_REQUEST)
+        password_hash = await hashing.amake_password(serializer.validated_data['password'], request)
+        await sync_to_async(serializer.save)(password_hash=password_hash)
+        return self.render(serializer.data, status.HTTP_201_CREATED)
+
+
+class TokenObtainPairView(AsyncAPIView):
+    """POST /token/ => Access and refresh tokens for a username / password"""
+    sync_view = CustomTokenObtainPairView
+    authentication_classes = []
+    throttle_classes = [TokenObtainThrottle]
+    serializer_class = import_string(jwt_settings.TOKEN_OBTAIN_SERIALIZER)
+
+    def get_authenticate_header(self, request):
+        # Same challenge as simplejwt's views
+        return '{} realm="{}"'.format(jwt_settings.AUTH_HEADER_TYPES[0], self.sync_view.www_authenticate_realm)
+
+    async def post(self, request):
+        serializer = self.serializer_class(context={'request': request})
+        # Field checks only: the serializer's validate() authenticates synchronously
+        attrs = serializer.to_internal_value(self.parse(request))
+        user = await aauthenticate(request, **{
+            serializer.username_field: attrs[serializer.username_field],
+            'password': attrs['password'],
+        })
+        if not jwt_settings.USER_AUTHENTICATION_RULE(user):
+            raise exceptions.AuthenticationFailed(
+                serializer.error_messages['no_active_account'], 'no_active_account',
+            )
+
+        refresh = await sync_to_async(serializer.get_token)(user)
+        if jwt_settings.UPDATE_LAST_LOGIN:
+            await sync_to_async(update_last_login)(None, user)
+        return self.render({'refresh': str(refresh), 'access': str(refresh.access_token)})
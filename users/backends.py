@@ -0,0 +1,42 @@
+# users/backends.py
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from . import hashing
+
+
+UserModel = get_user_model()
+
+
+class OffloadedHashingBackend(ModelBackend):
+    """
+    ModelBackend whose password checks run in users.hashing's bounded pool.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Still spend one hash so unknown users are not faster to reject
+            hashing.make_password(password, request)
+        else:
+            if hashing.check_password(user, password, request) and self.user_can_authenticate(user):
+                return user
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        # ModelBackend's version hashes on the event loop
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return
+        try:
+            user = await UserModel._default_manager.aget_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            await hashing.amake_password(password, request)
+        else:
+            if await hashing.acheck_password(user, password, request) and self.user_can_authenticate(user):
+                return user
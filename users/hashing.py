@@ -0,0 +1,150 @@
+# users/hashing.py
+"""
+Bounded, offloaded password hashing for register and login.
+
+PBKDF2 costs ~100 ms of CPU per call. Instead of running it inline in
+every request worker, hashing goes through a small shared thread pool
+(hashlib's PBKDF2 releases the GIL, so threads run it in parallel):
+
+- at most WORKERS hashes run at once, so a login burst cannot take
+  every core away from the catalog endpoints;
+- at most MAX_QUEUE more may wait; beyond that requests are rejected
+  immediately with 503 instead of piling up;
+- each client IP may have PER_IP_IN_FLIGHT hashes pending; more are
+  rejected with 429 before any CPU is spent.
+
+Under ASGI, register and login are async views (users/async_views.py)
+that await their hash with `run_async`: the sync DRF views would block
+on `.result()`, and Django runs every sync view of an ASGI process on one
+thread. The sync path (`run`) is for WSGI workers and the admin login.
+"""
+import asyncio
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+from rest_framework import status
+from rest_framework.exceptions import APIException, Throttled
+from rest_framework.throttling import BaseThrottle
+
+
+class HashingOverloaded(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Authentication is busy, please retry shortly."
+    default_code = "hashing_overloaded"
+
+
+class HashingRateLimited(Throttled):
+    default_detail = "Too many concurrent authentication attempts from this address."
+    default_code = "hashing_rate_limited"
+
+
+def client_ip(request):
+    if request is None:
+        return None
+    # Same client identity as the throttles (NUM_PROXIES, X-Forwarded-For)
+    return BaseThrottle().get_ident(request)
+
+
+class HashingPool:
+    def __init__(self, enabled=True, workers=2, max_queue=16, per_ip_in_flight=2, timeout=5):
+        self.enabled = enabled
+        self.workers = workers
+        self.max_queue = max_queue
+        self.per_ip_in_flight = per_ip_in_flight
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pending = 0
+        self._per_ip = Counter()
+
+    @property
+    def executor(self):
+        # Created lazily so forking servers start the threads per worker
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="pwhash")
+        return self._executor
+
+    def _acquire(self, ip):
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                raise HashingOverloaded()
+            if ip and self._per_ip[ip] >= self.per_ip_in_flight:
+                raise HashingRateLimited()
+            self._pending += 1
+            if ip:
+                self._per_ip[ip] += 1
+
+    def _release(self, ip):
+        with self._lock:
+            self._pending -= 1
+            if ip:
+                self._per_ip[ip] -= 1
+                if self._per_ip[ip] <= 0:
+                    del self._per_ip[ip]
+
+    def submit(self, fn, *args, ip=None):
+        self._acquire(ip)
+        try:
+            future = self.executor.submit(fn, *args)
+        except Exception:
+            self._release(ip)
+            raise
+        future.add_done_callback(lambda _: self._release(ip))
+        return future
+
+    def run(self, fn, *args, ip=None):
+        if not self.enabled:
+            return fn(*args)
+        try:
+            return self.submit(fn, *args, ip=ip).result(timeout=self.timeout)
+        except FutureTimeout:
+            raise HashingOverloaded()
+
+    async def run_async(self, fn, *args, ip=None):
+        if not self.enabled:
+            return fn(*args)
+        future = asyncio.wrap_future(self.submit(fn, *args, ip=ip))
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            raise HashingOverloaded()
+
+
+config = getattr(settings, "PASSWORD_HASHING", {})
+pool = HashingPool(
+    enabled=config.get("OFFLOAD", True),
+    workers=config.get("WORKERS", 2),
+    max_queue=config.get("MAX_QUEUE", 16),
+    per_ip_in_flight=config.get("PER_IP_IN_FLIGHT", 2),
+    timeout=config.get("TIMEOUT", 5),
+)
+
+
+def make_password(raw_password, request=None):
+    return pool.run(hashers.make_password, raw_password, ip=client_ip(request))
+
+
+def check_password(user, raw_password, request=None):
+    # user.check_password may re-hash and save on hasher upgrades
+    return pool.run(user.check_password, raw_password, ip=client_ip(request))
+
+
+async def amake_password(raw_password, request=None):
+    return await pool.run_async(hashers.make_password, raw_password, ip=client_ip(request))
+
+
+async def acheck_password(user, raw_password, request=None):
+    ip = client_ip(request)
+    is_correct, must_update = await pool.run_async(hashers.verify_password, raw_password, user.password, ip=ip)
+    if is_correct and must_update:
+        # Hasher upgrade: store the password with the current hasher
+        user.password = await pool.run_async(hashers.make_password, raw_password, ip=ip)
+        await user.asave(update_fields=["password"])
+    return is_correct
@@ -0,0 +1,128 @@
+# users/management/commands/bench_login.py
+"""
+Login throughput benchmark under concurrency.
+
+Client threads hammer POST /api/v1/token/ (each with its own REMOTE_ADDR)
+while one probe thread keeps requesting the product list, once with
+inline hashing and once through users.hashing's bounded pool. Reports
+logins/second, login and catalog latencies and how many logins were
+rejected (429/503) by the pool.
+
+A throwaway user is created and deleted; run against a dev database.
+"""
+import statistics
+import threading
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+
+from rest_framework.test import APIClient
+
+from users import hashing
+
+
+User = get_user_model()
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000
+
+
+class Command(BaseCommand):
+    help = "Measure login throughput and catalog latency with inline vs pooled password hashing."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=16, help="Concurrent login clients (default: 16)")
+        parser.add_argument("--logins", type=int, default=200, help="Logins per run (default: 200)")
+
+    def handle(self, *args, **options):
+        email, password = f"bench-login-{uuid.uuid4().hex[:8]}@example.com", uuid.uuid4().hex
+        user = User.objects.create_user(username=email, email=email, password=password)
+
+        results = []
+        offload = hashing.pool.enabled
+        try:
+            # 429s here should come from the hashing pool, not the login throttle
+            with override_settings(THROTTLING_ENABLED=False):
+                for mode, enabled in (("inline", False), ("pooled", True)):
+                    hashing.pool.enabled = enabled
+                    results.append(self.run(mode, email, password, options))
+        finally:
+            hashing.pool.enabled = offload
+            user.delete()
+
+        self.stdout.write("")
+        self.stdout.write(
+            f"{'mode':<10}{'logins/s':>10}{'p50 ms':>10}{'p99 ms':>10}"
+            f"{'rejected':>10}{'catalog p99':>13}"
+        )
+        for result in results:
+            self.stdout.write(
+                f"{result['mode']:<10}{result['logins_per_second']:>10.1f}"
+                f"{result['p50_ms']:>10.1f}{result['p99_ms']:>10.1f}"
+                f"{result['rejected']:>10}{result['catalog_p99_ms']:>13.1f}"
+            )
+
+    def run(self, mode, email, password, options):
+        remaining = [options["logins"]]
+        lock = threading.Lock()
+        latencies, rejected, catalog = [], [], []
+        done = threading.Event()
+
+        def login_client(index):
+            client = APIClient(REMOTE_ADDR=f"10.0.{index // 250}.{index % 250 + 1}")
+            try:
+                while True:
+                    with lock:
+                        if remaining[0] <= 0:
+                            return
+                        remaining[0] -= 1
+                    started = time.perf_counter()
+                    response = client.post(
+                        "/api/v1/token/", {"email": email, "password": password}, format="json"
+                    )
+                    if response.status_code in (429, 503):
+                        rejected.append(response.status_code)
+                    else:
+                        latencies.append(time.perf_counter() - started)
+            finally:
+                connection.close()
+
+        def catalog_probe():
+            client = APIClient()
+            try:
+                while not done.is_set():
+                    started = time.perf_counter()
+                    client.get("/api/v1/products/")
+                    catalog.append(time.perf_counter() - started)
+            finally:
+                connection.close()
+
+        probe = threading.Thread(target=catalog_probe)
+        threads = [threading.Thread(target=login_client, args=(i,)) for i in range(options["threads"])]
+        probe.start()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        done.set()
+        probe.join()
+
+        self.stdout.write(f"{mode}: {len(latencies)} logins in {elapsed:.2f}s, {len(rejected)} rejected")
+        return {
+            "mode": mode,
+            "logins_per_second": len(latencies) / elapsed if elapsed else 0.0,
+            "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+            "p99_ms": percentile(latencies, 0.99),
+            "rejected": len(rejected),
+            "catalog_p99_ms": percentile(catalog, 0.99),
+        }
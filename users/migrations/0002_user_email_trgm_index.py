@@ -0,0 +1,39 @@
+# Generated by Django 6.0 on 2026-10-18 23:05
+
+from django.db import migrations
+
+
+# Trigram GIN index for partial email search. It indexes UPPER(email)
+# because that is what Django compiles `email__icontains` to on PostgreSQL.
+# Other backends (SQLite in development) are skipped.
+CREATE_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS users_user_email_trgm '
+    'ON users_user USING gin ((UPPER("email"::text)) gin_trgm_ops)',
+]
+DROP_SQL = [
+    "DROP INDEX CONCURRENTLY IF EXISTS users_user_email_trgm",
+]
+
+
+def run_on_postgresql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_on_postgresql(CREATE_SQL), run_on_postgresql(DROP_SQL)),
+    ]
@@ -0,0 +1,31 @@
+# users/search.py
+"""
+Index-friendly user search for the admin and support tools.
+"""
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+# Trigram indexes need at least 3 characters to narrow anything down
+MIN_PARTIAL_LENGTH = 3
+
+
+def search_users(term, queryset=None):
+    """
+    Exact email / username hits short-circuit to the unique indexes;
+    otherwise partial email matching uses the trigram index on UPPER(email).
+    """
+    queryset = User.objects.all() if queryset is None else queryset
+    term = term.strip()
+    if not term:
+        return queryset
+
+    exact = queryset.filter(email=term)
+    if "@" in term and exact.exists():
+        return exact
+
+    # Too short for trigrams: exact matches only
+    if len(term) < MIN_PARTIAL_LENGTH:
+        return queryset.filter(username=term)
+
+    return queryset.filter(email__icontains=term)
@@ -2,6 +2,8 @@ from rest_framework import serializers
 from .models import User
 from django.contrib.auth import get_user_model
 
+from . import hashing
+
 User = get_user_model()
 
 
@@ -14,9 +16,16 @@ class UserRegisterSerializer(serializers.ModelSerializer):
         fields = ['id', 'email', 'username', 'password']
     
     # tell django to create the user
-    # this will automatically hash the password
+    # the password is hashed in the bounded hashing pool (users/hashing.py)
     def create(self, validate_data):
-        user = User.objects.create_user(**validate_data)
+        password = validate_data.pop('password')
+        # Already hashed by the async register view (users/async_views.py)
+        password_hash = validate_data.pop('password_hash', None)
+        validate_data['username'] = User.normalize_username(validate_data['username'])
+        validate_data['email'] = User.objects.normalize_email(validate_data.get('email'))
+        user = User(**validate_data)
+        user.password = password_hash or hashing.make_password(password, self.context.get('request'))
+        user.save()
         # user = user.objects.create_user(
         #     validate_data['username'],
         #     validate_data['email'],
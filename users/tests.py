@@ -1,3 +1,72 @@
-from django.test import TestCase
+import json
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.client import AsyncRequestFactory
+
+from . import hashing
+from .async_views import RegisterView, TokenObtainPairView
+
+User = get_user_model()
+
+
+class HashingClientTests(TestCase):
+    def test_per_ip_limit_uses_the_throttle_identity(self):
+        request = RequestFactory().post("/", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="203.0.113.7, 10.0.0.9")
+        with override_settings(REST_FRAMEWORK={"NUM_PROXIES": 1}):
+            self.assertEqual(hashing.client_ip(request), "10.0.0.9")
+        with override_settings(REST_FRAMEWORK={"NUM_PROXIES": 2}):
+            self.assertEqual(hashing.client_ip(request), "203.0.113.7")
+        # No NUM_PROXIES: the whole header, as the throttles key it
+        self.assertEqual(hashing.client_ip(request), "203.0.113.7,10.0.0.9")
+
+    def test_pool_rejects_more_in_flight_hashes_per_ip(self):
+        pool = hashing.HashingPool(per_ip_in_flight=1)
+        pool._acquire("203.0.113.7")
+        try:
+            with self.assertRaises(hashing.HashingRateLimited):
+                pool._acquire("203.0.113.7")
+            pool._acquire("203.0.113.8")
+            pool._release("203.0.113.8")
+        finally:
+            pool._release("203.0.113.7")
+
+
+@override_settings(THROTTLING_ENABLED=False)
+class AsyncAuthViewTests(TestCase):
+    factory = AsyncRequestFactory()
+
+    def post(self, view, data):
+        request = self.factory.post("/", data, content_type="application/json")
+        return view.as_view()(request)
+
+    def body(self, response):
+        return json.loads(response.content)
+
+    async def test_register_hashes_in_the_pool(self):
+        response = await self.post(RegisterView, {"username": "ada", "email": "ada@example.com", "password": "Pass@123"})
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn("password", self.body(response))
+        user = await User.objects.aget(username="ada")
+        self.assertTrue(await user.acheck_password("Pass@123"))
+
+        response = await self.post(RegisterView, {"username": "ada", "email": "ada@example.com", "password": "x"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("username", self.body(response))
+
+    async def test_login_returns_tokens_for_valid_credentials(self):
+        await User.objects.acreate_user(username="ada", email="ada@example.com", password="Pass@123")
+        response = await self.post(TokenObtainPairView, {"email": "ada@example.com", "password": "Pass@123"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(self.body(response)), {"refresh", "access"})
+
+    async def test_login_rejects_bad_credentials_like_simplejwt(self):
+        await User.objects.acreate_user(username="ada", email="ada@example.com", password="Pass@123")
+        response = await self.post(TokenObtainPairView, {"email": "ada@example.com", "password": "wrong"})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(self.body(response)["detail"], "No active account found with the given credentials")
+        self.assertTrue(response["WWW-Authenticate"].startswith("Bearer"))
+
+        response = await self.post(TokenObtainPairView, {"email": "ada@example.com"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("password", self.body(response))
@@ -8,11 +8,15 @@ from rest_framework.permissions import IsAuthenticated
 from drf_spectacular.utils import extend_schema
 
 from .serializers import UserRegisterSerializer, UserSerializer
+from api.authentication import get_full_user
+from api.throttling import RegisterThrottle, ThrottleBeforeAuthMixin
 
 
 # Create your views here.
-class RegisterView(APIView):
+class RegisterView(ThrottleBeforeAuthMixin, APIView):
     """User Registration Endpoint"""
+
+    throttle_classes = [RegisterThrottle]
     
     @extend_schema(
         tags=['Users'],
@@ -20,7 +24,7 @@ class RegisterView(APIView):
         description="Create a new user account."
     )
     def post(self, request):
-        serializer = UserRegisterSerializer(data=request.data)
+        serializer = UserRegisterSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -40,7 +44,8 @@ class ProfileView(APIView):
     def get(self, request):
         # check the login user
         # print(f'user: {request.user}')
-        serializer = UserSerializer(request.user)
+        # The full User row is only loaded here (stateless JWT mode)
+        serializer = UserSerializer(get_full_user(request.user))
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
     # PATCH = partial update → only updates provided fields
@@ -50,7 +55,7 @@ class ProfileView(APIView):
         description="Partially update the profile of the currently logged-in user."
     )
     def  patch(self, request):
-        serializer = UserSerializer(request.user, data=request.data, partial=True)
+        serializer = UserSerializer(get_full_user(request.user), data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
             # check the login user
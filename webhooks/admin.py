@@ -0,0 +1,42 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from clickmart_main.admin_tools import ScalableAdminMixin
+from .models import OrderEvent, WebhookDelivery, WebhookEndpoint
+
+
+@admin.register(WebhookEndpoint)
+class WebhookEndpointAdmin(admin.ModelAdmin):
+    list_display = ("url", "description", "is_active", "max_concurrency", "batch_size", "created_at")
+    list_filter = ("is_active",)
+
+
+@admin.register(OrderEvent)
+class OrderEventAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    list_display = ("id", "type", "order", "dispatched", "created_at")
+    list_filter = ("type", "dispatched")
+    raw_id_fields = ("order",)
+    keyset_ordering = ("-id",)
+
+    # Events are written by the order flow only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(WebhookDelivery)
+class WebhookDeliveryAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    list_display = ("event", "endpoint", "status", "attempts", "next_attempt_at", "last_error", "delivered_at")
+    list_filter = ("status", "endpoint")
+    raw_id_fields = ("event", "endpoint")
+    keyset_ordering = ("-id",)
+    actions = ["retry_now"]
+
+    def retry_now(self, request, queryset):
+        queryset.exclude(status=WebhookDelivery.Status.DELIVERED).update(
+            status=WebhookDelivery.Status.PENDING, attempts=0, next_attempt_at=timezone.now(), leased_until=None,
+        )
+
+    retry_now.short_description = "Retry selected deliveries now"
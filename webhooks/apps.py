@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class WebhooksConfig(AppConfig):
+    name = 'webhooks'
+
+    def ready(self):
+        # connect the order_status_changed listener (status changes go to the outbox)
+        from . import signals  # noqa: F401
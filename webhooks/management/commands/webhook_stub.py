@@ -0,0 +1,88 @@
+# webhooks/management/commands/webhook_stub.py
+"""
+Local HTTP receiver for testing order webhooks.
+
+    manage.py webhook_stub --port 8765 --secret <endpoint secret>
+
+Verifies each batch's signature, prints its events and the number of
+batches being received at once (to check max_concurrency), and can
+simulate a flaky or slow receiver (--fail-rate, --status, --delay).
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+from webhooks import services
+
+
+class Command(BaseCommand):
+    help = "Run a local webhook receiver that verifies and prints order event batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765)")
+        parser.add_argument("--secret", help="Endpoint secret; signatures are checked when given")
+        parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of batches answered with --status (0-1)")
+        parser.add_argument("--status", type=int, default=503, help="Status of simulated failures (default: 503)")
+        parser.add_argument("--delay", type=float, default=0.0, help="Seconds to hold each request")
+
+    def handle(self, *args, **options):
+        command = self
+        lock = threading.Lock()
+        state = {"active": {}, "peak": {}, "events": set()}
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                # Concurrency is counted per path (one endpoint each)
+                with lock:
+                    active = state["active"][self.path] = state["active"].get(self.path, 0) + 1
+                    state["peak"][self.path] = max(state["peak"].get(self.path, 0), active)
+                try:
+                    time.sleep(options["delay"])
+                    status = self.respond(body)
+                finally:
+                    with lock:
+                        state["active"][self.path] -= 1
+                self.send_response(status)
+                if status in (429, 503):
+                    self.send_header("Retry-After", "1")
+                self.end_headers()
+
+            def respond(self, body):
+                secret = options["secret"]
+                if secret and not services.verify(secret, self.headers.get(services.SIGNATURE_HEADER, ""), body):
+                    command.stdout.write(command.style.ERROR("bad signature"))
+                    return 401
+                if random.random() < options["fail_rate"]:
+                    command.stdout.write(command.style.WARNING(f"simulated {options['status']}"))
+                    return options["status"]
+                events = json.loads(body)["events"]
+                with lock:
+                    duplicates = sum(event["id"] in state["events"] for event in events)
+                    state["events"].update(event["id"] for event in events)
+                    summary = (
+                        f"{self.path} batch {self.headers.get(services.BATCH_HEADER)}: {len(events)} events "
+                        f"({duplicates} redelivered), {state['active'][self.path]} in flight, "
+                        f"peak {state['peak'][self.path]}, "
+                        f"{len(state['events'])} unique events so far"
+                    )
+                command.stdout.write(summary)
+                for event in events:
+                    command.stdout.write(f"  #{event['id']} {event['type']} {event['data']['order_number']}")
+                return 200
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", options["port"]), Handler)
+        self.stdout.write(f"Listening on http://127.0.0.1:{options['port']}/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
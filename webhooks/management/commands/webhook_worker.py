@@ -0,0 +1,70 @@
+# webhooks/management/commands/webhook_worker.py
+"""
+Order event webhook worker (see webhooks/services.py).
+
+Loops: fan out new outbox events, lease due batches per endpoint (up to
+its max_concurrency, across all workers) and POST them from a thread
+pool; the database work stays on the main thread. Several workers can
+run side by side. --once drains what is due
+now and exits (cron, tests).
+"""
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from webhooks import services
+
+
+class Command(BaseCommand):
+    help = "Deliver order event webhooks: batched, signed POSTs with retries."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8, help="Batches sent at once by this worker (default: 8)")
+        parser.add_argument("--interval", type=float, default=1.0, help="Seconds to sleep when idle (default: 1)")
+        parser.add_argument("--once", action="store_true", help="Deliver what is due now, then exit")
+
+    def handle(self, *args, **options):
+        threads, interval = options["threads"], options["interval"]
+        executor = ThreadPoolExecutor(threads, thread_name_prefix="webhook")
+        in_flight = set()
+        try:
+            while True:
+                dispatched = services.dispatch()
+                claimed = self.claim(executor, in_flight, threads)
+                if in_flight:
+                    done, in_flight = wait(in_flight, timeout=interval, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self.report(future)
+                elif options["once"] and not dispatched and not claimed:
+                    break
+                elif not dispatched and not claimed:
+                    time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for future in wait(in_flight).done:
+                self.report(future)
+            executor.shutdown()
+
+    def claim(self, executor, in_flight, threads):
+        claimed = 0
+        for endpoint in services.endpoints_with_due_deliveries():
+            while len(in_flight) < threads:
+                batch = services.claim_batch(endpoint)
+                if batch is None:
+                    break
+                future = executor.submit(services.send, *batch)
+                future.batch = batch
+                in_flight.add(future)
+                claimed += 1
+        return claimed
+
+    def report(self, future):
+        endpoint, _, deliveries = future.batch
+        try:
+            ok, error, retry_after = future.result()
+        except Exception as exc:
+            ok, error, retry_after = False, repr(exc), None
+        services.complete(deliveries, ok, error, retry_after)
+        line = f"{endpoint.url}: {len(deliveries)} events " + ("delivered" if ok else f"failed ({error}), will retry")
+        self.stdout.write(self.style.SUCCESS(line) if ok else self.style.WARNING(line))
@@ -0,0 +1,77 @@
+# Generated by Django 6.0 on 2026-10-18 23:40
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.db.models.functions.datetime
+import webhooks.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('orders', '0011_order_trgm_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookEndpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=500)),
+                ('description', models.CharField(blank=True, max_length=200)),
+                ('secret', models.CharField(default=webhooks.models.generate_secret, help_text='HMAC-SHA256 signing key', max_length=128)),
+                ('event_types', models.JSONField(blank=True, default=list, help_text='Event types to send (empty = all)')),
+                ('is_active', models.BooleanField(default=True)),
+                ('max_concurrency', models.PositiveSmallIntegerField(default=2, help_text='Batches in flight at once, across workers')),
+                ('batch_size', models.PositiveSmallIntegerField(default=100, help_text='Events per POST')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='OrderEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('type', models.CharField(choices=[('order.created', 'Order created'), ('order.paid', 'Order paid'), ('order.shipped', 'Order shipped'), ('order.cancelled', 'Order cancelled'), ('order.refunded', 'Order refunded')], max_length=32)),
+                ('payload', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('dispatched', models.BooleanField(default=False)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='webhook_events', to='orders.order')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='WebhookDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('delivered', 'Delivered'), ('failed', 'Failed (gave up)')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(db_default=django.db.models.functions.datetime.Now())),
+                ('batch_id', models.UUIDField(blank=True, db_index=True, null=True)),
+                ('leased_until', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('delivered_at', models.DateTimeField(blank=True, null=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='webhooks.orderevent')),
+                ('endpoint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='webhooks.webhookendpoint')),
+            ],
+            options={
+                'ordering': ['event_id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='orderevent',
+            index=models.Index(condition=models.Q(('dispatched', False)), fields=['id'], name='webhooks_event_undispatched'),
+        ),
+        migrations.AddIndex(
+            model_name='webhookdelivery',
+            index=models.Index(fields=['endpoint', 'status', 'next_attempt_at'], name='webhooks_we_endpoin_0ec546_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='webhookdelivery',
+            constraint=models.UniqueConstraint(fields=('endpoint', 'event'), name='unique_webhook_delivery'),
+        ),
+    ]
@@ -0,0 +1,110 @@
+# webhooks/models.py
+import secrets
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Now
+
+from orders.models import Order
+
+
+def generate_secret():
+    return secrets.token_hex(32)
+
+
+class WebhookEndpoint(models.Model):
+    """
+    A subscriber (ERP, warehouse, ...) receiving order events by HTTP POST.
+    """
+
+    url = models.URLField(max_length=500)
+    description = models.CharField(max_length=200, blank=True)
+    secret = models.CharField(max_length=128, default=generate_secret, help_text="HMAC-SHA256 signing key")
+    event_types = models.JSONField(default=list, blank=True, help_text="Event types to send (empty = all)")
+    is_active = models.BooleanField(default=True)
+
+    # ───────────────────────────────
+    # Delivery Limits
+    # ───────────────────────────────
+    max_concurrency = models.PositiveSmallIntegerField(default=2, help_text="Batches in flight at once, across workers")
+    batch_size = models.PositiveSmallIntegerField(default=100, help_text="Events per POST")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def accepts(self, event_type):
+        return not self.event_types or event_type in self.event_types
+
+    def __str__(self):
+        return self.description or self.url
+
+
+class OrderEvent(models.Model):
+    """
+    Transactional outbox: one row per order lifecycle event, written in
+    the same transaction as the Order change. The id gives the order of
+    events.
+    """
+
+    class Type(models.TextChoices):
+        CREATED = "order.created", "Order created"
+        PAID = "order.paid", "Order paid"
+        SHIPPED = "order.shipped", "Order shipped"
+        CANCELLED = "order.cancelled", "Order cancelled"
+        REFUNDED = "order.refunded", "Order refunded"
+
+    id = models.BigAutoField(primary_key=True)
+    type = models.CharField(max_length=32, choices=Type.choices)
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="webhook_events")
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Fanned out to a WebhookDelivery per subscribed endpoint
+    dispatched = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            # The dispatcher only ever reads the (small) undispatched tail
+            models.Index(fields=["id"], condition=Q(dispatched=False), name="webhooks_event_undispatched"),
+        ]
+
+    def __str__(self):
+        return f"{self.type} #{self.pk}"
+
+
+class WebhookDelivery(models.Model):
+    """
+    One event for one endpoint, with its retry state.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        DELIVERED = "delivered", "Delivered"
+        FAILED = "failed", "Failed (gave up)"
+
+    endpoint = models.ForeignKey(WebhookEndpoint, on_delete=models.CASCADE, related_name="deliveries")
+    event = models.ForeignKey(OrderEvent, on_delete=models.CASCADE, related_name="deliveries")
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(db_default=Now())
+
+    # ───────────────────────────────
+    # Lease (a worker is sending it)
+    # ───────────────────────────────
+    batch_id = models.UUIDField(null=True, blank=True, db_index=True)
+    leased_until = models.DateTimeField(null=True, blank=True)
+
+    last_error = models.TextField(blank=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["event_id"]
+        constraints = [
+            models.UniqueConstraint(fields=["endpoint", "event"], name="unique_webhook_delivery"),
+        ]
+        indexes = [
+            models.Index(fields=["endpoint", "status", "next_attempt_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.event} -> {self.endpoint} ({self.status})"
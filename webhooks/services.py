@@ -0,0 +1,280 @@
+# webhooks/services.py
+"""
+Order event webhooks: transactional outbox and batched delivery.
+
+Recording (request path): `record()` inserts an OrderEvent in the same
+transaction as the Order change (checkout, status signals, bulk admin
+actions), so an event exists if and only if the change committed. Nothing
+is sent from the request.
+
+Delivery (`manage.py webhook_worker`):
+
+1. dispatch: undispatched events are fanned out to one WebhookDelivery
+   per subscribed endpoint;
+2. claim: due deliveries of an endpoint are leased as a batch (up to
+   endpoint.batch_size events) while fewer than endpoint.max_concurrency
+   batches are in flight. The endpoint row is locked while claiming, so
+   the limit holds across worker processes;
+3. send: one signed POST per batch;
+4. complete: a 2xx marks the batch delivered; anything else schedules
+   each delivery again with exponential backoff and jitter (at least the
+   Retry-After of a 429/503) until WEBHOOK_MAX_ATTEMPTS, then gives up.
+   A worker that dies mid-batch leaves a lease that expires, after which
+   the batch is claimed again.
+
+Delivery is at-least-once and batches may overtake each other: receivers
+dedupe and order by event id.
+
+Payload: {"events": [{"id", "type", "created_at", "data": {order}}]}.
+Headers:
+    Clickmart-Signature: t=<unix time>,v1=<hex HMAC-SHA256(secret, "<t>.<body>")>
+    Clickmart-Batch: <batch uuid>
+"""
+import hashlib
+import hmac
+import json
+import random
+import time
+import urllib.error
+import urllib.request
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from orders.models import Order
+from .models import OrderEvent, WebhookDelivery, WebhookEndpoint
+
+
+SIGNATURE_HEADER = "Clickmart-Signature"
+BATCH_HEADER = "Clickmart-Batch"
+
+# Status transitions that are published
+STATUS_EVENTS = {
+    Order.Status.PAID: OrderEvent.Type.PAID,
+    Order.Status.SHIPPED: OrderEvent.Type.SHIPPED,
+    Order.Status.CANCELLED: OrderEvent.Type.CANCELLED,
+    Order.Status.REFUNDED: OrderEvent.Type.REFUNDED,
+}
+
+
+# ───────────────────────────────
+# Recording (same transaction as the Order change)
+# ───────────────────────────────
+def order_payload(order, status=None):
+    return {
+        "id": str(order.pk),
+        "order_number": order.order_number,
+        "user_id": order.user_id,
+        "status": status or order.status,
+        "currency": order.currency,
+        "subtotal": order.subtotal,
+        "tax_amount": order.tax_amount,
+        "shipping_amount": order.shipping_amount,
+        "discount_amount": order.discount_amount,
+        "total_amount": order.total_amount,
+        "payment_provider": order.payment_provider,
+        "payment_reference": order.payment_reference,
+        "paid_at": order.paid_at,
+        "created_at": order.created_at,
+    }
+
+
+def record(order, event_type):
+    return OrderEvent.objects.create(type=event_type, order=order, payload=order_payload(order))
+
+
+def record_status_change(order, new_status):
+    event_type = STATUS_EVENTS.get(new_status)
+    if event_type is not None:
+        record(order, event_type)
+
+
+def record_bulk_status_change(queryset, new_status):
+    """
+    Outbox side of `queryset.update(status=new_status)`, which skips
+    signals. Call it in the same transaction, before the update.
+    """
+    event_type = STATUS_EVENTS.get(new_status)
+    if event_type is None:
+        return
+    orders = queryset.exclude(status=new_status).order_by()
+    OrderEvent.objects.bulk_create(
+        OrderEvent(type=event_type, order=order, payload=order_payload(order, new_status))
+        for order in orders.iterator(chunk_size=1000)
+    )
+
+
+# ───────────────────────────────
+# Dispatch and claim
+# ───────────────────────────────
+def dispatch(limit=1000):
+    """
+    Fan out up to `limit` undispatched events; returns how many.
+    """
+    with transaction.atomic():
+        events = list(
+            OrderEvent.objects.select_for_update(skip_locked=True)
+            .filter(dispatched=False)
+            .only("id", "type")[:limit]
+        )
+        if not events:
+            return 0
+        endpoints = list(WebhookEndpoint.objects.filter(is_active=True))
+        WebhookDelivery.objects.bulk_create(
+            [
+                WebhookDelivery(endpoint=endpoint, event=event)
+                for event in events
+                for endpoint in endpoints
+                if endpoint.accepts(event.type)
+            ],
+            ignore_conflicts=True,
+        )
+        OrderEvent.objects.filter(pk__in=[event.pk for event in events]).update(dispatched=True)
+    return len(events)
+
+
+def lease_seconds():
+    # Longer than any send, so a live batch is never claimed twice
+    return settings.WEBHOOK_TIMEOUT_SECONDS * 2 + 30
+
+
+def endpoints_with_due_deliveries(now=None):
+    now = now or timezone.now()
+    due = WebhookDelivery.objects.filter(
+        status=WebhookDelivery.Status.PENDING, next_attempt_at__lte=now,
+    ).filter(Q(leased_until__isnull=True) | Q(leased_until__lte=now))
+    return list(WebhookEndpoint.objects.filter(is_active=True, pk__in=due.values("endpoint_id")))
+
+
+def claim_batch(endpoint, now=None):
+    """
+    Lease the next batch of due deliveries for `endpoint`; None when it
+    has nothing due or already has max_concurrency batches in flight.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        # Serializes claims for this endpoint across worker processes
+        endpoint = WebhookEndpoint.objects.select_for_update().get(pk=endpoint.pk)
+        pending = WebhookDelivery.objects.filter(endpoint=endpoint, status=WebhookDelivery.Status.PENDING)
+        in_flight = (
+            pending.filter(leased_until__gt=now).order_by().values("batch_id").distinct().count()
+        )
+        if in_flight >= endpoint.max_concurrency:
+            return None
+        ids = list(
+            pending.filter(next_attempt_at__lte=now)
+            .filter(Q(leased_until__isnull=True) | Q(leased_until__lte=now))
+            .order_by("event_id")
+            .values_list("pk", flat=True)[: endpoint.batch_size]
+        )
+        if not ids:
+            return None
+        batch_id = uuid.uuid4()
+        WebhookDelivery.objects.filter(pk__in=ids).update(
+            batch_id=batch_id, leased_until=now + timedelta(seconds=lease_seconds()),
+        )
+    deliveries = list(
+        WebhookDelivery.objects.filter(batch_id=batch_id).select_related("event").order_by("event_id")
+    )
+    return endpoint, batch_id, deliveries
+
+
+# ───────────────────────────────
+# Send and complete
+# ───────────────────────────────
+def sign(secret, timestamp, body):
+    return hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+
+
+def verify(secret, header, body, tolerance=300):
+    """
+    Check a Clickmart-Signature header (for receivers and the stub).
+    """
+    try:
+        fields = dict(part.split("=", 1) for part in header.split(","))
+        timestamp = int(fields["t"])
+    except (KeyError, ValueError):
+        return False
+    if abs(time.time() - timestamp) > tolerance:
+        return False
+    return hmac.compare_digest(sign(secret, timestamp, body), fields.get("v1", ""))
+
+
+def batch_body(deliveries):
+    events = [
+        {
+            "id": delivery.event.pk,
+            "type": delivery.event.type,
+            "created_at": delivery.event.created_at,
+            "data": delivery.event.payload,
+        }
+        for delivery in deliveries
+    ]
+    return json.dumps({"events": events}, cls=DjangoJSONEncoder, separators=(",", ":")).encode()
+
+
+def send(endpoint, batch_id, deliveries):
+    """
+    POST one batch. Returns (ok, error, retry_after seconds or None).
+    """
+    body = batch_body(deliveries)
+    timestamp = int(time.time())
+    request = urllib.request.Request(
+        endpoint.url,
+        data=body,
+        method="POST",
+        headers={
+            "Content-Type": "application/json",
+            "User-Agent": "clickmart-webhooks/1",
+            SIGNATURE_HEADER: f"t={timestamp},v1={sign(endpoint.secret, timestamp, body)}",
+            BATCH_HEADER: str(batch_id),
+        },
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=settings.WEBHOOK_TIMEOUT_SECONDS) as response:
+            response.read(1024)
+            return True, "", None
+    except urllib.error.HTTPError as error:
+        retry_after = error.headers.get("Retry-After")
+        retry_after = int(retry_after) if retry_after and retry_after.isdigit() else None
+        return False, f"HTTP {error.code}", retry_after
+    except (urllib.error.URLError, OSError) as error:
+        return False, str(getattr(error, "reason", error))[:500], None
+
+
+def backoff(attempts, retry_after=None):
+    """
+    Seconds before attempt `attempts + 1`: base * 2^(attempts-1), capped,
+    with jitter so endpoints recovering from an outage aren't stampeded.
+    """
+    delay = min(settings.WEBHOOK_BACKOFF_MAX_SECONDS, settings.WEBHOOK_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1))
+    delay *= random.uniform(0.5, 1.0)
+    return max(delay, retry_after or 0)
+
+
+def complete(deliveries, ok, error="", retry_after=None):
+    now = timezone.now()
+    ids = [delivery.pk for delivery in deliveries]
+    if ok:
+        WebhookDelivery.objects.filter(pk__in=ids).update(
+            status=WebhookDelivery.Status.DELIVERED, attempts=F("attempts") + 1,
+            delivered_at=now, leased_until=None, last_error="",
+        )
+        return
+    for delivery in deliveries:
+        delivery.attempts += 1
+        delivery.last_error = error
+        delivery.leased_until = None
+        if delivery.attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+            delivery.status = WebhookDelivery.Status.FAILED
+        else:
+            delivery.next_attempt_at = now + timedelta(seconds=backoff(delivery.attempts, retry_after))
+    WebhookDelivery.objects.bulk_update(
+        deliveries, ["attempts", "last_error", "leased_until", "status", "next_attempt_at"]
+    )
+
@@ -0,0 +1,15 @@
+# webhooks/signals.py
+from django.dispatch import receiver
+
+from orders.models import Order
+from orders.signals import order_status_changed
+from . import services
+
+
+@receiver(order_status_changed, sender=Order)
+def record_order_status_change(sender, order, old_status, new_status, **kwargs):
+    """
+    Add an outbox event when an existing order changes status. Order.save
+    runs in a transaction, so the event commits with the change.
+    """
+    services.record_status_change(order, new_status)
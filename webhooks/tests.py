@@ -0,0 +1,126 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from orders.models import Order
+from users.models import User
+from .models import OrderEvent, WebhookDelivery, WebhookEndpoint
+from . import services
+
+
+class OrderStatusEventTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="buyer", email="buyer@example.com", password="x")
+
+    def setUp(self):
+        Order.objects.create(user=self.user, order_number="ORD-1", status=Order.Status.PENDING)
+        self.order = Order.objects.get(order_number="ORD-1")
+
+    def events(self):
+        return list(OrderEvent.objects.values_list("type", flat=True))
+
+    def test_status_change_records_one_event(self):
+        self.order.status = Order.Status.PAID
+        self.order.save()
+        self.order.save()
+        self.assertEqual(self.events(), [OrderEvent.Type.PAID])
+
+    def test_save_without_status_keeps_the_saved_status(self):
+        self.order.status = Order.Status.PAID
+        # Status not written: the database still says PENDING
+        self.order.save(update_fields=["notes"])
+        self.assertEqual(self.events(), [])
+        self.order.save(update_fields=["status"])
+        self.assertEqual(self.events(), [OrderEvent.Type.PAID])
+
+    def test_unpublished_status_records_nothing(self):
+        self.order.status = Order.Status.PROCESSING
+        self.order.save(update_fields=["status"])
+        self.assertEqual(self.events(), [])
+
+
+@override_settings(WEBHOOK_MAX_ATTEMPTS=3, WEBHOOK_BACKOFF_BASE_SECONDS=10, WEBHOOK_BACKOFF_MAX_SECONDS=3600)
+class OutboxDeliveryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username="buyer", email="buyer@example.com", password="x")
+        cls.order = Order.objects.create(user=user, order_number="ORD-1", status=Order.Status.PENDING)
+        cls.erp = WebhookEndpoint.objects.create(url="https://erp.example.com/hook", batch_size=2, max_concurrency=1)
+        cls.warehouse = WebhookEndpoint.objects.create(
+            url="https://warehouse.example.com/hook", event_types=[OrderEvent.Type.PAID],
+        )
+        WebhookEndpoint.objects.create(url="https://old.example.com/hook", is_active=False)
+
+    def record(self, *types):
+        return [services.record(self.order, event_type) for event_type in types]
+
+    def test_dispatch_fans_out_to_subscribed_endpoints_once(self):
+        self.record(OrderEvent.Type.CREATED, OrderEvent.Type.PAID)
+        self.assertEqual(services.dispatch(), 2)
+        self.assertEqual(services.dispatch(), 0)
+        self.assertEqual(
+            sorted(WebhookDelivery.objects.values_list("endpoint__url", "event__type")),
+            [
+                ("https://erp.example.com/hook", OrderEvent.Type.CREATED),
+                ("https://erp.example.com/hook", OrderEvent.Type.PAID),
+                ("https://warehouse.example.com/hook", OrderEvent.Type.PAID),
+            ],
+        )
+
+    def test_claim_respects_batch_size_concurrency_and_leases(self):
+        events = self.record(*[OrderEvent.Type.PAID] * 3)
+        services.dispatch()
+        now = timezone.now()
+
+        endpoint, batch_id, deliveries = services.claim_batch(self.erp, now)
+        self.assertEqual([delivery.event_id for delivery in deliveries], [event.pk for event in events[:2]])
+        # One batch in flight is the endpoint's limit
+        self.assertIsNone(services.claim_batch(self.erp, now))
+
+        # The worker died: once the lease expires the batch is claimed again
+        later = now + timedelta(seconds=services.lease_seconds() + 1)
+        _, again, redelivered = services.claim_batch(self.erp, later)
+        self.assertNotEqual(again, batch_id)
+        self.assertEqual([delivery.event_id for delivery in redelivered], [event.pk for event in events[:2]])
+
+    def test_success_marks_the_batch_delivered(self):
+        self.record(OrderEvent.Type.PAID)
+        services.dispatch()
+        endpoint, batch_id, deliveries = services.claim_batch(self.warehouse)
+        services.complete(deliveries, ok=True)
+        delivery = WebhookDelivery.objects.get(endpoint=self.warehouse)
+        self.assertEqual((delivery.status, delivery.attempts, delivery.leased_until), (WebhookDelivery.Status.DELIVERED, 1, None))
+        self.assertIsNone(services.claim_batch(self.warehouse))
+
+    def test_failures_back_off_then_give_up(self):
+        self.record(OrderEvent.Type.PAID)
+        services.dispatch()
+        now = timezone.now()
+        with mock.patch("webhooks.services.random.uniform", return_value=1.0):
+            for attempt in (1, 2):
+                _, _, deliveries = services.claim_batch(self.warehouse, now)
+                services.complete(deliveries, ok=False, error="HTTP 503", retry_after=15 if attempt == 2 else None)
+                delivery = WebhookDelivery.objects.get(endpoint=self.warehouse)
+                self.assertEqual(delivery.status, WebhookDelivery.Status.PENDING)
+                # Not due before the backoff: 10s, then max(20s, Retry-After)
+                self.assertIsNone(services.claim_batch(self.warehouse, now))
+                self.assertAlmostEqual((delivery.next_attempt_at - timezone.now()).total_seconds(), 10 * attempt, delta=2)
+                now = delivery.next_attempt_at
+
+        _, _, deliveries = services.claim_batch(self.warehouse, now)
+        services.complete(deliveries, ok=False, error="HTTP 500")
+        delivery = WebhookDelivery.objects.get(endpoint=self.warehouse)
+        self.assertEqual((delivery.status, delivery.attempts, delivery.last_error), (WebhookDelivery.Status.FAILED, 3, "HTTP 500"))
+
+    def test_batches_are_signed(self):
+        self.record(OrderEvent.Type.PAID)
+        services.dispatch()
+        endpoint, batch_id, deliveries = services.claim_batch(self.warehouse)
+        body = services.batch_body(deliveries)
+        timestamp = int(timezone.now().timestamp())
+        header = f"t={timestamp},v1={services.sign(endpoint.secret, timestamp, body)}"
+        self.assertTrue(services.verify(endpoint.secret, header, body))
+        self.assertFalse(services.verify(endpoint.secret, header, body + b" "))